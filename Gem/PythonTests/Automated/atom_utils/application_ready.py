@@ -0,0 +1,12 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Readiness marker run with --runpython by hydra_test_utils.launch_and_validate_results(wait_for_ready=True).
+Applications only run Python scripts once they finished starting up, so the printed line tells the log monitor that
+the application is ready. It must match hydra_test_utils.READY_LINE.
+"""
+
+print("AtomTest: Application ready")
@@ -6,14 +6,17 @@ SPDX-License-Identifier: Apache-2.0 OR MIT
 
 """
 
+import concurrent.futures
+import itertools
 import os
 import logging
 import subprocess
-import time
 
 import pytest
 
-import ly_test_tools.log.log_monitor as log_monitor
+from . import log_follower
+from . import result_channel
+from . import step_timeline
 
 SIMILARITY_THRESHOLD = 0.99
 DEFAULT_SUBFOLDER_PATH = 'user/PythonTests/Automated/Screenshots'
@@ -42,6 +45,10 @@ class TestAutomationBase:
     def fixture_open_beyond_compare(self, open_beyond_compare):
         self.enable_open_beyond_compare = open_beyond_compare
 
+    @pytest.fixture(autouse=True)
+    def fixture_screenshot_compare_mode(self, screenshot_compare_mode):
+        self.screenshot_compare_mode = screenshot_compare_mode
+
     def _run_test(self, request, workspace, editor, testcase_module, expected_lines, unexpected_lines, extra_cmdline_args=[]):
         def teardown():
             editor.ensure_stopped()
@@ -58,13 +65,19 @@ class TestAutomationBase:
         pycmd = ["-exec_line", "pyRunFile %s" % testscase_module_filepath, "-autotest_mode"] + extra_cmdline_args
         # args are added to the WinLauncher launch command
         editor.args.extend(pycmd)
-        editor.start()
-        assert editor.is_alive(), "Editor failed to launch for the current Lumberyard build."
         editorlog_file = os.path.join(workspace.paths.project_log(), "Editor.log")
-        time.sleep(5)
-        new_log_monitor = log_monitor.LogMonitor(editor, editorlog_file)
-        new_log_monitor.monitor_log_for_lines(expected_lines, unexpected_lines)
-        editor.stop()
+        timeline_file = step_timeline.get_timeline_path(workspace.paths.project_log(), request.node.name)
+        # Lines the log already has are from a previous run, they are skipped until the new Editor rotates the log.
+        previous_log_state = log_follower.get_log_state(editorlog_file)
+        with result_channel.ResultChannel(result_channel.get_result_path_for_log(editorlog_file)) as results, \
+                step_timeline.TimelineChannel(timeline_file) as timeline:
+            with timeline.span("_run_test", {"testcase_module": testcase_module.__name__}):
+                editor.start()
+                assert editor.is_alive(), "Editor failed to launch for the current Lumberyard build."
+                log_follower.monitor_log_for_lines(
+                    editorlog_file, expected_lines, unexpected_lines, is_alive=editor.is_alive,
+                    result_path=results.result_path, previous_log_state=previous_log_state)
+                editor.stop()
 
     def _capture_screenshot(self):
         """
@@ -117,30 +130,316 @@ class TestAutomationBase:
         except FileNotFoundError as err:
             return str(err)
 
-    def compare_screenshots(self, test_screenshot, golden_screenshot):
-        import ly_test_tools.image.screenshot_compare_qssim as screenshot_compare
-        
-        assert os.path.isfile(test_screenshot), f"test screenshot {test_screenshot} was not found, did the test run?"
-        # compare test screenshot with the golden screenshot
-        try:
-            similarity = screenshot_compare.qssim(golden_screenshot, test_screenshot)
-        except ValueError as err:
-            raise ValueError(f"Resolutions of screenshots are incompatible. Try setting your display scaling to 100%: {str(err)}") from err
-            
+    def _log_screenshot_result(self, test_screenshot, golden_screenshot, result):
         logger.info("----- Screenshot Result -----")
         logger.info("    Expected Screenshot: '{}'".format(golden_screenshot))
         logger.info("        Test Screenshot: '{}'".format(test_screenshot))
-        logger.info("                  Score: '{}'".format(similarity))
+        if result.reject_reason:
+            logger.info("               Rejected: '{}'".format(result.reject_reason))
+            return
+        score_note = ""
+        if result.decision_factor != 1:
+            score_note = f" (1/{result.decision_factor} resolution)"
+        elif not result.exact:
+            score_note = " (bound)"
+        logger.info("                  Score: '{}'{}".format(result.score, score_note))
+        logger.info("           Tiles Scored: '{}/{}'".format(result.tiles_scored, result.tile_count))
+        logger.info("         Decision Level: '1/{}' {}".format(result.decision_factor, list(result.level_scores)))
+
+    def _screenshot_failure_message(self, test_screenshot, golden_screenshot, result):
+        if result.reject_reason:
+            return f"Screenshot rejected before scoring: {result.reject_reason}.\n"  \
+                   f"Test Screenshot Filepath: {test_screenshot}\n"               \
+                   f"Golden Screenshot Filepath: {golden_screenshot}\n"
+        similarity_relation = "=" if result.exact else "<="
+        if result.decision_factor != 1:
+            similarity_relation = f"at 1/{result.decision_factor} resolution ="
+        return f"Screenshot similarity {similarity_relation} {result.score}, below the threshold of {SIMILARITY_THRESHOLD}.\n"  \
+               f"Test Screenshot Filepath: {test_screenshot}\n"                                                       \
+               f"Golden Screenshot Filepath: {golden_screenshot}\n"                                                   \
+               f"Worst Tiles (x, y, width, height): {result.worst_tiles}\n"
+
+    def compare_screenshots(self, test_screenshot, golden_screenshot, include_regions=None, exclude_regions=None):
+        """
+        Compares a test screenshot against its golden screenshot and raises if they do not match.
+        Sidecar mask files of the golden (see comparison_mask) and the given regions restrict which pixels are scored.
+        :param test_screenshot: Path to the test screenshot.
+        :param golden_screenshot: Path to the golden screenshot.
+        :param include_regions: Optional list of [x, y, width, height] rectangles to restrict the comparison to.
+        :param exclude_regions: Optional list of [x, y, width, height] rectangles to ignore, such as volatile UI.
+        """
+        assert os.path.isfile(test_screenshot), f"test screenshot {test_screenshot} was not found, did the test run?"
+        # compare test screenshot with the golden screenshot
+        (_, result, error, report_message), = _compare_screenshots_to_golden(
+            golden_screenshot, [test_screenshot], self.screenshot_compare_mode, include_regions, exclude_regions)
+        if error is not None:
+            raise ValueError(f"Comparing {test_screenshot} against {golden_screenshot} failed: {error}")
 
-        if similarity < SIMILARITY_THRESHOLD:
+        self._log_screenshot_result(test_screenshot, golden_screenshot, result)
+
+        if not result.passed:
             res = None
             if self.enable_open_beyond_compare:
                 res = self.open_beyond_compare(test_screenshot, golden_screenshot)
-            exception_msg = f"Screenshot similarity = {similarity}, below the threshold of {SIMILARITY_THRESHOLD}.\n"  \
-                            f"Test Screenshot Filepath: {test_screenshot}\n"                                           \
-                            f"Golden Screenshot Filepath: {golden_screenshot}\n\n"                                     \
-                            f"NOTE: HDR-enabled monitors are currently not supported. Please disable HDR first.\n"
+            exception_msg = self._screenshot_failure_message(test_screenshot, golden_screenshot, result) + \
+                report_message + \
+                "\nNOTE: HDR-enabled monitors are currently not supported. Please disable HDR first.\n"
             if res:
                 exception_msg += "\nAttempted to run Beyond Compare but no executable was found. Try adding it to your path."
             raise Exception(exception_msg)
-        print("Screenshots match")
\ No newline at end of file
+        print("Screenshots match")
+
+    def compare_screenshot_batch(self, test_screenshots, golden_screenshots, max_workers=None, include_regions=None,
+                                 exclude_regions=None):
+        """
+        Compares a list of test screenshots against their golden screenshots using a process pool.
+        Workers hand their comparisons to the comparison daemon when one is running.
+        Pairs sharing the same golden screenshot are scored by a single worker so each golden is decoded once.
+        Every pair is compared before raising, and all mismatches are reported together.
+        :param test_screenshots: List of test screenshot paths.
+        :param golden_screenshots: List of golden screenshot paths, matched to test_screenshots by index.
+        :param max_workers: Maximum number of worker processes. Defaults to the number of CPUs.
+        :param include_regions: Optional list of [x, y, width, height] rectangles to restrict every comparison to.
+        :param exclude_regions: Optional list of [x, y, width, height] rectangles to ignore in every comparison.
+        """
+        assert len(test_screenshots) == len(golden_screenshots), \
+            f"Got {len(test_screenshots)} test screenshots for {len(golden_screenshots)} golden screenshots"
+
+        failures = []
+        pairs_by_golden = {}
+        for test_screenshot, golden_screenshot in zip(test_screenshots, golden_screenshots):
+            if not os.path.isfile(test_screenshot):
+                failures.append(f"test screenshot {test_screenshot} was not found, did the test run?\n")
+                continue
+            pairs_by_golden.setdefault(golden_screenshot, []).append(test_screenshot)
+
+        if pairs_by_golden:
+            # Hydrate every golden this batch needs in parallel before handing them to the comparison workers.
+            from . import golden_store
+            golden_store.GoldenStore().materialize(pairs_by_golden.keys())
+
+            worker_count = min(len(pairs_by_golden), max_workers or os.cpu_count() or 1)
+            with concurrent.futures.ProcessPoolExecutor(max_workers=worker_count) as executor:
+                batch_results = executor.map(
+                    _compare_screenshots_to_golden, pairs_by_golden.keys(), pairs_by_golden.values(),
+                    itertools.repeat(self.screenshot_compare_mode), itertools.repeat(include_regions),
+                    itertools.repeat(exclude_regions))
+                for golden_screenshot, golden_results in zip(pairs_by_golden.keys(), batch_results):
+                    for test_screenshot, result, error, report_message in golden_results:
+                        if error is not None:
+                            failures.append(
+                                f"{error}\nTest Screenshot Filepath: {test_screenshot}\n"
+                                f"Golden Screenshot Filepath: {golden_screenshot}\n")
+                            continue
+                        self._log_screenshot_result(test_screenshot, golden_screenshot, result)
+                        if not result.passed:
+                            failures.append(
+                                self._screenshot_failure_message(test_screenshot, golden_screenshot, result) +
+                                report_message)
+                            if self.enable_open_beyond_compare and self.open_beyond_compare(
+                                    test_screenshot, golden_screenshot):
+                                failures.append("Attempted to run Beyond Compare but no executable was found. "
+                                                "Try adding it to your path.\n")
+
+        if failures:
+            raise Exception(
+                f"{len(failures)} of {len(test_screenshots)} screenshot comparisons failed:\n\n" +
+                "\n".join(failures) +
+                "\nNOTE: HDR-enabled monitors are currently not supported. Please disable HDR first.\n")
+        print("Screenshots match")
+
+
+def _load_golden(golden_screenshot, compare_mode, include_regions=None, exclude_regions=None):
+    """
+    Loads a golden screenshot, the cached statistics needed by compare_mode and its comparison mask.
+    Golden screenshots checked in as git-lfs pointer stubs are resolved through the golden store.
+    When a mask applies, the statistics are cropped to the masked region.
+    :return: tuple of (golden_cache.GoldenStatistics, comparison_mask.ComparisonMask or None)
+    """
+    from . import comparison_mask
+    from . import golden_cache
+    from . import golden_store
+    from . import screenshot_compare
+
+    pyramid_factors = ()
+    if compare_mode == screenshot_compare.MODE_PYRAMID:
+        pyramid_factors = [factor for factor, _ in screenshot_compare.DEFAULT_PYRAMID_LEVELS]
+    store = golden_store.GoldenStore()
+    resolved_golden = store.resolve(golden_screenshot)
+    golden = golden_cache.load_golden_statistics(
+        resolved_golden.path, pyramid_factors=pyramid_factors, content_hash=resolved_golden.content_hash)
+
+    mask = comparison_mask.load_comparison_mask(
+        golden_screenshot, golden.image.shape[:2], include_regions, exclude_regions,
+        alignment=max(pyramid_factors, default=1), store=store)
+    if mask is not None:
+        golden = comparison_mask.crop_golden_statistics(golden, mask)
+    return golden, mask
+
+
+def _compare_to_golden(golden, mask, test_screenshot, compare_mode, memo=None):
+    """
+    Scores a test screenshot against a golden loaded by _load_golden, reusing the memoized result when this capture
+    was already scored against this golden with the same parameters.
+    :param memo: comparison_memo.ComparisonMemo to use. Defaults to the memo in the AtomTest cache directory.
+    :return: screenshot_compare.ComparisonResult
+    """
+    from . import comparison_memo
+
+    if memo is None:
+        with comparison_memo.ComparisonMemo() as memo:
+            return _compare_to_golden(golden, mask, test_screenshot, compare_mode, memo)
+    memo_key = _comparison_memo_key(golden, mask, test_screenshot, compare_mode)
+    result = memo.get(memo_key)
+    if result is None:
+        result = _score_against_golden(golden, mask, test_screenshot, compare_mode)
+        memo.put(memo_key, result)
+    return result
+
+
+def _comparison_memo_key(golden, mask, test_screenshot, compare_mode):
+    """
+    Builds the comparison_memo key of scoring test_screenshot against a golden loaded by _load_golden.
+    """
+    from . import comparison_memo
+    from . import golden_cache
+    from . import screenshot_compare
+
+    memo_parameters = {
+        'compare_mode': compare_mode,
+        'threshold': SIMILARITY_THRESHOLD,
+        'window': screenshot_compare.DEFAULT_WINDOW,
+        'window_size': screenshot_compare.DEFAULT_WINDOW_SIZE,
+        'tile_size': screenshot_compare.DEFAULT_TILE_SIZE,
+        'mask': None if mask is None else comparison_memo.mask_digest(mask),
+    }
+    if compare_mode == screenshot_compare.MODE_PYRAMID:
+        memo_parameters['pyramid_levels'] = screenshot_compare.DEFAULT_PYRAMID_LEVELS
+    return comparison_memo.comparison_key(
+        golden_cache.file_content_hash(test_screenshot), golden.content_hash, **memo_parameters)
+
+
+def _score_against_golden(golden, mask, test_screenshot, compare_mode):
+    """
+    Scores a test screenshot against a golden loaded by _load_golden.
+    Captures that fail the screenshot_prefilter quick-reject checks are failed without scoring.
+    Goldens stored at a reduced comparison resolution are compared against the area downsampled capture.
+    With a mask, only the masked region of the test screenshot is decoded and only its unmasked pixels are scored.
+    :return: screenshot_compare.ComparisonResult
+    """
+    from . import image_utils
+    from . import screenshot_compare
+    from . import screenshot_prefilter
+
+    pixels, maxval = image_utils.read_image(test_screenshot)
+    image_shape = golden.image.shape[:2] if mask is None else mask.image_shape
+    pixels, maxval = image_utils.downsample_to_shape(pixels, maxval, image_shape)
+    if golden.signature is not None:
+        reject_reason = screenshot_prefilter.quick_reject(
+            golden.signature, screenshot_prefilter.compute_signature(pixels, maxval))
+        if reject_reason:
+            return screenshot_compare.ComparisonResult(0.0, False, False, 0, 0, [], reject_reason=reject_reason)
+
+    pixel_mask = None
+    if mask is None:
+        test_image = image_utils.to_float_image(pixels, maxval)
+    else:
+        x, y, width, height = mask.bounds
+        test_image = image_utils.to_float_image(pixels[y:y + height, x:x + width], maxval)
+        pixel_mask = mask.pixels
+
+    if compare_mode == screenshot_compare.MODE_PYRAMID:
+        result = screenshot_compare.compare_pyramid(
+            golden.image, test_image, SIMILARITY_THRESHOLD,
+            golden_moments=golden.moments, golden_pyramid=golden.pyramid, pixel_mask=pixel_mask)
+    else:
+        result = screenshot_compare.compare_tiled(
+            golden.image, test_image, SIMILARITY_THRESHOLD, golden_moments=golden.moments, pixel_mask=pixel_mask)
+    if mask is not None:
+        x, y, _, _ = mask.bounds
+        result = result._replace(worst_tiles=[
+            ((tile_x + x, tile_y + y, tile_width, tile_height), score)
+            for (tile_x, tile_y, tile_width, tile_height), score in result.worst_tiles])
+    return result
+
+
+def _write_failure_report(golden_screenshot, test_screenshot, golden, mask, compare_mode):
+    """
+    Writes the failure_report artifacts for a failed comparison next to the test screenshot.
+    A report already written for the same comparison is reused.
+    Report errors are logged rather than raised so they never hide the comparison failure itself.
+    :return: Text listing the artifact paths for the failure message, empty if no report was written.
+    """
+    from . import failure_report
+    from . import golden_store
+
+    try:
+        comparison_key = _comparison_memo_key(golden, mask, test_screenshot, compare_mode)
+        report = failure_report.load_failure_report(os.path.splitext(test_screenshot)[0], comparison_key)
+        if report is None:
+            report = failure_report.write_failure_report(
+                golden_store.GoldenStore().resolve(golden_screenshot).path, test_screenshot, mask=mask,
+                comparison_key=comparison_key)
+    except (OSError, ValueError) as err:
+        logger.warning(f"Failed to write the failure report for '{test_screenshot}': {err}")
+        return ""
+    return f"Diff Heatmap: {report.heatmap}\n"           \
+           f"Tile Scores: {report.tile_scores}\n"        \
+           f"Side By Side: {report.side_by_side}\n"
+
+
+def _compare_screenshots_to_golden(golden_screenshot, test_screenshots, compare_mode, include_regions=None,
+                                   exclude_regions=None):
+    """
+    Scores test screenshots against one golden, in the comparison daemon when one is running, otherwise in process.
+    This is also the process pool worker for compare_screenshot_batch.
+    :return: list of (test_screenshot, ComparisonResult or None, error message or None, failure report message)
+    """
+    from . import comparison_daemon
+
+    results = comparison_daemon.request_comparison(
+        golden_screenshot, test_screenshots, compare_mode, include_regions, exclude_regions)
+    if results is None:
+        results = _compare_against_golden(
+            golden_screenshot, test_screenshots, compare_mode, include_regions, exclude_regions)
+    return results
+
+
+def _compare_against_golden(golden_screenshot, test_screenshots, compare_mode, include_regions=None,
+                            exclude_regions=None):
+    """
+    Decodes the golden once and scores every test screenshot against it.
+    :return: list of (test_screenshot, ComparisonResult or None, error message or None, failure report message)
+    """
+    golden, mask = _load_golden(golden_screenshot, compare_mode, include_regions, exclude_regions)
+    return _compare_against_loaded_golden(golden_screenshot, golden, mask, test_screenshots, compare_mode)
+
+
+def _compare_against_loaded_golden(golden_screenshot, golden, mask, test_screenshots, compare_mode):
+    """
+    Scores every test screenshot against a golden loaded by _load_golden.
+    Failure reports are written here, where the golden is already decoded.
+    :return: list of (test_screenshot, ComparisonResult or None, error message or None, failure report message)
+    """
+    from . import comparison_memo
+    from . import image_utils
+
+    results = []
+    with comparison_memo.ComparisonMemo() as memo:
+        for test_screenshot in test_screenshots:
+            try:
+                result = _compare_to_golden(golden, mask, test_screenshot, compare_mode, memo)
+            except image_utils.ImageShapeError as err:
+                results.append((test_screenshot, None, f"Resolutions of screenshots are incompatible. "
+                                                       f"Try setting your display scaling to 100%: {err}", ""))
+                continue
+            except ValueError as err:
+                # Undecodable captures, and masks or regions that do not fit the capture.
+                results.append((test_screenshot, None, f"{type(err).__name__}: {err}", ""))
+                continue
+            report_message = ""
+            if not result.passed:
+                report_message = _write_failure_report(
+                    golden_screenshot, test_screenshot, golden, mask, compare_mode)
+            results.append((test_screenshot, result, None, report_message))
+    return results
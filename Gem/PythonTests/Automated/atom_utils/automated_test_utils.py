@@ -8,6 +8,12 @@ import time
 import azlmbr.legacy.general as general
 import azlmbr.atom
 
+from . import result_channel
+from . import step_timeline
+
+# Times the general.idle_wait calls test scripts make directly when a timeline is recorded.
+step_timeline.trace_waits(general)
+
 
 class FailFast(BaseException):
     """
@@ -19,11 +25,13 @@ class FailFast(BaseException):
 
 class TestHelper:
     @staticmethod
+    @step_timeline.traced
     def init_idle():
         general.idle_enable(True)
         general.idle_wait_frames(1)
 
     @staticmethod
+    @step_timeline.traced
     def open_level(level):
         # type: (str, ) -> None
         """
@@ -39,6 +47,7 @@ class TestHelper:
         general.idle_wait_frames(1)
 
     @staticmethod
+    @step_timeline.traced
     def enter_game_mode(msgtuple_success_fail):
         # type: (tuple) -> None
         """
@@ -52,6 +61,7 @@ class TestHelper:
         Report.critical_result(msgtuple_success_fail, general.is_in_game_mode())
 
     @staticmethod
+    @step_timeline.traced
     def exit_game_mode(msgtuple_success_fail):
         # type: (tuple) -> None
         """
@@ -64,10 +74,12 @@ class TestHelper:
         Report.critical_result(msgtuple_success_fail, not general.is_in_game_mode())
 
     @staticmethod
+    @step_timeline.traced
     def close_editor():
         general.exit_no_prompt()
 
     @staticmethod
+    @step_timeline.traced
     def fail_fast(message=None):
         # type: (str) -> None
         """
@@ -82,6 +94,7 @@ class TestHelper:
         raise FailFast()
 
     @staticmethod
+    @step_timeline.traced
     def wait_for_condition(function, timeout_in_seconds=2.0):
         # type: (function, float) -> bool
         """
@@ -107,6 +120,7 @@ class TestHelper:
                     return True
 
     @staticmethod
+    @step_timeline.traced
     def find_entities(entity_name):
         search_filter = azlmbr.entity.SearchFilter()
         search_filter.names = [entity_name]
@@ -114,6 +128,7 @@ class TestHelper:
         return searched_entities
 
     @staticmethod
+    @step_timeline.traced
     def attach_component_to_entity(entityId, componentName):
         # type: (azlmbr.entity.EntityId, str) -> azlmbr.entity.EntityComponentIdPair
         """
@@ -140,6 +155,7 @@ class TestHelper:
         return None
 
     @staticmethod
+    @step_timeline.traced
     def get_component_property(component, propertyPath):
         return azlmbr.editor.EditorComponentAPIBus(
             azlmbr.bus.Broadcast,
@@ -148,6 +164,7 @@ class TestHelper:
             propertyPath)
 
     @staticmethod
+    @step_timeline.traced
     def set_component_property(component, propertyPath, value):
         azlmbr.editor.EditorComponentAPIBus(
             azlmbr.bus.Broadcast,
@@ -157,11 +174,13 @@ class TestHelper:
             value)
 
     @staticmethod
+    @step_timeline.traced
     def get_property_list(Component):
         property_list = azlmbr.editor.EditorComponentAPIBus(azlmbr.bus.Broadcast, 'BuildComponentPropertyList', Component)
         return property_list
 
     @staticmethod
+    @step_timeline.traced
     def compare_property_list(Component, PropertyList):
         property_list = TestHelper.get_property_list(Component)
         if set(property_list) == set(PropertyList):
@@ -194,21 +213,26 @@ class Timeout:
         return time.time() > self.die_after
 
 
-# NOTE: implementation of reports will be changed to use a better mechanism rather than print
-
-
 class Report:
+    """
+    Prints results to the log, and records them in the result file of the test when pytest opened a
+    result_channel.ResultChannel for it.
+    """
+
     @staticmethod
     def info(msg):
         print("Info: {}".format(msg))
+        result_channel.record_result(msg, result_channel.RESULT_INFO)
 
     @staticmethod
     def success(msgtuple_success_fail):
         print("Success: {}".format(msgtuple_success_fail[0]))
+        result_channel.record_result(msgtuple_success_fail[0], result_channel.RESULT_SUCCESS)
 
     @staticmethod
     def failure(msgtuple_success_fail):
         print("Failure: {}".format(msgtuple_success_fail[1]))
+        result_channel.record_result(msgtuple_success_fail[1], result_channel.RESULT_FAILURE)
 
     @staticmethod
     def result(msgtuple_success_fail, condition):
@@ -0,0 +1,266 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Optional long-lived screenshot comparison daemon.
+The daemon keeps the comparison modules imported and the most recently used goldens decoded, and serves compare
+requests from any number of test processes over a Unix socket. TestAutomationBase uses it whenever it is running and
+compares in process otherwise, so starting it is purely an optimization for pytest-xdist or many short test runs.
+Usage (from Gem/PythonTests): python -m Automated.atom_utils.comparison_daemon [--stop] [--socket PATH]
+
+Requests and responses are single lines of JSON:
+    {"command": "compare", "version": ..., "golden_screenshot": ..., "test_screenshots": [...], "compare_mode": ...,
+     "include_regions": ..., "exclude_regions": ...}
+    -> {"results": [[test_screenshot, result dict or null, error or null, failure report message], ...]}
+    {"command": "ping"} -> {"version": ...}
+    {"command": "stop"} -> {}
+Any request can instead be answered with {"error": message}, in which case the client compares in process.
+"""
+
+import argparse
+import collections
+import importlib
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+import time
+
+from .comparison_memo import ALGORITHM_VERSION
+from .golden_cache import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+SOCKET_ENV_VAR = 'ATOMTEST_COMPARISON_DAEMON_SOCKET'
+SOCKET_FILENAME = 'comparison_daemon.sock'
+DEFAULT_GOLDEN_LRU_SIZE = 32
+DEFAULT_IDLE_TIMEOUT = 60 * 60
+CONNECT_TIMEOUT = 1.0
+REQUEST_TIMEOUT = 300.0
+POLL_INTERVAL = 1.0
+WARM_MODULES = ['automated_test_base', 'comparison_mask', 'failure_report', 'golden_cache', 'screenshot_prefilter']
+
+
+def get_socket_path():
+    """
+    Returns the socket path of the comparison daemon, from the ATOMTEST_COMPARISON_DAEMON_SOCKET environment variable
+    when set, otherwise in the AtomTest cache directory.
+    """
+    return os.environ.get(SOCKET_ENV_VAR) or os.path.join(get_cache_dir(), SOCKET_FILENAME)
+
+
+def _send_message(socket_file, message):
+    socket_file.write(json.dumps(message).encode('utf-8') + b'\n')
+    socket_file.flush()
+
+
+def _receive_message(socket_file):
+    line = socket_file.readline()
+    if not line:
+        raise ConnectionError("The connection was closed before a message was received")
+    return json.loads(line)
+
+
+def _send_request(request, socket_path=None, timeout=REQUEST_TIMEOUT):
+    """
+    Sends a single request to the daemon.
+    :return: The response dict.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(CONNECT_TIMEOUT)
+        client.connect(socket_path or get_socket_path())
+        client.settimeout(timeout)
+        with client.makefile('rwb') as socket_file:
+            _send_message(socket_file, request)
+            return _receive_message(socket_file)
+
+
+def request_comparison(golden_screenshot, test_screenshots, compare_mode, include_regions=None,
+                       exclude_regions=None, socket_path=None):
+    """
+    Asks the comparison daemon to score test screenshots against a golden.
+    :param golden_screenshot: Path to the golden screenshot.
+    :param test_screenshots: List of test screenshot paths.
+    :param compare_mode: screenshot_compare.MODE_TILED or MODE_PYRAMID.
+    :param include_regions: Optional list of [x, y, width, height] rectangles to restrict the comparison to.
+    :param exclude_regions: Optional list of [x, y, width, height] rectangles to ignore.
+    :param socket_path: The daemon socket. Defaults to get_socket_path().
+    :return: list of (test_screenshot, ComparisonResult or None, error message or None, failure report message),
+        or None if no daemon is running or it could not handle the request.
+    """
+    from .screenshot_compare import result_from_dict
+
+    socket_path = socket_path or get_socket_path()
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(socket_path):
+        return None
+    try:
+        response = _send_request({
+            'command': 'compare',
+            'version': ALGORITHM_VERSION,
+            'golden_screenshot': os.path.abspath(golden_screenshot),
+            'test_screenshots': [os.path.abspath(test_screenshot) for test_screenshot in test_screenshots],
+            'compare_mode': compare_mode,
+            'include_regions': include_regions,
+            'exclude_regions': exclude_regions,
+        }, socket_path)
+    except (OSError, ValueError) as err:
+        logger.warning(f"Comparison daemon at '{socket_path}' is unavailable, comparing in process: {err}")
+        return None
+    if 'error' in response:
+        logger.warning(f"Comparison daemon failed, comparing in process: {response['error']}")
+        return None
+
+    # Report the paths the caller passed in rather than the absolute paths sent to the daemon.
+    return [
+        (test_screenshot, None if result is None else result_from_dict(result), error, report_message)
+        for test_screenshot, (_, result, error, report_message) in zip(test_screenshots, response['results'])
+    ]
+
+
+def _file_state(file_path):
+    try:
+        file_stat = os.stat(file_path)
+    except OSError:
+        return None
+    return file_stat.st_mtime_ns, file_stat.st_size
+
+
+class GoldenLru:
+    """
+    Thread safe LRU of goldens loaded by automated_test_base._load_golden.
+    Entries are keyed by the golden and its mask sidecar file states, so edited goldens and masks are reloaded.
+    """
+
+    def __init__(self, max_size=DEFAULT_GOLDEN_LRU_SIZE):
+        self.max_size = max_size
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, golden_screenshot, compare_mode, include_regions, exclude_regions):
+        """
+        :return: tuple of (golden_cache.GoldenStatistics, comparison_mask.ComparisonMask or None)
+        """
+        from . import automated_test_base
+        from . import comparison_mask
+        from . import golden_store
+
+        key = (
+            golden_screenshot, compare_mode, json.dumps(include_regions), json.dumps(exclude_regions),
+            _file_state(golden_store.find_golden_file(golden_screenshot)),
+            tuple(_file_state(mask_path) for mask_path in comparison_mask.get_mask_paths(golden_screenshot)))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        entry = automated_test_base._load_golden(golden_screenshot, compare_mode, include_regions, exclude_regions)
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = self.server.process_request_message(json.loads(line))
+            except Exception as err:
+                logger.exception("Failed to process a comparison request")
+                response = {'error': f"{type(err).__name__}: {err}"}
+            _send_message(self.wfile, response)
+
+
+class ComparisonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Serves compare requests, one thread per connection, sharing a GoldenLru.
+    """
+
+    def __init__(self, socket_path, golden_lru_size=DEFAULT_GOLDEN_LRU_SIZE):
+        self.goldens = GoldenLru(golden_lru_size)
+        self.last_request_time = time.monotonic()
+        self.stop_requested = False
+        super().__init__(socket_path, _RequestHandler)
+
+    def process_request_message(self, request):
+        from . import automated_test_base
+        from .screenshot_compare import result_to_dict
+
+        self.last_request_time = time.monotonic()
+        command = request.get('command')
+        if command == 'ping':
+            return {'version': ALGORITHM_VERSION}
+        if command == 'stop':
+            self.stop_requested = True
+            return {}
+        if command != 'compare':
+            return {'error': f"Unknown command '{command}'"}
+        if request.get('version') != ALGORITHM_VERSION:
+            return {'error': f"Daemon runs comparison version {ALGORITHM_VERSION}, client expects "
+                             f"{request.get('version')}. Restart the comparison daemon."}
+
+        golden_screenshot = request['golden_screenshot']
+        golden, mask = self.goldens.get(
+            golden_screenshot, request['compare_mode'], request.get('include_regions'), request.get('exclude_regions'))
+        results = automated_test_base._compare_against_loaded_golden(
+            golden_screenshot, golden, mask, request['test_screenshots'], request['compare_mode'])
+        return {'results': [
+            (test_screenshot, None if result is None else result_to_dict(result), error, report_message)
+            for test_screenshot, result, error, report_message in results]}
+
+
+def serve(socket_path=None, golden_lru_size=DEFAULT_GOLDEN_LRU_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """
+    Runs the comparison daemon until it is stopped or has been idle for idle_timeout seconds.
+    :return: None
+    """
+    # Import everything a comparison needs up front, so the first request finds it warm.
+    for module_name in WARM_MODULES:
+        importlib.import_module(f".{module_name}", __package__)
+
+    socket_path = socket_path or get_socket_path()
+    if os.path.exists(socket_path):
+        try:
+            _send_request({'command': 'ping'}, socket_path)
+        except OSError:
+            os.remove(socket_path)
+        else:
+            raise RuntimeError(f"A comparison daemon is already running at '{socket_path}'")
+    os.makedirs(os.path.dirname(os.path.abspath(socket_path)), exist_ok=True)
+
+    with ComparisonServer(socket_path, golden_lru_size) as server:
+        server.timeout = POLL_INTERVAL
+        logger.info(f"Comparison daemon listening on '{socket_path}'")
+        try:
+            while not server.stop_requested and time.monotonic() - server.last_request_time < idle_timeout:
+                server.handle_request()
+        finally:
+            os.remove(socket_path)
+    logger.info("Comparison daemon stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve screenshot comparisons to AtomTest processes.")
+    parser.add_argument('--socket', default=None, help="Socket path. Defaults to the AtomTest cache directory.")
+    parser.add_argument('--golden-lru-size', type=int, default=DEFAULT_GOLDEN_LRU_SIZE,
+                        help="Number of decoded goldens kept in memory.")
+    parser.add_argument('--idle-timeout', type=float, default=DEFAULT_IDLE_TIMEOUT,
+                        help="Seconds without requests after which the daemon exits.")
+    parser.add_argument('--stop', action='store_true', help="Stop the running daemon.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    if args.stop:
+        _send_request({'command': 'stop'}, args.socket)
+        return
+    serve(args.socket, args.golden_lru_size, args.idle_timeout)
+
+
+if __name__ == '__main__':
+    main()
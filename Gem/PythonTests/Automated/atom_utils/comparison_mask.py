@@ -0,0 +1,176 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Masks restricting screenshot comparisons to the pixels a test cares about, such as excluding manipulators or UI.
+A golden image can have sidecar files next to it, named after the golden without its extension:
+    <golden>.mask.png (or .mask.ppm): pixels that are black in the mask image are ignored.
+    <golden>.mask.json: rectangles as {"include": [[x, y, width, height], ...], "exclude": [[x, y, width, height], ...]}
+Tests can declare additional include and exclude rectangles in the same [x, y, width, height] form.
+When include rectangles are given, only pixels inside them are compared. Exclude rectangles and the mask image then
+remove pixels from that set.
+"""
+
+import collections
+import json
+import os
+
+import numpy as np
+
+from . import golden_cache
+from . import golden_store
+from . import image_utils
+from . import screenshot_compare
+
+MASK_SUFFIX = '.mask'
+MASK_REGIONS_EXTENSION = '.json'
+
+ComparisonMask = collections.namedtuple('ComparisonMask', ['pixels', 'bounds', 'image_shape'])
+ComparisonMask.__doc__ = """
+The pixels of a screenshot that take part in a comparison.
+pixels: bool (height, width) array covering bounds, True for the pixels that are compared.
+bounds: (x, y, width, height) of the region of the full image that needs to be decoded.
+image_shape: (height, width) of the full image.
+"""
+
+
+class MaskError(Exception):
+    """
+    Raised when a comparison mask is malformed or excludes everything.
+    """
+
+    pass
+
+
+def _parse_regions(regions, source):
+    """
+    Validates a list of [x, y, width, height] rectangles.
+    :return: list of (x, y, width, height) tuples of ints.
+    """
+    parsed_regions = []
+    for region in regions or []:
+        if len(region) != 4 or not all(isinstance(value, int) and value >= 0 for value in region):
+            raise MaskError(f"{source}: expected [x, y, width, height] with non-negative integers, got {region}")
+        parsed_regions.append(tuple(region))
+    return parsed_regions
+
+
+def _fill_regions(pixels, regions, value):
+    for x, y, width, height in regions:
+        pixels[y:y + height, x:x + width] = value
+
+
+def get_mask_paths(golden_screenshot):
+    """
+    Returns the sidecar mask paths for a golden image. The mask image may also be stored as a .png.
+    :param golden_screenshot: Path to the golden image as referenced by the test.
+    :return: tuple of (mask image path, mask regions path), either of which may not exist.
+    """
+    base_path = os.path.splitext(golden_screenshot)[0] + MASK_SUFFIX
+    mask_image_path = golden_store.find_golden_file(base_path + golden_store.GOLDEN_IMAGE_EXTENSIONS[0])
+    return mask_image_path, base_path + MASK_REGIONS_EXTENSION
+
+
+def build_comparison_mask(image_shape, include_regions=None, exclude_regions=None, mask_image=None,
+                          window_size=screenshot_compare.DEFAULT_WINDOW_SIZE, alignment=1):
+    """
+    Combines rectangles and a mask image into the set of pixels to compare.
+    :param image_shape: (height, width) of the compared images.
+    :param include_regions: Optional list of [x, y, width, height] rectangles to restrict the comparison to.
+    :param exclude_regions: Optional list of [x, y, width, height] rectangles to ignore.
+    :param mask_image: Optional (height, width, channels) array, black pixels are ignored.
+    :param window_size: The QSSIM window size, at least one window must lie entirely on compared pixels.
+    :param alignment: The bounds are grown outwards to multiples of alignment, such as the coarsest pyramid factor.
+    :return: ComparisonMask, or None when every pixel is compared.
+    """
+    height, width = image_shape
+    include_regions = _parse_regions(include_regions, "include regions")
+    exclude_regions = _parse_regions(exclude_regions, "exclude regions")
+    if not include_regions and not exclude_regions and mask_image is None:
+        return None
+
+    pixels = np.ones((height, width), dtype=bool)
+    if include_regions:
+        pixels[:] = False
+        _fill_regions(pixels, include_regions, True)
+    _fill_regions(pixels, exclude_regions, False)
+    if mask_image is not None:
+        if mask_image.shape[:2] != (height, width):
+            raise MaskError(f"Mask image size {mask_image.shape[1::-1]} does not match the screenshot size "
+                            f"{(width, height)}")
+        pixels &= np.asarray(mask_image).any(axis=-1)
+
+    if not screenshot_compare.window_mask(pixels, window_size).any():
+        raise MaskError(f"The mask leaves no complete {window_size}px window to compare")
+    rows = np.flatnonzero(pixels.any(axis=1))
+    cols = np.flatnonzero(pixels.any(axis=0))
+    y = int(rows[0]) // alignment * alignment
+    x = int(cols[0]) // alignment * alignment
+    bottom = min(height, -(-(int(rows[-1]) + 1) // alignment) * alignment)
+    right = min(width, -(-(int(cols[-1]) + 1) // alignment) * alignment)
+    return ComparisonMask(pixels[y:bottom, x:right], (x, y, right - x, bottom - y), (height, width))
+
+
+def load_comparison_mask(golden_screenshot, image_shape, include_regions=None, exclude_regions=None,
+                         window_size=screenshot_compare.DEFAULT_WINDOW_SIZE, alignment=1, store=None):
+    """
+    Builds the comparison mask for a golden image from its sidecar mask files and the rectangles declared by the test.
+    :param golden_screenshot: Path to the golden image as referenced by the test.
+    :param image_shape: (height, width) of the golden image.
+    :param include_regions: Optional list of [x, y, width, height] rectangles declared by the test.
+    :param exclude_regions: Optional list of [x, y, width, height] rectangles declared by the test.
+    :param window_size: The QSSIM window size used by the comparison.
+    :param alignment: The bounds are grown outwards to multiples of alignment.
+    :param store: GoldenStore used to resolve mask images checked in as git-lfs pointers.
+    :return: ComparisonMask, or None when every pixel is compared.
+    """
+    mask_image_path, mask_regions_path = get_mask_paths(golden_screenshot)
+    include_regions = list(include_regions or [])
+    exclude_regions = list(exclude_regions or [])
+    if os.path.isfile(mask_regions_path):
+        try:
+            with open(mask_regions_path) as mask_regions_file:
+                mask_regions = json.load(mask_regions_file)
+        except ValueError as err:
+            raise MaskError(f"{mask_regions_path}: {err}") from err
+        include_regions += mask_regions.get('include', [])
+        exclude_regions += mask_regions.get('exclude', [])
+
+    mask_image = None
+    if os.path.isfile(mask_image_path):
+        store = store or golden_store.GoldenStore()
+        mask_image, _ = image_utils.read_image(store.resolve(mask_image_path).path)
+    return build_comparison_mask(image_shape, include_regions, exclude_regions, mask_image, window_size, alignment)
+
+
+def crop_golden_statistics(golden, mask, window_size=screenshot_compare.DEFAULT_WINDOW_SIZE):
+    """
+    Restricts golden statistics to the bounds of a comparison mask without recomputing them.
+    Pyramid levels are cropped too when the bounds are aligned to their factor. The prefilter signature describes the
+    whole image, so it is dropped.
+    :param golden: golden_cache.GoldenStatistics of the full golden image.
+    :param mask: ComparisonMask for the golden image.
+    :param window_size: The QSSIM window size the statistics were computed for.
+    :return: golden_cache.GoldenStatistics
+    """
+    x, y, width, height = mask.bounds
+
+    def crop_moments(moments, factor):
+        if moments is None:
+            return None
+        rows = slice(y // factor, (y + height) // factor - window_size + 1)
+        cols = slice(x // factor, (x + width) // factor - window_size + 1)
+        return tuple(moment[rows, cols] for moment in moments)
+
+    pyramid = {}
+    for factor, (level_image, level_moments) in golden.pyramid.items():
+        if x % factor or y % factor:
+            continue
+        pyramid[factor] = (
+            level_image[y // factor:(y + height) // factor, x // factor:(x + width) // factor],
+            crop_moments(level_moments, factor) if height // factor >= window_size and width // factor >= window_size
+            else None)
+    return golden_cache.GoldenStatistics(
+        golden.image[y:y + height, x:x + width], crop_moments(golden.moments, 1), golden.content_hash, pyramid, None)
@@ -0,0 +1,136 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+On-disk memo of screenshot comparison results.
+Results are keyed by the content hashes of the capture and the golden along with every parameter that affects the
+score, so re-running a failed test or re-scoring downloaded artifacts returns the previous result immediately.
+The memo is a SQLite database in the AtomTest cache directory, evicting the least recently used results by size.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+
+from .golden_cache import get_cache_dir
+from .screenshot_compare import result_from_dict, result_to_dict
+
+logger = logging.getLogger(__name__)
+
+MEMO_FILENAME = 'comparison_memo.sqlite3'
+DEFAULT_MEMO_MAX_SIZE = 16 * 1024 * 1024
+# Eviction trims the memo to this fraction of its maximum size, so it does not run again on every insert.
+EVICTION_TARGET_FRACTION = 0.9
+DATABASE_TIMEOUT = 30.0
+# Bump whenever the comparison algorithms change in a way that changes results, to invalidate memoized results.
+ALGORITHM_VERSION = 2
+
+
+def comparison_key(capture_hash, golden_hash, **parameters):
+    """
+    Builds the memo key of a comparison.
+    :param capture_hash: sha256 hex digest of the test screenshot file.
+    :param golden_hash: sha256 hex digest of the golden file.
+    :param parameters: Every JSON serializable parameter that affects the result, such as the mode and threshold.
+    :return: hex digest string
+    """
+    key_data = json.dumps(
+        [ALGORITHM_VERSION, capture_hash, golden_hash, parameters], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+
+def mask_digest(mask):
+    """
+    Hashes a comparison_mask.ComparisonMask for use as a comparison_key parameter.
+    :return: hex digest string
+    """
+    digest = hashlib.sha256(json.dumps([list(mask.bounds), list(mask.image_shape)]).encode('utf-8'))
+    digest.update(mask.pixels.tobytes())
+    return digest.hexdigest()
+
+
+class ComparisonMemo:
+    """
+    Least recently used memo of ComparisonResult by comparison_key, shared by every test process on the machine.
+    Database errors are logged and treated as misses, so a broken memo never fails a comparison.
+    """
+
+    def __init__(self, memo_path=None, max_size=DEFAULT_MEMO_MAX_SIZE):
+        self.memo_path = memo_path or os.path.join(get_cache_dir(), MEMO_FILENAME)
+        self.max_size = max_size
+        self._connection = None
+
+    def _connect(self):
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.memo_path), exist_ok=True)
+            self._connection = sqlite3.connect(self.memo_path, timeout=DATABASE_TIMEOUT, isolation_level=None)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, result TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)')
+        return self._connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def get(self, key):
+        """
+        Looks up a memoized result and marks it as recently used.
+        :param key: comparison_key of the comparison.
+        :return: ComparisonResult, or None on a miss.
+        """
+        try:
+            connection = self._connect()
+            row = connection.execute('SELECT result FROM results WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            connection.execute('UPDATE results SET last_used = ? WHERE key = ?', (time.time(), key))
+            return result_from_dict(json.loads(row[0]))
+        except (sqlite3.Error, OSError, ValueError, TypeError, KeyError) as err:
+            logger.warning(f"Failed to read the comparison memo '{self.memo_path}': {err}")
+            return None
+
+    def put(self, key, result):
+        """
+        Memoizes a result, evicting the least recently used results if the memo grows over max_size.
+        :param key: comparison_key of the comparison.
+        :param result: ComparisonResult to store.
+        :return: None
+        """
+        result_data = json.dumps(result_to_dict(result))
+        try:
+            connection = self._connect()
+            connection.execute(
+                'INSERT OR REPLACE INTO results (key, result, size, last_used) VALUES (?, ?, ?, ?)',
+                (key, result_data, len(result_data) + len(key), time.time()))
+            self._evict(connection)
+        except (sqlite3.Error, OSError) as err:
+            logger.warning(f"Failed to write the comparison memo '{self.memo_path}': {err}")
+
+    def _evict(self, connection):
+        total_size = connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total_size <= self.max_size:
+            return
+        excess_size = total_size - int(self.max_size * EVICTION_TARGET_FRACTION)
+        evicted_keys = []
+        for key, size in connection.execute('SELECT key, size FROM results ORDER BY last_used'):
+            evicted_keys.append((key,))
+            excess_size -= size
+            if excess_size <= 0:
+                break
+        connection.executemany('DELETE FROM results WHERE key = ?', evicted_keys)
+        logger.debug(f"Evicted {len(evicted_keys)} results from the comparison memo")
@@ -0,0 +1,89 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+One-shot converter from .ppm golden images to lossless .png golden images.
+PNG is only a storage format: decoding a 1080p PNG takes about 15 times as long as a PPM, so comparisons read the
+decoded pixels cached by golden_cache.load_golden_statistics, and each PNG golden is decoded once per content.
+Usage (from Gem/PythonTests): python -m Automated.atom_utils.convert_golden_images [--remove-ppm] [golden_images_dir]
+"""
+
+import argparse
+import glob
+import logging
+import os
+
+import numpy as np
+
+from . import golden_store
+from . import image_utils
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GOLDEN_IMAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'GoldenImages')
+
+
+def convert_golden_image(ppm_path, remove_ppm=False, store=None):
+    """
+    Converts a single .ppm golden image to a .png next to it and verifies that the round trip is lossless.
+    Git-lfs pointer stubs are resolved through the golden store first.
+    :param ppm_path: Path to the .ppm golden image.
+    :param remove_ppm: Delete the .ppm after a successful conversion.
+    :param store: GoldenStore used to resolve pointer stubs. Defaults to a GoldenStore in the user cache dir.
+    :return: tuple of (ppm size, png size) in bytes.
+    """
+    store = store or golden_store.GoldenStore()
+    source_path = store.resolve(ppm_path).path
+    pixels, maxval = image_utils.read_ppm(source_path)
+    png_path = os.path.splitext(ppm_path)[0] + '.png'
+    image_utils.write_png(png_path, pixels, maxval)
+
+    decoded_pixels, decoded_maxval = image_utils.read_png(png_path)
+    if decoded_maxval != maxval or not np.array_equal(decoded_pixels, pixels):
+        os.remove(png_path)
+        raise image_utils.ImageFormatError(f"{ppm_path}: PNG round trip is not lossless")
+
+    sizes = (os.path.getsize(source_path), os.path.getsize(png_path))
+    if remove_ppm:
+        os.remove(ppm_path)
+    return sizes
+
+
+def convert_golden_images(golden_images_dir, remove_ppm=False):
+    """
+    Converts every .ppm golden image under golden_images_dir to .png.
+    :param golden_images_dir: Root of the golden image tree.
+    :param remove_ppm: Delete each .ppm after a successful conversion.
+    :return: tuple of (total ppm size, total png size) in bytes.
+    """
+    store = golden_store.GoldenStore()
+    total_ppm_size = 0
+    total_png_size = 0
+    for ppm_path in sorted(glob.glob(os.path.join(golden_images_dir, '**', '*.ppm'), recursive=True)):
+        try:
+            ppm_size, png_size = convert_golden_image(ppm_path, remove_ppm, store)
+        except (image_utils.ImageFormatError, golden_store.GoldenStoreError) as err:
+            logger.error(f"Skipping '{ppm_path}': {err}")
+            continue
+        logger.info(f"Converted '{ppm_path}': {ppm_size} -> {png_size} bytes")
+        total_ppm_size += ppm_size
+        total_png_size += png_size
+    return total_ppm_size, total_png_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert .ppm golden images to lossless .png golden images.")
+    parser.add_argument('golden_images_dir', nargs='?', default=DEFAULT_GOLDEN_IMAGES_DIR,
+                        help="Root of the golden image tree. Defaults to the AtomTest GoldenImages directory.")
+    parser.add_argument('--remove-ppm', action='store_true', help="Delete each .ppm after a successful conversion.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    total_ppm_size, total_png_size = convert_golden_images(args.golden_images_dir, args.remove_ppm)
+    logger.info(f"Total: {total_ppm_size} -> {total_png_size} bytes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Failure artifacts for screenshot comparisons that can be triaged without a desktop diff tool.
+Both images are streamed one band of tiles at a time, so generating a report only needs memory for a band and for the
+downscaled outputs, never for another full resolution copy of either image.
+"""
+
+import collections
+import json
+import os
+
+import numpy as np
+
+from . import image_utils
+from . import screenshot_compare
+
+DEFAULT_REPORT_FACTOR = 4
+HEATMAP_SUFFIX = '_diff_heatmap.png'
+TILE_SCORES_SUFFIX = '_tile_scores.json'
+SIDE_BY_SIDE_SUFFIX = '_side_by_side.png'
+
+FailureReport = collections.namedtuple('FailureReport', ['heatmap', 'tile_scores', 'side_by_side', 'score'])
+FailureReport.__doc__ = """
+Paths of the artifacts written by write_failure_report.
+heatmap: PNG of the per-pixel color difference, downscaled by the report factor.
+tile_scores: JSON grid of the mean QSSIM of every tile.
+side_by_side: PNG of the golden, test and heatmap images next to each other, downscaled by the report factor.
+score: The exact mean QSSIM over every compared window.
+"""
+
+
+def _to_uint8(image):
+    return np.round(np.clip(image, 0.0, 1.0) * 255.0).astype(np.uint8)
+
+
+def _heat_colors(difference):
+    """
+    Maps differences in [0, 1] to a black-red-yellow-white ramp. The square root makes subtle differences visible.
+    """
+    intensity = np.sqrt(np.clip(difference, 0.0, 1.0))[..., np.newaxis] * 3.0
+    return _to_uint8(np.clip(intensity - np.array([0.0, 1.0, 2.0], dtype=np.float32), 0.0, 1.0))
+
+
+def _band_pixel_mask(mask, top, bottom, width):
+    """
+    Expands the part of a comparison_mask.ComparisonMask covering image rows [top, bottom) to full width.
+    """
+    band_mask = np.zeros((bottom - top, width), dtype=bool)
+    x, y, mask_width, mask_height = mask.bounds
+    overlap_top = max(top, y)
+    overlap_bottom = min(bottom, y + mask_height)
+    if overlap_top < overlap_bottom:
+        band_mask[overlap_top - top:overlap_bottom - top, x:x + mask_width] = \
+            mask.pixels[overlap_top - y:overlap_bottom - y]
+    return band_mask
+
+
+def load_failure_report(output_prefix, comparison_key):
+    """
+    Finds a previously written report for the same comparison, so re-triaging a failure does not redo the work.
+    :param output_prefix: Path prefix the report was written with.
+    :param comparison_key: The comparison_memo.comparison_key the report was written for.
+    :return: FailureReport, or None if no complete report for comparison_key exists.
+    """
+    report = FailureReport(
+        output_prefix + HEATMAP_SUFFIX, output_prefix + TILE_SCORES_SUFFIX, output_prefix + SIDE_BY_SIDE_SUFFIX, None)
+    try:
+        with open(report.tile_scores) as tile_scores_file:
+            tile_scores = json.load(tile_scores_file)
+    except (OSError, ValueError):
+        return None
+    if tile_scores.get('comparison_key') != comparison_key or \
+            not (os.path.isfile(report.heatmap) and os.path.isfile(report.side_by_side)):
+        return None
+    return report._replace(score=tile_scores.get('score'))
+
+
+def write_failure_report(golden_screenshot, test_screenshot, output_prefix=None,
+                         tile_size=screenshot_compare.DEFAULT_TILE_SIZE, window=screenshot_compare.DEFAULT_WINDOW,
+                         window_size=screenshot_compare.DEFAULT_WINDOW_SIZE, factor=DEFAULT_REPORT_FACTOR, mask=None,
+                         comparison_key=None):
+    """
+    Writes a diff heatmap, a per-tile score grid and a side-by-side thumbnail for a pair of screenshots.
+    :param golden_screenshot: Path to the materialized golden image.
+    :param test_screenshot: Path to the test screenshot.
+    :param output_prefix: Path prefix for the artifacts. Defaults to the test screenshot path without its extension.
+    :param tile_size: Width and height of a tile, in QSSIM windows. Must be a multiple of factor.
+    :param window: WINDOW_GAUSSIAN, WINDOW_BOX or WINDOW_INTEGRAL.
+    :param window_size: Width of the local statistics window in pixels.
+    :param factor: Downscaling factor of the heatmap and thumbnails.
+    :param mask: Optional comparison_mask.ComparisonMask, masked tiles are reported as null and masked pixels as black.
+    :param comparison_key: Optional comparison_memo.comparison_key recorded in the tile scores for load_failure_report.
+    :return: FailureReport
+    """
+    if tile_size % factor:
+        raise ValueError(f"Tile size {tile_size} is not a multiple of the report factor {factor}")
+    golden_pixels, golden_maxval = image_utils.read_image(golden_screenshot)
+    test_pixels, test_maxval = image_utils.downsample_to_shape(
+        *image_utils.read_image(test_screenshot), golden_pixels.shape[:2])
+    height, width = golden_pixels.shape[:2]
+    if min(height, width) < window_size:
+        raise ValueError(f"Images of size {(width, height)} are smaller than the {window_size}px window")
+
+    map_shape = (height - window_size + 1, width - window_size + 1)
+    col_starts = np.arange(0, map_shape[1], tile_size)
+    tile_rows = []
+    score_sum = 0.0
+    window_count = 0
+    golden_thumbnail_bands = []
+    test_thumbnail_bands = []
+    heatmap_bands = []
+    for y in range(0, map_shape[0], tile_size):
+        last_band = y + tile_size >= map_shape[0]
+        bottom = height if last_band else y + tile_size + window_size - 1
+        golden_band = image_utils.to_float_image(golden_pixels[y:bottom], golden_maxval)
+        test_band = image_utils.to_float_image(test_pixels[y:bottom], test_maxval)
+        band_mask = None if mask is None else _band_pixel_mask(mask, y, bottom, width)
+
+        score_map = screenshot_compare.qssim_map(golden_band, test_band, window, window_size)
+        if band_mask is None:
+            compared_windows = np.ones(score_map.shape, dtype=bool)
+        else:
+            compared_windows = screenshot_compare.window_mask(band_mask, window_size)
+            score_map = np.where(compared_windows, score_map, 0.0)
+        tile_sums = np.add.reduceat(score_map, col_starts, axis=1, dtype=np.float64).sum(axis=0)
+        tile_counts = np.add.reduceat(compared_windows, col_starts, axis=1, dtype=np.int64).sum(axis=0)
+        tile_rows.append([
+            round(float(tile_sum) / int(tile_count), 6) if tile_count else None
+            for tile_sum, tile_count in zip(tile_sums, tile_counts)])
+        score_sum += float(tile_sums.sum())
+        window_count += int(tile_counts.sum())
+
+        # Thumbnails cover the image rows of this band that the next band does not, so the bands tile the image.
+        rows = bottom - y if last_band else tile_size
+        difference = np.abs(golden_band[:rows] - test_band[:rows]).mean(axis=-1, keepdims=True)
+        if band_mask is not None:
+            difference *= band_mask[:rows, :, np.newaxis]
+        golden_thumbnail_bands.append(_to_uint8(image_utils.downsample_area(golden_band[:rows], factor)))
+        test_thumbnail_bands.append(_to_uint8(image_utils.downsample_area(test_band[:rows], factor)))
+        heatmap_bands.append(_heat_colors(image_utils.downsample_area(difference, factor)[..., 0]))
+
+    output_prefix = output_prefix or os.path.splitext(test_screenshot)[0]
+    report = FailureReport(
+        output_prefix + HEATMAP_SUFFIX, output_prefix + TILE_SCORES_SUFFIX, output_prefix + SIDE_BY_SIDE_SUFFIX,
+        score_sum / window_count if window_count else None)
+
+    heatmap = np.concatenate(heatmap_bands)
+    image_utils.write_png(report.heatmap, heatmap)
+    image_utils.write_png(report.side_by_side, np.concatenate(
+        [np.concatenate(golden_thumbnail_bands), np.concatenate(test_thumbnail_bands), heatmap], axis=1))
+    with open(report.tile_scores, 'w') as tile_scores_file:
+        json.dump({
+            'comparison_key': comparison_key,
+            'golden_screenshot': golden_screenshot,
+            'test_screenshot': test_screenshot,
+            'score': report.score,
+            'window': window,
+            'window_size': window_size,
+            'tile_size': tile_size,
+            'columns': len(col_starts),
+            'rows': len(tile_rows),
+            'scores': tile_rows,
+        }, tile_scores_file, indent=4)
+    return report
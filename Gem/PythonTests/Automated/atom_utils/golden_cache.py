@@ -0,0 +1,348 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Sidecar cache for the golden image half of the screenshot comparison statistics.
+Entries are keyed by the sha256 of the golden file, so they are invalidated automatically when a golden changes.
+Binary PPM goldens are memory mapped directly. The decoded integer pixels of other goldens, such as PNG, are cached as
+well, so they are decoded only on a cache miss and load like a PPM of the same size afterwards. The sha256 of a golden
+is remembered by its path, size and modification time, so an unchanged golden is hashed only once.
+Entries are marked as used whenever they are loaded, and the least recently used ones are evicted once the cache grows
+over its maximum size.
+"""
+
+import collections
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from . import image_utils
+from . import screenshot_compare
+from . import screenshot_prefilter
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_ENV_VAR = 'ATOMTEST_CACHE_DIR'
+GOLDEN_STATISTICS_SUBFOLDER = 'golden_statistics'
+CONTENT_HASHES_SUBFOLDER = 'content_hashes'
+HASH_CHUNK_SIZE = 1024 * 1024
+DEFAULT_GOLDEN_STATISTICS_MAX_SIZE = 4 * 1024 * 1024 * 1024
+# Eviction trims the cache to this fraction of its maximum size, so it does not run again on every cache miss.
+EVICTION_TARGET_FRACTION = 0.9
+
+GoldenStatistics = collections.namedtuple(
+    'GoldenStatistics', ['image', 'moments', 'content_hash', 'pyramid', 'signature'])
+GoldenStatistics.__doc__ = """
+Golden image data ready for comparison.
+image: float32 (height, width, 3) array normalized to [0, 1].
+moments: screenshot_compare.image_moments of the image, memory mapped from the cache.
+content_hash: sha256 hex digest of the golden file.
+pyramid: dict of downsampling factor -> (downsampled image, its image_moments), as used by compare_pyramid.
+signature: screenshot_prefilter.ImageSignature used to quick-reject broken captures, or None when not applicable.
+"""
+
+
+def get_cache_dir():
+    """
+    Returns the root directory for AtomTest comparison caches.
+    Uses the ATOMTEST_CACHE_DIR environment variable when set, otherwise the per-user cache directory.
+    :return: path to the cache directory, which may not exist yet.
+    """
+    cache_dir = os.environ.get(CACHE_DIR_ENV_VAR)
+    if cache_dir:
+        return cache_dir
+    if os.name == 'nt':
+        user_cache_dir = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+    else:
+        user_cache_dir = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(user_cache_dir, 'O3DE', 'AtomTest')
+
+
+def file_content_hash(file_path):
+    """
+    Computes the sha256 hex digest of a file.
+    :param file_path: Path to the file to hash.
+    :return: hex digest string.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as hashed_file:
+        for chunk in iter(lambda: hashed_file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached_content_hash(file_path, cache_dir=None):
+    """
+    Returns the file_content_hash of a file, remembered by the path, size and modification time of the file.
+    :param file_path: Path to the file to hash.
+    :param cache_dir: Root cache directory. Defaults to get_cache_dir().
+    :return: hex digest string.
+    """
+    file_stat = os.stat(file_path)
+    file_state = f"{os.path.abspath(file_path)}|{file_stat.st_size}|{file_stat.st_mtime_ns}"
+    hash_path = os.path.join(
+        cache_dir or get_cache_dir(), GOLDEN_STATISTICS_SUBFOLDER, CONTENT_HASHES_SUBFOLDER,
+        hashlib.sha256(file_state.encode('utf-8')).hexdigest())
+    try:
+        with open(hash_path, 'r', encoding='ascii') as hash_file:
+            content_hash = hash_file.read()
+        if len(content_hash) == hashlib.sha256().digest_size * 2:
+            return content_hash
+    except (OSError, ValueError):
+        pass
+
+    content_hash = file_content_hash(file_path)
+    try:
+        os.makedirs(os.path.dirname(hash_path), exist_ok=True)
+        file_handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(hash_path), suffix='.tmp')
+        try:
+            with os.fdopen(file_handle, 'w', encoding='ascii') as temp_file:
+                temp_file.write(content_hash)
+            os.replace(temp_path, hash_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    except OSError as err:
+        logger.warning(f"Failed to cache the content hash of '{file_path}': {err}")
+    return content_hash
+
+
+def save_array_atomic(file_path, array):
+    """
+    Saves a numpy array as .npy so that concurrent readers never observe a partially written file.
+    :param file_path: Destination .npy path.
+    :param array: The array to save.
+    :return: None
+    """
+    file_dir = os.path.dirname(file_path)
+    os.makedirs(file_dir, exist_ok=True)
+    file_handle, temp_path = tempfile.mkstemp(dir=file_dir, suffix='.tmp')
+    try:
+        with os.fdopen(file_handle, 'wb') as temp_file:
+            np.save(temp_file, array)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _load_or_compute(array_paths, compute_arrays, description, written_paths):
+    """
+    Memory maps a set of cached arrays, or computes and caches them if any of them is missing.
+    Cache write failures are logged and the computed arrays are returned anyway.
+    :param array_paths: list of .npy paths, one per array.
+    :param compute_arrays: function returning the arrays in the same order as array_paths.
+    :param description: Text describing the arrays for log messages.
+    :param written_paths: list the paths of newly cached arrays are appended to.
+    :return: tuple of arrays
+    """
+    try:
+        return tuple(np.load(array_path, mmap_mode='r') for array_path in array_paths)
+    except (OSError, ValueError):
+        pass
+
+    arrays = tuple(compute_arrays())
+    try:
+        for array_path, array in zip(array_paths, arrays):
+            save_array_atomic(array_path, array)
+            written_paths.append(array_path)
+        logger.debug(f"Cached {description} in '{os.path.dirname(array_paths[0])}'")
+    except OSError as err:
+        logger.warning(f"Failed to cache {description}: {err}")
+    return arrays
+
+
+def _signature_arrays(signature):
+    """
+    Converts an ImageSignature to the arrays stored in the cache, an empty phash array standing for None.
+    """
+    phash = [] if signature.phash is None else [signature.phash]
+    return signature.histogram, np.array(phash, dtype=np.uint64)
+
+
+def _directory_size(directory):
+    """
+    Returns the total size in bytes of the files directly inside a directory.
+    """
+    with os.scandir(directory) as dir_entries:
+        return sum(dir_entry.stat().st_size for dir_entry in dir_entries if dir_entry.is_file())
+
+
+def _prune_content_hashes(statistics_dir, live_hashes):
+    """
+    Removes remembered content hashes that no longer refer to a cache entry.
+    :param statistics_dir: The golden statistics cache directory.
+    :param live_hashes: set of the content hashes that still have a cache entry.
+    :return: None
+    """
+    hashes_dir = os.path.join(statistics_dir, CONTENT_HASHES_SUBFOLDER)
+    if not os.path.isdir(hashes_dir):
+        return
+    with os.scandir(hashes_dir) as dir_entries:
+        for dir_entry in dir_entries:
+            try:
+                with open(dir_entry.path, 'r', encoding='ascii') as hash_file:
+                    if hash_file.read() in live_hashes:
+                        continue
+                os.remove(dir_entry.path)
+            except (OSError, ValueError):
+                pass
+
+
+def evict_golden_statistics(cache_dir=None, max_size=DEFAULT_GOLDEN_STATISTICS_MAX_SIZE, keep=()):
+    """
+    Evicts the least recently used golden statistics entries if the cache has grown over max_size, along with the
+    remembered content hashes that refer to them.
+    Entries that cannot be removed, such as ones memory mapped by another process on Windows, are skipped.
+    :param cache_dir: Root cache directory. Defaults to get_cache_dir().
+    :param max_size: Maximum total size in bytes of the cached arrays.
+    :param keep: Content hashes of entries that must not be evicted, such as the ones being loaded.
+    :return: list of the content hashes of the evicted entries.
+    """
+    statistics_dir = os.path.join(cache_dir or get_cache_dir(), GOLDEN_STATISTICS_SUBFOLDER)
+    entries = []
+    with os.scandir(statistics_dir) as dir_entries:
+        for dir_entry in dir_entries:
+            if dir_entry.is_dir() and dir_entry.name != CONTENT_HASHES_SUBFOLDER:
+                entries.append((dir_entry.stat().st_mtime_ns, dir_entry.name, _directory_size(dir_entry.path)))
+    total_size = sum(size for _, _, size in entries)
+    if total_size <= max_size:
+        return []
+
+    excess_size = total_size - int(max_size * EVICTION_TARGET_FRACTION)
+    evicted_hashes = []
+    for _, content_hash, size in sorted(entries):
+        if excess_size <= 0:
+            break
+        if content_hash in keep:
+            continue
+        try:
+            shutil.rmtree(os.path.join(statistics_dir, content_hash))
+        except OSError as err:
+            logger.debug(f"Failed to evict golden statistics '{content_hash}': {err}")
+            continue
+        evicted_hashes.append(content_hash)
+        excess_size -= size
+    _prune_content_hashes(
+        statistics_dir, {content_hash for _, content_hash, _ in entries} - set(evicted_hashes))
+    logger.debug(f"Evicted {len(evicted_hashes)} entries from the golden statistics cache")
+    return evicted_hashes
+
+
+def _mark_used(entry_dir):
+    """
+    Marks a cache entry as used now, which orders entries for eviction.
+    """
+    try:
+        os.utime(entry_dir)
+    except OSError:
+        pass
+
+
+def _evict_after_write(cache_dir, max_size, content_hash, written_paths):
+    """
+    Evicts old entries if arrays were just written to the cache, logging instead of failing the load on errors.
+    """
+    if not written_paths:
+        return
+    try:
+        evict_golden_statistics(cache_dir, max_size, keep=(content_hash,))
+    except OSError as err:
+        logger.warning(f"Failed to evict old golden statistics: {err}")
+
+
+def _load_golden_pixels(golden_screenshot, entry_dir, written_paths):
+    """
+    Loads the integer pixels of a golden, memory mapping binary PPM files and the cached pixels of other formats.
+    :return: tuple of (pixels, maxval)
+    """
+    with open(golden_screenshot, 'rb') as golden_file:
+        if golden_file.read(len(image_utils.PPM_BINARY_MAGIC)) == image_utils.PPM_BINARY_MAGIC:
+            return image_utils.read_ppm(golden_screenshot)
+
+    # PNG and Pillow decoded pixels always use the full range of their sample type, so the dtype gives the maxval.
+    pixels, = _load_or_compute(
+        [os.path.join(entry_dir, 'pixels.npy')], lambda: [image_utils.read_image(golden_screenshot)[0]],
+        f"decoded pixels of golden image '{golden_screenshot}'", written_paths)
+    return pixels, np.iinfo(pixels.dtype).max
+
+
+def load_golden_image(golden_screenshot, cache_dir=None, content_hash=None,
+                      max_size=DEFAULT_GOLDEN_STATISTICS_MAX_SIZE):
+    """
+    Loads a golden image, decoding formats other than binary PPM only on a cache miss.
+    :param golden_screenshot: Path to the golden image.
+    :param cache_dir: Root cache directory. Defaults to get_cache_dir().
+    :param content_hash: The sha256 of the golden file if already known, such as the oid of a golden store object.
+    :param max_size: Maximum size in bytes of the golden statistics cache, see evict_golden_statistics.
+    :return: float32 (height, width, 3) array normalized to [0, 1].
+    """
+    cache_dir = cache_dir or get_cache_dir()
+    content_hash = content_hash or cached_content_hash(golden_screenshot, cache_dir)
+    entry_dir = os.path.join(cache_dir, GOLDEN_STATISTICS_SUBFOLDER, content_hash)
+    _mark_used(entry_dir)
+    written_paths = []
+    image = image_utils.to_float_image(*_load_golden_pixels(golden_screenshot, entry_dir, written_paths))
+    _evict_after_write(cache_dir, max_size, content_hash, written_paths)
+    return image
+
+
+def load_golden_statistics(golden_screenshot, window=screenshot_compare.DEFAULT_WINDOW,
+                           window_size=screenshot_compare.DEFAULT_WINDOW_SIZE, pyramid_factors=(), cache_dir=None,
+                           content_hash=None, max_size=DEFAULT_GOLDEN_STATISTICS_MAX_SIZE):
+    """
+    Loads a golden image along with its cached comparison statistics, computing and storing them on a cache miss.
+    :param golden_screenshot: Path to the golden image.
+    :param window: The QSSIM window the statistics are computed for.
+    :param window_size: The QSSIM window size the statistics are computed for.
+    :param pyramid_factors: Downsampling factors to also load pyramid levels and their statistics for.
+    :param cache_dir: Root cache directory. Defaults to get_cache_dir().
+    :param content_hash: The sha256 of the golden file if already known, such as the oid of a golden store object.
+    :param max_size: Maximum size in bytes of the golden statistics cache, see evict_golden_statistics.
+    :return: GoldenStatistics
+    """
+    cache_dir = cache_dir or get_cache_dir()
+    content_hash = content_hash or cached_content_hash(golden_screenshot, cache_dir)
+    entry_dir = os.path.join(cache_dir, GOLDEN_STATISTICS_SUBFOLDER, content_hash)
+    window_suffix = f"{window}_{window_size}"
+    _mark_used(entry_dir)
+    written_paths = []
+
+    image = image_utils.to_float_image(*_load_golden_pixels(golden_screenshot, entry_dir, written_paths))
+
+    moments = _load_or_compute(
+        [os.path.join(entry_dir, f"{name}_{window_suffix}.npy") for name in ('mean', 'mean_sq')],
+        lambda: screenshot_compare.image_moments(image, window, window_size),
+        f"golden statistics for '{golden_screenshot}'", written_paths)
+
+    pyramid = {}
+    for factor in pyramid_factors:
+        level_image, = _load_or_compute(
+            [os.path.join(entry_dir, f"pyramid_{factor}.npy")],
+            lambda: [image_utils.downsample_area(image, factor)],
+            f"1/{factor} pyramid level for '{golden_screenshot}'", written_paths)
+        level_moments = None
+        if min(level_image.shape[:2]) >= window_size:
+            level_moments = _load_or_compute(
+                [os.path.join(entry_dir, f"{name}_{window_suffix}_pyramid_{factor}.npy")
+                 for name in ('mean', 'mean_sq')],
+                lambda: screenshot_compare.image_moments(np.asarray(level_image), window, window_size),
+                f"1/{factor} pyramid level statistics for '{golden_screenshot}'", written_paths)
+        pyramid[factor] = (level_image, level_moments)
+
+    histogram, phash = _load_or_compute(
+        [os.path.join(entry_dir, f"prefilter_{name}.npy") for name in ('histogram', 'phash')],
+        lambda: _signature_arrays(screenshot_prefilter.compute_signature(image, 1.0)),
+        f"prefilter signature for '{golden_screenshot}'", written_paths)
+    signature = screenshot_prefilter.ImageSignature(
+        image.shape[:2], np.asarray(histogram), int(phash[0]) if len(phash) else None)
+
+    _evict_after_write(cache_dir, max_size, content_hash, written_paths)
+    return GoldenStatistics(image, moments, content_hash, pyramid, signature)
@@ -0,0 +1,229 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Content-addressed store for golden images that are checked in as git-lfs pointer stubs.
+Objects are stored by their sha256 oid, so identical images used by several tests are fetched and stored once,
+and only the goldens a test actually compares against are hydrated.
+Level files are pointer stubs as well, but the Editor and launcher load them from the project, so hydrate_levels
+replaces the stubs of the levels a test opens with their content before the application starts.
+"""
+
+import collections
+import concurrent.futures
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+
+from .golden_cache import get_cache_dir, HASH_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+GOLDEN_STORE_SUBFOLDER = 'golden_store'
+LFS_POINTER_PREFIX = b'version https://git-lfs.github.com/spec/v1'
+LFS_POINTER_MAX_SIZE = 1024
+LFS_OID_PREFIX = 'sha256:'
+DEFAULT_HYDRATION_WORKERS = 8
+# Goldens are referenced by their .ppm path, a compressed .png with the same name is used when the .ppm is absent.
+GOLDEN_IMAGE_EXTENSIONS = ['.ppm', '.png']
+LEVEL_FILE_EXTENSIONS = ('.ly', '.pak')
+
+LfsPointer = collections.namedtuple('LfsPointer', ['oid', 'size'])
+ResolvedGolden = collections.namedtuple('ResolvedGolden', ['path', 'content_hash'])
+ResolvedGolden.__doc__ = """
+A golden image that is available on disk.
+path: Path to the golden content, either the original file or an object in the store.
+content_hash: sha256 hex digest of the content if it is already known, otherwise None.
+"""
+
+
+class GoldenStoreError(Exception):
+    """
+    Raised when a golden image cannot be materialized.
+    """
+
+    pass
+
+
+def read_lfs_pointer(file_path):
+    """
+    Parses a git-lfs pointer stub.
+    :param file_path: Path to the file to check.
+    :return: LfsPointer if the file is a pointer stub, otherwise None.
+    """
+    if os.path.getsize(file_path) > LFS_POINTER_MAX_SIZE:
+        return None
+    with open(file_path, 'rb') as pointer_file:
+        data = pointer_file.read()
+    if not data.startswith(LFS_POINTER_PREFIX):
+        return None
+
+    fields = dict(line.split(' ', 1) for line in data.decode('utf-8').splitlines() if ' ' in line)
+    oid = fields.get('oid', '')
+    if not oid.startswith(LFS_OID_PREFIX) or not fields.get('size', '').isdigit():
+        return None
+    return LfsPointer(oid[len(LFS_OID_PREFIX):], int(fields['size']))
+
+
+def find_golden_file(golden_path):
+    """
+    Finds the file holding a golden image, accepting any of GOLDEN_IMAGE_EXTENSIONS in place of the given extension.
+    :param golden_path: Path to the golden image as referenced by the test.
+    :return: The path of the existing golden file, or golden_path if no alternative exists.
+    """
+    if os.path.exists(golden_path):
+        return golden_path
+    base_path = os.path.splitext(golden_path)[0]
+    for extension in GOLDEN_IMAGE_EXTENSIONS:
+        if os.path.exists(base_path + extension):
+            return base_path + extension
+    return golden_path
+
+
+class GoldenStore:
+    """
+    Resolves golden image paths to materialized content, hydrating git-lfs pointer stubs on demand.
+    """
+
+    def __init__(self, store_dir=None):
+        self.store_dir = store_dir or os.path.join(get_cache_dir(), GOLDEN_STORE_SUBFOLDER)
+
+    def object_path(self, oid):
+        return os.path.join(self.store_dir, 'objects', oid[:2], oid)
+
+    def resolve(self, golden_path):
+        """
+        Returns the materialized content for a golden image, fetching it into the store if it is a pointer stub.
+        :param golden_path: Path to the golden image in the working tree.
+        :return: ResolvedGolden
+        """
+        golden_path = find_golden_file(golden_path)
+        pointer = read_lfs_pointer(golden_path)
+        if pointer is None:
+            return ResolvedGolden(golden_path, None)
+
+        object_path = self.object_path(pointer.oid)
+        if not os.path.isfile(object_path):
+            self._fetch(golden_path, pointer, object_path)
+        return ResolvedGolden(object_path, pointer.oid)
+
+    def materialize(self, golden_paths, max_workers=DEFAULT_HYDRATION_WORKERS, in_place=False):
+        """
+        Resolves a set of golden images, fetching missing objects in parallel. Each unique object is fetched once.
+        :param golden_paths: Paths to golden images in the working tree.
+        :param max_workers: Maximum number of concurrent fetches.
+        :param in_place: Also replace pointer stubs in the working tree with their content, for files such as levels
+            that are loaded from their checked-out location.
+        :return: dict of golden path -> ResolvedGolden
+        """
+        golden_paths = list(dict.fromkeys(golden_paths))
+        paths_by_oid = {}
+        resolved = {}
+        for golden_path in golden_paths:
+            golden_file = find_golden_file(golden_path)
+            pointer = read_lfs_pointer(golden_file)
+            if pointer is None:
+                resolved[golden_path] = ResolvedGolden(golden_file, None)
+            else:
+                paths_by_oid.setdefault(pointer.oid, []).append(golden_path)
+
+        if paths_by_oid:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    oid: executor.submit(self.resolve, paths[0]) for oid, paths in paths_by_oid.items()}
+                for oid, future in futures.items():
+                    for golden_path in paths_by_oid[oid]:
+                        resolved[golden_path] = future.result()
+
+        if in_place:
+            for golden_path, resolved_golden in resolved.items():
+                golden_file = find_golden_file(golden_path)
+                if resolved_golden.path != golden_file:
+                    _replace_with_copy(resolved_golden.path, golden_file)
+                    resolved[golden_path] = ResolvedGolden(golden_file, resolved_golden.content_hash)
+        return {golden_path: resolved[golden_path] for golden_path in golden_paths}
+
+    def _fetch(self, golden_path, pointer, object_path):
+        """
+        Downloads the content of a pointer stub with 'git lfs smudge' and stores it after verifying its oid.
+        """
+        logger.info(f"Fetching golden image '{golden_path}' ({pointer.size} bytes) into the golden store")
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        file_handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(object_path), suffix='.tmp')
+        try:
+            digest = hashlib.sha256()
+            with os.fdopen(file_handle, 'wb') as object_file, open(golden_path, 'rb') as pointer_file, \
+                    tempfile.TemporaryFile() as error_file:
+                process = subprocess.Popen(
+                    ['git', 'lfs', 'smudge', '--', os.path.basename(golden_path)],
+                    cwd=os.path.dirname(os.path.abspath(golden_path)),
+                    stdin=pointer_file, stdout=subprocess.PIPE, stderr=error_file)
+                for chunk in iter(lambda: process.stdout.read(HASH_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    object_file.write(chunk)
+                process.stdout.close()
+                process.wait()
+                error_file.seek(0)
+                error_output = error_file.read().decode(errors='replace')
+            if process.returncode != 0:
+                raise GoldenStoreError(
+                    f"'git lfs smudge' failed for golden image '{golden_path}': {error_output}")
+            if digest.hexdigest() != pointer.oid:
+                raise GoldenStoreError(
+                    f"Fetched content for golden image '{golden_path}' does not match its lfs oid {pointer.oid}")
+            os.replace(temp_path, object_path)
+        except FileNotFoundError as err:
+            raise GoldenStoreError(
+                f"Golden image '{golden_path}' is a git-lfs pointer and git-lfs is not available: {err}. "
+                "Install git-lfs or run 'git lfs pull'.") from err
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+def _replace_with_copy(source_path, destination_path):
+    # Copy next to the destination first, so a stub is never left half overwritten.
+    file_handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(destination_path)), suffix='.tmp')
+    os.close(file_handle)
+    try:
+        shutil.copyfile(source_path, temp_path)
+        os.replace(temp_path, destination_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def find_level_files(levels_directory, level_name):
+    """
+    Lists the files of a level that can be checked in as git-lfs pointer stubs.
+    :param levels_directory: Path to the Levels directory of the project.
+    :param level_name: Name of the level, which is also the name of its directory.
+    :return: list of paths, empty if the level does not exist, such as a level the test creates.
+    """
+    level_directory = os.path.join(levels_directory, level_name)
+    if not os.path.isdir(level_directory):
+        return []
+    return sorted(
+        os.path.join(level_directory, file_name) for file_name in os.listdir(level_directory)
+        if os.path.splitext(file_name)[1].lower() in LEVEL_FILE_EXTENSIONS)
+
+
+def hydrate_levels(levels_directory, level_names, store=None):
+    """
+    Replaces the git-lfs pointer stubs of the given levels with their content, fetching missing objects into the store.
+    :param levels_directory: Path to the Levels directory of the project.
+    :param level_names: Names of the levels the test opens. Names without a level directory are skipped.
+    :param store: GoldenStore to fetch through, defaults to the store in the AtomTest cache directory.
+    :return: dict of level file path -> ResolvedGolden
+    """
+    level_files = [
+        level_file for level_name in dict.fromkeys(level_names)
+        for level_file in find_level_files(levels_directory, level_name)]
+    if not level_files:
+        return {}
+    return (store or GoldenStore()).materialize(level_files, in_place=True)
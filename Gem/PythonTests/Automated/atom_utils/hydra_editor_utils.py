@@ -19,10 +19,12 @@ import azlmbr.camera as camera
 import azlmbr.object
 from azlmbr.entity import EntityType
 
+from Automated.atom_utils import step_timeline
 from Automated.atom_utils.automated_test_utils import TestHelper as helper
-from Automated.atom_utils.screenshot_utils import ScreenshotHelper
+from Automated.atom_utils.screenshot_utils import ScreenshotHelper, wait_for_viewport_size
 
 
+@step_timeline.traced
 def find_entity_by_name(entity_name):
     """
     Gets an entity ID from the entity with the given entity_name
@@ -52,6 +54,7 @@ def get_component_type_id(component_name, entity_type=entity.EntityType().Game):
     return component_type_id
 
 
+@step_timeline.traced
 def add_level_component(component_name):
     """
     Adds the specified component to the Level Inspector
@@ -69,6 +72,7 @@ def add_level_component(component_name):
     return level_component
 
 
+@step_timeline.traced
 def add_component(componentName, entityId, entity_type=entity.EntityType().Game):
     """
     Given a component name, finds component TypeId, adds to given entity, and verifies successful add/active state.
@@ -92,6 +96,7 @@ def add_component(componentName, entityId, entity_type=entity.EntityType().Game)
     return componentOutcome.GetValue()[0]
 
 
+@step_timeline.traced
 def remove_component(component_name, entity_id):
     """
     Removes the specified component from the specified entity.
@@ -205,6 +210,7 @@ class Entity:
         self.parent_id = None
         self.parent_name = None
 
+    @step_timeline.traced
     def create_entity(self, entity_position=None, components=[], parent_id=entity.EntityId()):
         if entity_position is None:
             self.id = editor.ToolsApplicationRequestBus(bus.Broadcast, 'CreateNewEntity', parent_id)
@@ -219,10 +225,12 @@ class Entity:
             for component in components:
                 self.add_component(component)
 
+    @step_timeline.traced
     def add_component(self, component):
         new_component = add_component(component, self.id)
         self.components.append(new_component)
 
+    @step_timeline.traced
     def remove_component(self, component):
         removed_component = remove_component(component, self.id)
         if removed_component is not None:
@@ -242,6 +250,7 @@ class Entity:
         editor.EditorEntityAPIBus(bus.Event, "SetParent", self.id, parent_entity_obj.id)
         self.get_parent_info()
 
+    @step_timeline.traced
     def get_set_test(self, component_index: int, path: str, value: object, expected_result: object = None) -> bool:
         """
         Used to set and validate changes in component values
@@ -287,6 +296,7 @@ class Entity:
         return compare_values(new_value, expected_result, f"{self.name} {path}")
 
 
+@step_timeline.traced
 def get_set_test(entity: object, component_index: int, path: str, value: object) -> bool:
     """
     Used to set and validate changes in component values
@@ -297,6 +307,7 @@ def get_set_test(entity: object, component_index: int, path: str, value: object)
     return entity.get_set_test(component_index, path, value)
 
 
+@step_timeline.traced
 def get_set_property_test(
     ly_object: object, attribute_name: str, value: object, expected_result: object = None
 ) -> bool:
@@ -382,6 +393,7 @@ def get_asset_by_path(path):
     return asset.AssetCatalogRequestBus(bus.Broadcast, "GetAssetIdByPath", path, math.Uuid(), False)
 
 
+@step_timeline.traced
 def delete_all_existing_entities():
     search_filter = azlmbr.entity.SearchFilter()
     all_entities = entity.SearchBus(azlmbr.bus.Broadcast, "SearchEntities", search_filter)
@@ -479,6 +491,7 @@ def get_component_type_id_map(component_name_list):
     return type_ids_by_component
 
 
+@step_timeline.traced
 def helper_create_entity_with_mesh(path_to_mesh, offset=azlmbr.math.Vector3(0.0,0.0,0.0), entity_name='NewEntity'):
     # Create a new Entity at the root level
     myEntityId = editor.ToolsApplicationRequestBus(azlmbr.bus.Broadcast, 'CreateNewEntity', entity.EntityId())
@@ -519,6 +532,7 @@ def helper_create_entity_with_mesh(path_to_mesh, offset=azlmbr.math.Vector3(0.0,
     return myEntityId
 
 
+@step_timeline.traced
 def initial_viewport_setup(screen_width, screen_height):
     """
     Initial viewport setup for a test to keep screenshots consistent.
@@ -528,13 +542,7 @@ def initial_viewport_setup(screen_width, screen_height):
     """
     general.set_viewport_size(screen_width, screen_height)
     general.update_viewport()
-    helper.wait_for_condition(
-        function=lambda: helper.isclose(a=general.get_viewport_size().x, b=screen_width, rel_tol=0.1)
-        and helper.isclose(a=general.get_viewport_size().y, b=screen_height, rel_tol=0.1),
-        timeout_in_seconds=4.0
-    )
-    result = helper.isclose(a=general.get_viewport_size().x, b=screen_width, rel_tol=0.1) and helper.isclose(
-        a=general.get_viewport_size().y, b=screen_height, rel_tol=0.1)
+    result = wait_for_viewport_size(screen_width, screen_height, rel_tol=0.1)
     general.log(general.get_viewport_size().x)
     general.log(general.get_viewport_size().y)
     general.log(general.get_viewport_size().z)
@@ -543,6 +551,7 @@ def initial_viewport_setup(screen_width, screen_height):
     general.run_console("r_DisplayInfo = 0")
 
 
+@step_timeline.traced
 def after_level_load():
     """Function to call after creating/opening a level to ensure it loads."""
     # Give everything a second to initialize.
@@ -567,6 +576,7 @@ def after_level_load():
     return True
 
 
+@step_timeline.traced
 def create_basic_atom_level(level_name):
     """
     Creates a new level inside the Editor matching level_name & adds the following:
@@ -691,6 +701,7 @@ def create_basic_atom_level(level_name):
     be_this_camera(camera.id)
 
 
+@step_timeline.traced
 def level_load_save(level_name, entities_to_search):
     """
     Opens an existing level matching level_name, then optionally verifies certain expected entities exist in the level.
@@ -737,6 +748,7 @@ def verify_required_component_property_value(entity_name, component, property_pa
                 f"which matches {expected_property_value}")
 
 
+@step_timeline.traced
 def take_screenshot_game_mode(screenshot_name, entity_name=None):
     """
     Enters game mode & takes a screenshot, then exits game mode after.
@@ -747,8 +759,29 @@ def take_screenshot_game_mode(screenshot_name, entity_name=None):
     general.enter_game_mode()
     helper.wait_for_condition(lambda: general.is_in_game_mode(), 2.0)
     general.log(f"{entity_name}_test: Entered game mode: {general.is_in_game_mode()}")
-    ScreenshotHelper(general.idle_wait_frames).capture_screenshot_blocking(f"{screenshot_name}.ppm")
-    general.idle_wait(1.0)
+    ScreenshotHelper(general.idle_wait_frames).capture_screenshot_when_stable(f"{screenshot_name}.ppm")
+    general.exit_game_mode()
+    helper.wait_for_condition(lambda: not general.is_in_game_mode(), 2.0)
+    general.log(f"{entity_name}_test: Exit game mode: {not general.is_in_game_mode()}")
+
+
+@step_timeline.traced
+def take_screenshots_game_mode(screenshots, entity_name=None):
+    """
+    Enters game mode once & takes a screenshot of each state in screenshots, then exits game mode after.
+    :param screenshots: list of (screenshot_name, mutation, ready) tuples, the mutations are applied in game mode.
+        See ScreenshotHelper.capture_burst() for details.
+    :param entity_name: name of the entity being tested (for generating unique log lines).
+    :return: dict of screenshot path -> True if the screenshot was written.
+    """
+    general.enter_game_mode()
+    helper.wait_for_condition(lambda: general.is_in_game_mode(), 2.0)
+    general.log(f"{entity_name}_test: Entered game mode: {general.is_in_game_mode()}")
+    screenshot_helper = ScreenshotHelper(general.idle_wait_frames)
+    screenshot_helper.wait_until_stable()
+    capture_results = screenshot_helper.capture_burst(
+        [(f"{screenshot_name}.ppm", mutation, ready) for screenshot_name, mutation, ready in screenshots])
     general.exit_game_mode()
     helper.wait_for_condition(lambda: not general.is_in_game_mode(), 2.0)
     general.log(f"{entity_name}_test: Exit game mode: {not general.is_in_game_mode()}")
+    return capture_results
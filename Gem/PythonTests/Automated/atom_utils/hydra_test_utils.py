@@ -8,9 +8,12 @@ SPDX-License-Identifier: Apache-2.0 OR MIT
 import logging
 import os
 
-import ly_test_tools.log.log_monitor
 import ly_test_tools.environment.process_utils as process_utils
 import ly_test_tools.environment.waiter as waiter
+from . import golden_store
+from . import log_follower
+from . import result_channel
+from . import step_timeline
 from .network_utils import check_for_listening_port
 from ly_remote_console.remote_console_commands import (
     send_command_and_expect_response as send_command_and_expect_response,
@@ -18,6 +21,9 @@ from ly_remote_console.remote_console_commands import (
 
 logger = logging.getLogger(__name__)
 
+READY_SCRIPT = os.path.join(os.path.dirname(__file__), "application_ready.py")
+READY_LINE = "AtomTest: Application ready"
+
 
 def teardown_editor(editor):
     """
@@ -29,6 +35,19 @@ def teardown_editor(editor):
     editor.ensure_stopped()
 
 
+def hydrate_levels(workspace, level_names):
+    """
+    Replaces the git-lfs pointer stubs of levels in the project with their content, as levels are loaded from there.
+    :param workspace: Workspace of the project.
+    :param level_names: Names of the levels to hydrate, names that are not levels of the project are skipped.
+    :return: None
+    """
+    levels_directory = os.path.join(workspace.paths.project(), "Levels")
+    hydrated = golden_store.hydrate_levels(levels_directory, level_names)
+    if hydrated:
+        logger.debug("Hydrated {} level files in '{}'".format(len(hydrated), levels_directory))
+
+
 def launch_and_validate_results(
     request,
     test_directory,
@@ -40,6 +59,9 @@ def launch_and_validate_results(
     log_file_name="Editor.log",
     cfg_args=[],
     timeout=60,
+    quiet_period=None,
+    wait_for_ready=False,
+    levels=(),
 ):
     """
     Creates a temporary config file for Hydra execution, runs the Editor with the specified script, and monitors for
@@ -54,10 +76,21 @@ def launch_and_validate_results(
     :param log_file_name: Name of the log file created by the editor. Defaults to 'Editor.log'
     :param cfg_args: Additional arguments for CFG, such as LevelName.
     :param timeout: Length of time for test to run. Default is 60.
+    :param quiet_period: Enables early complete mode: once all expected lines are found and quiet_period seconds passed
+        without the test failing, the editor is torn down instead of running until it exits or the timeout.
+    :param wait_for_ready: Runs READY_SCRIPT and expects READY_LINE, a readiness marker for runs without an
+        editor_script, so early complete mode has a line to wait for.
+    :param levels: Names of the levels editor_script opens, their git-lfs pointer stubs are hydrated before the
+        editor starts. A level passed to the script in cfg_args must be listed here as well to be hydrated.
+    :return: list of the result records of the script, see result_channel.
     """
     test_case = os.path.join(test_directory, editor_script)
     request.addfinalizer(lambda: teardown_editor(editor))
     logger.debug("Running automated test: {}".format(editor_script))
+    if wait_for_ready:
+        assert editor_script == "", "wait_for_ready is only supported for runs without an editor_script"
+        editor.args.extend(["--skipWelcomeScreenDialog", "--autotest_mode", "--runpython", READY_SCRIPT])
+        expected_lines = list(expected_lines) + [READY_LINE]
     if editor_script != "":
         editor.args.extend(
             [
@@ -69,24 +102,33 @@ def launch_and_validate_results(
             ]
         )
     editor.args.extend([" ".join(cfg_args)])
-    with editor.start():
-        editorlog_file = os.path.join(editor.workspace.paths.project_log(), log_file_name)
-        # Log monitor requires the file to exist.
-        logger.debug("Waiting until log file <{}> exists...".format(editorlog_file))
-        waiter.wait_for(
-            lambda: os.path.exists(editorlog_file),
-            timeout=60,
-            exc=("Log file '{}' was never created by another process.".format(editorlog_file)),
-            interval=1,
-        )
-        logger.debug("Done! log file <{}> exists.".format(editorlog_file))
-        log_monitor = ly_test_tools.log.log_monitor.LogMonitor(launcher=editor, log_file_path=editorlog_file)
-        log_monitor.monitor_log_for_lines(
-            expected_lines=expected_lines,
-            unexpected_lines=unexpected_lines,
-            halt_on_unexpected=halt_on_unexpected,
-            timeout=timeout,
-        )
+    hydrate_levels(editor.workspace, levels)
+    editorlog_file = os.path.join(editor.workspace.paths.project_log(), log_file_name)
+    timeline_file = step_timeline.get_timeline_path(editor.workspace.paths.project_log(), request.node.name)
+    # Lines the log already has are from a previous run, they are skipped until the new editor rotates the log.
+    previous_log_state = log_follower.get_log_state(editorlog_file)
+    # Report records the results of the script next to the log, Success and Failure lines are validated against them.
+    # The helpers of the script and this harness time their steps into a Chrome trace of the test.
+    with result_channel.ResultChannel(result_channel.get_result_path_for_log(editorlog_file)) as results, \
+            step_timeline.TimelineChannel(timeline_file) as timeline:
+        with timeline.span("launch_and_validate_results", {"editor_script": editor_script}):
+            with editor.start():
+                # The log follower waits for the log to be created and wakes up on every write to it.
+                with timeline.span("monitor_log_for_lines", {"log_file": log_file_name}):
+                    records = log_follower.monitor_log_for_lines(
+                        editorlog_file,
+                        expected_lines=expected_lines,
+                        unexpected_lines=unexpected_lines,
+                        halt_on_unexpected=halt_on_unexpected,
+                        timeout=timeout,
+                        is_alive=editor.is_alive,
+                        quiet_period=quiet_period,
+                        result_path=results.result_path,
+                        previous_log_state=previous_log_state,
+                    )
+    for record in records:
+        logger.debug("{:.3f}s {}: {}".format(record.get("duration") or 0.0, record["result"], record["step"]))
+    return records
 
 
 def launch_and_validate_results_launcher(
@@ -99,6 +141,7 @@ def launch_and_validate_results_launcher(
     port_listener_timeout=120,
     log_monitor_timeout=60,
     remote_console_port=4600,
+    quiet_period=None,
 ):
     """
     Runs the launcher with the specified level, and monitors Game.log for expected lines.
@@ -111,11 +154,15 @@ def launch_and_validate_results_launcher(
     :param port_listener_timeout: Timeout for verifying successful connection to Remote Console.
     :param log_monitor_timeout: Timeout for monitoring for lines in Game.log
     :param remote_console_port: The port used to communicate with the Remote Console.
+    :param quiet_period: Enables early complete mode: once all expected lines are found and quiet_period seconds passed
+        without the test failing, the launcher is torn down instead of running until the log monitor timeout. The
+        level load is the readiness marker, so without expected lines the quiet period starts once the level loaded.
     """
-
+    hydrate_levels(launcher.workspace, [level])
+    gamelog_file = os.path.join(launcher.workspace.paths.project_log(), "Game.log")
+    # Lines the log already has are from a previous run, they are skipped until the new launcher rotates the log.
+    previous_log_state = log_follower.get_log_state(gamelog_file)
     with launcher.start():
-        gamelog_file = os.path.join(launcher.workspace.paths.project_log(), "Game.log")
-
         # Ensure Remote Console can be reached
         waiter.wait_for(
             lambda: check_for_listening_port(remote_console_port),
@@ -127,23 +174,14 @@ def launch_and_validate_results_launcher(
         # Load the specified level in the launcher
         send_command_and_expect_response(remote_console_instance, f"map {level}", "LEVEL_LOAD_COMPLETE", timeout=30)
 
-        # Log monitor requires the file to exist
-        logger.debug("Waiting until log file <{}> exists...".format(gamelog_file))
-        waiter.wait_for(
-            lambda: os.path.exists(gamelog_file),
-            timeout=60,
-            exc=("Log file '{}' was never created by another process.".format(gamelog_file)),
-            interval=1,
-        )
-        logger.debug("Done! log file <{}> exists.".format(gamelog_file))
-        log_monitor = ly_test_tools.log.log_monitor.LogMonitor(launcher=launcher, log_file_path=gamelog_file)
-        # Workaround fix: Wait for log file to be opened before checking for expected lines. This is done in
-        # monitor_log_for_lines as well, but has a low timeout with no way to currently override
-        logger.debug("Waiting for log file '{}' to be opened by another process.".format(gamelog_file))
-        # Check for expected/unexpected lines
-        log_monitor.monitor_log_for_lines(
+        # The log follower waits for the log to be created and wakes up on every write to it.
+        log_follower.monitor_log_for_lines(
+            gamelog_file,
             expected_lines=expected_lines,
             unexpected_lines=unexpected_lines,
             halt_on_unexpected=halt_on_unexpected,
             timeout=log_monitor_timeout,
+            is_alive=launcher.is_alive,
+            quiet_period=quiet_period,
+            previous_log_state=previous_log_state,
         )
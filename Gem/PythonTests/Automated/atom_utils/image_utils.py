@@ -0,0 +1,335 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Image decoding helpers used by the screenshot comparison code on the pytest side.
+"""
+
+import logging
+import os
+import struct
+import zlib
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PPM_BINARY_MAGIC = b'P6'
+PPM_ASCII_MAGIC = b'P3'
+PPM_HEADER_READ_SIZE = 4096
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_COLOR_TYPE_RGB = 2
+PNG_FILTER_NONE = 0
+PNG_FILTER_SUB = 1
+PNG_FILTER_UP = 2
+# zlib level 1 keeps encoding cheap, the Up filter does most of the work on rendered images.
+DEFAULT_PNG_COMPRESS_LEVEL = 1
+
+
+class ImageFormatError(ValueError):
+    """
+    Raised when an image file cannot be decoded.
+    """
+
+    pass
+
+
+class ImageShapeError(ValueError):
+    """
+    Raised when the resolutions of two compared images are incompatible.
+    """
+
+    pass
+
+
+def _read_ppm_header(data):
+    """
+    Parses the header of a PPM image.
+    :param data: The raw bytes of the PPM file.
+    :return: tuple of (magic, width, height, maxval, payload_offset)
+    """
+    tokens = []
+    offset = 0
+    while len(tokens) < 4:
+        # Skip whitespace and comments between header tokens.
+        while offset < len(data) and data[offset:offset + 1].isspace():
+            offset += 1
+        if data[offset:offset + 1] == b'#':
+            offset = data.find(b'\n', offset)
+            if offset == -1:
+                break
+            continue
+        token_start = offset
+        while offset < len(data) and not data[offset:offset + 1].isspace():
+            offset += 1
+        if token_start == offset:
+            break
+        tokens.append(bytes(data[token_start:offset]))
+
+    if len(tokens) < 4 or offset >= len(data) or tokens[0] not in (PPM_BINARY_MAGIC, PPM_ASCII_MAGIC):
+        raise ImageFormatError("not a valid P6/P3 PPM header")
+    try:
+        width, height, maxval = (int(token) for token in tokens[1:4])
+    except ValueError as err:
+        raise ImageFormatError(f"invalid PPM header values: {err}") from err
+    if width <= 0 or height <= 0 or not 0 < maxval < 65536:
+        raise ImageFormatError(f"unsupported PPM dimensions {width}x{height} with maxval {maxval}")
+
+    # Exactly one whitespace byte separates the header from the pixel payload.
+    return tokens[0], width, height, maxval, offset + 1
+
+
+def read_ppm_header(image_path):
+    """
+    Reads and parses only the header of a PPM file.
+    :param image_path: Path to the .ppm file.
+    :return: tuple of (magic, width, height, maxval, payload_offset)
+    """
+    with open(image_path, 'rb') as image_file:
+        data = image_file.read(PPM_HEADER_READ_SIZE)
+        while True:
+            try:
+                return _read_ppm_header(data)
+            except ImageFormatError as err:
+                # Headers with long comments may not fit in the first read.
+                chunk = image_file.read(PPM_HEADER_READ_SIZE)
+                if not chunk:
+                    raise ImageFormatError(f"{image_path}: {err}") from err
+                data += chunk
+
+
+def read_ppm(image_path):
+    """
+    Decodes a P6 (binary) or P3 (ASCII) PPM file into a numpy array.
+    Binary files are returned as a read-only numpy.memmap over the pixel payload, so no copy of the pixel data is made
+    until it is converted for comparison.
+    :param image_path: Path to the .ppm file.
+    :return: tuple of (pixels, maxval) where pixels is a (height, width, 3) array of uint8 or uint16.
+    """
+    magic, width, height, maxval, payload_offset = read_ppm_header(image_path)
+    sample_count = width * height * 3
+
+    if magic == PPM_BINARY_MAGIC:
+        # 16-bit samples are stored most significant byte first.
+        dtype = np.dtype('u1') if maxval < 256 else np.dtype('>u2')
+        if os.path.getsize(image_path) - payload_offset < sample_count * dtype.itemsize:
+            raise ImageFormatError(f"{image_path}: truncated pixel data")
+        pixels = np.memmap(image_path, dtype=dtype, mode='r', offset=payload_offset, shape=(height, width, 3))
+        return pixels, maxval
+
+    with open(image_path, 'rb') as image_file:
+        image_file.seek(payload_offset)
+        pixels = np.array(image_file.read().split()[:sample_count], dtype=np.uint32)
+    if pixels.size < sample_count:
+        raise ImageFormatError(f"{image_path}: truncated pixel data")
+    pixels = pixels.astype(np.uint8 if maxval < 256 else np.uint16)
+    return pixels.reshape(height, width, 3), maxval
+
+
+def to_float_image(pixels, maxval):
+    """
+    Converts integer pixel data to float32 values normalized to the [0, 1] range.
+    :param pixels: Integer pixel array as returned by read_ppm.
+    :param maxval: The maximum sample value of the source image.
+    :return: float32 array with the same shape as pixels.
+    """
+    return np.multiply(pixels, np.float32(1.0 / maxval), dtype=np.float32)
+
+
+def _unfilter_png_rows(scanlines, bytes_per_pixel):
+    """
+    Reverses the PNG None, Sub and Up scanline filters with numpy.
+    :param scanlines: (height, 1 + row_bytes) uint8 array of filtered scanlines.
+    :param bytes_per_pixel: Number of bytes per pixel.
+    :return: (height, row_bytes) uint8 array, or None if another filter type is used.
+    """
+    filter_types = scanlines[:, 0]
+    filtered = scanlines[:, 1:]
+    if np.all(filter_types == PNG_FILTER_UP):
+        # Every row adds the row above it, which is a wrapping cumulative sum down the columns.
+        return np.cumsum(filtered, axis=0, dtype=np.uint8)
+    if np.all(filter_types == PNG_FILTER_NONE):
+        return filtered
+    if np.any(filter_types > PNG_FILTER_UP):
+        return None
+
+    rows = np.empty_like(filtered)
+    previous_row = np.zeros(filtered.shape[1], dtype=np.uint8)
+    for row_index, filter_type in enumerate(filter_types):
+        row = filtered[row_index]
+        if filter_type == PNG_FILTER_SUB:
+            row = np.cumsum(row.reshape(-1, bytes_per_pixel), axis=0, dtype=np.uint8).reshape(-1)
+        elif filter_type == PNG_FILTER_UP:
+            row = row + previous_row
+        rows[row_index] = row
+        previous_row = rows[row_index]
+    return rows
+
+
+def read_png(image_path):
+    """
+    Decodes a non-interlaced 8 or 16-bit RGB PNG that uses the None, Sub or Up filters, as written by write_png.
+    Other PNG variants are decoded with Pillow.
+    :param image_path: Path to the .png file.
+    :return: tuple of (pixels, maxval) where pixels is a (height, width, 3) array of uint8 or uint16.
+    """
+    with open(image_path, 'rb') as image_file:
+        data = image_file.read()
+    if not data.startswith(PNG_SIGNATURE):
+        raise ImageFormatError(f"{image_path}: not a PNG file")
+
+    header = None
+    compressed_chunks = []
+    offset = len(PNG_SIGNATURE)
+    while offset + 8 <= len(data):
+        chunk_length, chunk_type = struct.unpack('>I4s', data[offset:offset + 8])
+        chunk_data = data[offset + 8:offset + 8 + chunk_length]
+        if chunk_type == b'IHDR':
+            header = struct.unpack('>IIBBBBB', chunk_data)
+        elif chunk_type == b'IDAT':
+            compressed_chunks.append(chunk_data)
+        elif chunk_type == b'IEND':
+            break
+        offset += chunk_length + 12
+    if header is None or not compressed_chunks:
+        raise ImageFormatError(f"{image_path}: missing PNG IHDR or IDAT chunks")
+
+    width, height, bit_depth, color_type, _, _, interlace = header
+    if color_type == PNG_COLOR_TYPE_RGB and bit_depth in (8, 16) and not interlace:
+        bytes_per_pixel = 3 * bit_depth // 8
+        scanlines = np.frombuffer(zlib.decompress(b''.join(compressed_chunks)), dtype=np.uint8)
+        if scanlines.size != height * (1 + width * bytes_per_pixel):
+            raise ImageFormatError(f"{image_path}: truncated PNG pixel data")
+        rows = _unfilter_png_rows(scanlines.reshape(height, -1), bytes_per_pixel)
+        if rows is not None:
+            if bit_depth == 16:
+                return rows.view('>u2').reshape(height, width, 3), 65535
+            return rows.reshape(height, width, 3), 255
+
+    from PIL import Image
+    with Image.open(image_path) as image:
+        return np.asarray(image.convert('RGB')), 255
+
+
+def write_png(image_path, pixels, maxval=255, compress_level=DEFAULT_PNG_COMPRESS_LEVEL):
+    """
+    Writes a (height, width, 3) integer array as a lossless RGB PNG using the Up filter on every row.
+    :param image_path: Destination path of the .png file.
+    :param pixels: uint8 or uint16 pixel array.
+    :param maxval: 255 for 8-bit samples or 65535 for 16-bit samples.
+    :param compress_level: zlib compression level.
+    :return: None
+    """
+    if maxval not in (255, 65535):
+        raise ImageFormatError(f"PNG only stores 8 or 16-bit samples losslessly, got maxval {maxval}")
+    height, width = pixels.shape[:2]
+    bit_depth = 8 if maxval == 255 else 16
+    rows = np.ascontiguousarray(pixels, dtype=np.dtype('u1') if bit_depth == 8 else np.dtype('>u2'))
+    rows = rows.view(np.uint8).reshape(height, -1)
+    scanlines = np.empty((height, rows.shape[1] + 1), dtype=np.uint8)
+    scanlines[:, 0] = PNG_FILTER_UP
+    scanlines[0, 1:] = rows[0]
+    np.subtract(rows[1:], rows[:-1], out=scanlines[1:, 1:])
+
+    def chunk(chunk_type, chunk_data):
+        return struct.pack('>I', len(chunk_data)) + chunk_type + chunk_data + \
+            struct.pack('>I', zlib.crc32(chunk_type + chunk_data) & 0xffffffff)
+
+    with open(image_path, 'wb') as image_file:
+        image_file.write(PNG_SIGNATURE)
+        image_file.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, bit_depth, PNG_COLOR_TYPE_RGB, 0, 0, 0)))
+        image_file.write(chunk(b'IDAT', zlib.compress(scanlines.tobytes(), compress_level)))
+        image_file.write(chunk(b'IEND', b''))
+
+
+def read_image(image_path):
+    """
+    Decodes a PPM or PNG image, falling back to Pillow for other formats (such as .dds captures).
+    :param image_path: Path to the image file.
+    :return: tuple of (pixels, maxval) where pixels is a (height, width, 3) integer array.
+    """
+    with open(image_path, 'rb') as image_file:
+        magic = image_file.read(len(PNG_SIGNATURE))
+    if magic[:2] in (PPM_BINARY_MAGIC, PPM_ASCII_MAGIC):
+        return read_ppm(image_path)
+    if magic == PNG_SIGNATURE:
+        return read_png(image_path)
+
+    from PIL import Image
+    with Image.open(image_path) as image:
+        return np.asarray(image.convert('RGB')), 255
+
+
+def load_image(image_path):
+    """
+    Loads an image from disk as a float32 (height, width, 3) array normalized to [0, 1].
+    :param image_path: Path to the image file.
+    :return: numpy float32 array.
+    """
+    return to_float_image(*read_image(image_path))
+
+
+def downsample_area(image, factor):
+    """
+    Downsamples an image by an integer factor, averaging each factor x factor block (an area filter).
+    Trailing rows and columns that do not fill a whole block are dropped.
+    :param image: (height, width, channels) array.
+    :param factor: The integer downsampling factor.
+    :return: float32 array of shape (height // factor, width // factor, channels).
+    """
+    if factor == 1:
+        return np.asarray(image, dtype=np.float32)
+    height = image.shape[0] // factor
+    width = image.shape[1] // factor
+    blocks = image[:height * factor, :width * factor].reshape(height, factor, width, factor, image.shape[2])
+    return blocks.mean(axis=(1, 3), dtype=np.float32)
+
+
+def downsample_to_shape(pixels, maxval, shape):
+    """
+    Brings a capture to the resolution of a golden stored at a reduced comparison resolution, averaging the pixels
+    with downsample_area when the capture is an exact integer multiple of shape.
+    :param pixels: (height, width, 3) pixel array.
+    :param maxval: The maximum sample value of pixels.
+    :param shape: (height, width) to match.
+    :return: tuple of (pixels, maxval), the input when it already matches, otherwise a float32 array with maxval 1.0.
+    :raises ImageShapeError: if the shapes are not related by an integer factor.
+    """
+    height, width = pixels.shape[:2]
+    if (height, width) == tuple(shape):
+        return pixels, maxval
+    factor = height // shape[0] if shape[0] else 0
+    if factor < 2 or (height, width) != (shape[0] * factor, shape[1] * factor):
+        raise ImageShapeError(f"Image shapes differ: {tuple(shape)[::-1]} vs {(width, height)}")
+    return downsample_area(to_float_image(pixels, maxval), factor), 1.0
+
+
+def write_downsampled_ppm(image_path, output_path, factor):
+    """
+    Writes an image downsampled by factor with an area filter as an 8-bit PPM, e.g. to store a golden at a reduced
+    comparison resolution.
+    :param image_path: Path to the source image.
+    :param output_path: Destination path of the .ppm file.
+    :param factor: The integer downsampling factor.
+    :return: None
+    """
+    pixels, maxval = read_image(image_path)
+    downsampled = downsample_area(to_float_image(pixels, maxval), factor)
+    write_ppm(output_path, np.round(downsampled * 255.0).astype(np.uint8))
+
+
+def write_ppm(image_path, pixels, maxval=255):
+    """
+    Writes a (height, width, 3) integer array as a binary P6 PPM file.
+    :param image_path: Destination path of the .ppm file.
+    :param pixels: uint8 or uint16 pixel array.
+    :param maxval: The maximum sample value, values above 255 are written as 16-bit big-endian samples.
+    :return: None
+    """
+    height, width = pixels.shape[:2]
+    dtype = np.dtype('u1') if maxval < 256 else np.dtype('>u2')
+    with open(image_path, 'wb') as image_file:
+        image_file.write(f"P6\n{width} {height}\n{maxval}\n".encode('ascii'))
+        image_file.write(np.ascontiguousarray(pixels, dtype=dtype).tobytes())
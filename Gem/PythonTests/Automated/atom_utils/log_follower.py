@@ -0,0 +1,409 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Event driven follower of log files written by another process, such as Editor.log.
+On Linux the follower sleeps on inotify events of the log directory, so new lines are seen within milliseconds of being
+written and nothing runs while the log is quiet. Other platforms, and Linux systems where inotify is unavailable, poll
+the file every POLL_INTERVAL seconds.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import re
+import select
+import sys
+import time
+
+import ly_test_tools.log.log_monitor
+
+from . import result_channel
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.1
+# Process exit raises no event in the log directory, so waits are capped to notice a dead process.
+LIVENESS_CHECK_INTERVAL = 1.0
+READ_CHUNK_SIZE = 64 * 1024
+LOG_CREATION_TIMEOUT = 60
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = os.O_NONBLOCK if hasattr(os, 'O_NONBLOCK') else 0
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENTS = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+
+def _inotify_watch(directory):
+    """
+    Creates an inotify instance watching directory for created, moved in and modified files.
+    :return: The inotify file descriptor, or None if inotify is unavailable.
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        inotify_fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    except (OSError, AttributeError) as err:
+        logger.debug(f"inotify is unavailable, polling '{directory}': {err}")
+        return None
+    if inotify_fd < 0:
+        logger.debug(f"inotify_init1 failed, polling '{directory}': {os.strerror(ctypes.get_errno())}")
+        return None
+    if libc.inotify_add_watch(inotify_fd, os.fsencode(directory), INOTIFY_EVENTS) < 0:
+        logger.debug(f"inotify_add_watch failed, polling '{directory}': {os.strerror(ctypes.get_errno())}")
+        os.close(inotify_fd)
+        return None
+    return inotify_fd
+
+
+def get_log_state(log_path):
+    """
+    Records which file is at log_path and how much of it was written, before launching the process that writes it.
+    :return: tuple of (inode, device, size), or None if there is no log yet.
+    """
+    try:
+        log_stat = os.stat(log_path)
+    except OSError:
+        return None
+    return log_stat.st_ino, log_stat.st_dev, log_stat.st_size
+
+
+class LogFollower:
+    """
+    Reads the lines appended to a log file, reopening it when it is rotated or truncated.
+    The file and its directory do not need to exist yet.
+    reopen_count counts the rotations and truncations, after which the lines read come from a new log.
+    """
+
+    def __init__(self, log_path, poll_interval=POLL_INTERVAL, previous_log_state=None):
+        """
+        :param log_path: Path to the log file.
+        :param poll_interval: Seconds between reads when inotify is unavailable.
+        :param previous_log_state: get_log_state of the log before the writing process was launched. The content the
+            log had then is skipped, so lines of a previous run are never read before the new process rotates the log.
+        """
+        self.log_path = log_path
+        self.poll_interval = poll_interval
+        self.previous_log_state = previous_log_state
+        self.reopen_count = 0
+        self._log_file = None
+        self._partial_line = b''
+        self._inotify_fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+        if self._inotify_fd is not None and self._inotify_fd >= 0:
+            os.close(self._inotify_fd)
+        self._inotify_fd = None
+
+    def exists(self):
+        return os.path.isfile(self.log_path)
+
+    def _open_log(self):
+        try:
+            log_stat = os.stat(self.log_path)
+        except OSError:
+            return False
+        if self._log_file is not None:
+            open_stat = os.fstat(self._log_file.fileno())
+            replaced = (log_stat.st_ino, log_stat.st_dev) != (open_stat.st_ino, open_stat.st_dev)
+            if not replaced and open_stat.st_size >= self._log_file.tell():
+                return True
+            # The log was rotated or truncated by a new process, start over from the new file.
+            self._log_file.close()
+            self._log_file = None
+            self._partial_line = b''
+            self.reopen_count += 1
+        try:
+            self._log_file = open(self.log_path, 'rb')
+        except OSError:
+            return False
+        if self.previous_log_state is not None:
+            previous_inode, previous_device, previous_size = self.previous_log_state
+            open_stat = os.fstat(self._log_file.fileno())
+            if (open_stat.st_ino, open_stat.st_dev) == (previous_inode, previous_device) \
+                    and open_stat.st_size >= previous_size:
+                self._log_file.seek(previous_size)
+            # Only the file first opened can be the previous log, a replacement is always read from its start.
+            self.previous_log_state = None
+        return True
+
+    def read_lines(self):
+        """
+        Reads the complete lines appended since the last call.
+        :return: list of str lines without line endings.
+        """
+        if not self._open_log():
+            return []
+        data = self._partial_line
+        while True:
+            chunk = self._log_file.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            data += chunk
+        lines = data.split(b'\n')
+        self._partial_line = lines.pop()
+        return [line.rstrip(b'\r').decode('utf-8', errors='replace') for line in lines]
+
+    def read_remaining_lines(self):
+        """
+        Reads the lines appended since the last call, including a last line without a line ending.
+        Used once the writing process has exited.
+        """
+        lines = self.read_lines()
+        if self._partial_line:
+            lines.append(self._partial_line.rstrip(b'\r').decode('utf-8', errors='replace'))
+            self._partial_line = b''
+        return lines
+
+    def wait(self, timeout):
+        """
+        Sleeps until the log directory changes, or for at most timeout seconds.
+        Without inotify the wait is the poll interval.
+        """
+        if self._inotify_fd is None:
+            log_directory = os.path.dirname(os.path.abspath(self.log_path))
+            if os.path.isdir(log_directory):
+                self._inotify_fd = _inotify_watch(log_directory)
+                if self._inotify_fd is None:
+                    # Do not retry inotify on every wait once it failed.
+                    self._inotify_fd = -1
+        if self._inotify_fd is None or self._inotify_fd < 0:
+            time.sleep(max(0.0, min(timeout, self.poll_interval)))
+            return
+        readable, _, _ = select.select([self._inotify_fd], [], [], max(0.0, timeout))
+        if readable:
+            # The events only wake the reader up, which file changed does not matter.
+            try:
+                while os.read(self._inotify_fd, READ_CHUNK_SIZE):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def wait_for_file(self, timeout=LOG_CREATION_TIMEOUT):
+        """
+        Waits until the log file exists.
+        :return: True if it exists, False on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while not self.exists():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self.wait(min(remaining, LIVENESS_CHECK_INTERVAL))
+        return True
+
+    def follow(self, timeout, is_alive=None, stop_time=None):
+        """
+        Yields lines as they are appended to the log, until timeout seconds have passed or is_alive() returns False.
+        The lines written before the process exited are still yielded.
+        :param timeout: Seconds to follow the log for.
+        :param is_alive: Optional callable returning False once the writing process has exited.
+        :param stop_time: Optional callable returning a time.monotonic() time to stop following at before the timeout,
+            or None. It is called again after every batch of lines.
+        """
+        for _, line in follow_files([self], timeout, is_alive, stop_time):
+            yield line
+
+
+def follow_files(followers, timeout, is_alive=None, stop_time=None):
+    """
+    Follows several files written by the same process at once, see LogFollower.follow.
+    Only the first follower waits for changes, so the other files should be in the same directory to be read as soon
+    as they change, otherwise they are read every LIVENESS_CHECK_INTERVAL.
+    :return: Generator of (follower index, line) tuples.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        alive = is_alive is None or is_alive()
+        for follower_index, follower in enumerate(followers):
+            lines = follower.read_lines() if alive else follower.read_remaining_lines()
+            for line in lines:
+                yield follower_index, line
+        if not alive:
+            return
+        early_deadline = stop_time() if stop_time is not None else None
+        remaining = min(deadline, early_deadline or deadline) - time.monotonic()
+        if remaining <= 0:
+            return
+        followers[0].wait(min(remaining, LIVENESS_CHECK_INTERVAL))
+
+
+def line_matches(line, expected_line):
+    """
+    Checks whether expected_line appears in line as whole words, the same rule the ly_test_tools LogMonitor uses.
+    """
+    return re.search(r'(^|\s)' + re.escape(expected_line) + r'(\s|$)', line) is not None
+
+
+def _is_whole_words(line, start, end):
+    return (start == 0 or line[start - 1].isspace()) and (end == len(line) or line[end].isspace())
+
+
+def _contains_whole_words(line, pattern):
+    """
+    Same as line_matches without a regular expression, checking every occurrence of pattern in line.
+    """
+    start = line.find(pattern)
+    while start >= 0:
+        if _is_whole_words(line, start, start + len(pattern)):
+            return True
+        start = line.find(pattern, start + 1)
+    return False
+
+
+class LineMatcher:
+    """
+    Tracks which expected and unexpected lines have been found in a log.
+    All of the lines are compiled into one regular expression alternation with the whole word rule of line_matches, so
+    a log line containing none of them, which most do, is rejected by a single search. Only the log lines it matches
+    are checked line by line, which also finds lines overlapping each other.
+    """
+
+    def __init__(self, expected_lines, unexpected_lines=()):
+        patterns = list(dict.fromkeys(line for line in list(expected_lines) + list(unexpected_lines) if line))
+        self._pattern = None
+        if patterns:
+            self._pattern = re.compile(
+                r'(?<!\S)(?:' + '|'.join(re.escape(pattern) for pattern in patterns) + r')(?!\S)')
+        # Ordered in the order the lines were declared.
+        self._missing = dict.fromkeys(line for line in expected_lines if line)
+        self._unexpected = list(dict.fromkeys(line for line in unexpected_lines if line))
+        # Empty lines cannot be compiled, they are matched with line_matches.
+        self._missing_empty = '' in expected_lines
+        self._unexpected_empty = '' in unexpected_lines
+        self.found_unexpected_lines = []
+
+    @property
+    def all_expected_found(self):
+        return not self._missing and not self._missing_empty
+
+    @property
+    def missing_lines(self):
+        return ([''] if self._missing_empty else []) + list(self._missing)
+
+    def feed(self, line):
+        """
+        Matches a log line.
+        :return: True if the line contains an unexpected line.
+        """
+        found_unexpected = []
+        if self._pattern is not None and self._pattern.search(line) is not None:
+            for pattern in [pattern for pattern in self._missing if _contains_whole_words(line, pattern)]:
+                del self._missing[pattern]
+            found_unexpected = [pattern for pattern in self._unexpected if _contains_whole_words(line, pattern)]
+        if (self._missing_empty or self._unexpected_empty) and line_matches(line, ''):
+            self._missing_empty = False
+            if self._unexpected_empty:
+                found_unexpected.append('')
+        self.found_unexpected_lines.extend(found_unexpected)
+        return bool(found_unexpected)
+
+
+def monitor_log_for_lines(log_path, expected_lines, unexpected_lines=(), halt_on_unexpected=False, timeout=30,
+                          is_alive=None, log_creation_timeout=LOG_CREATION_TIMEOUT, quiet_period=None,
+                          result_path=None, previous_log_state=None):
+    """
+    Drop-in replacement of ly_test_tools LogMonitor.monitor_log_for_lines that follows the log with a LogFollower.
+    Follows the log until the process exits or the timeout is reached, or in early complete mode until quiet_period
+    seconds after the last expected line was found.
+    :param log_path: Path to the log file, which may not exist yet.
+    :param expected_lines: Lines that must appear in the log.
+    :param unexpected_lines: Lines that must not appear in the log.
+    :param halt_on_unexpected: Stop following the log as soon as an unexpected line is found.
+    :param timeout: Seconds to follow the log for once it exists.
+    :param is_alive: Optional callable returning False once the process writing the log has exited.
+    :param log_creation_timeout: Seconds to wait for the log file to be created.
+    :param quiet_period: Enables early complete mode. Seconds to keep watching for unexpected lines once every expected
+        line was found, right away when there are no expected lines. Defaults to None, following the log until the
+        process exits or the timeout is reached.
+    :param result_path: Optional result file of a result_channel.ResultChannel. The Success and Failure lines of
+        expected_lines and unexpected_lines are then matched against its records rather than the log.
+    :param previous_log_state: get_log_state of the log before the process was launched, so the lines of a previous
+        run are skipped. Matches are also reset whenever the log is rotated or truncated.
+    :raises ly_test_tools.log.log_monitor.LogMonitorException: if expected lines are missing or unexpected lines are
+        found.
+    :return: list of the records read from result_path, empty without a result_path.
+    """
+    followers = [LogFollower(log_path, previous_log_state=previous_log_state)]
+    matched_lines = [(list(expected_lines), list(unexpected_lines))]
+    if result_path is not None:
+        followers.append(LogFollower(result_path))
+        matched_lines = [
+            ([line for line in expected_lines if not result_channel.is_result_line(line)],
+             [line for line in unexpected_lines if not result_channel.is_result_line(line)]),
+            ([line for line in expected_lines if result_channel.is_result_line(line)],
+             [line for line in unexpected_lines if result_channel.is_result_line(line)]),
+        ]
+    matchers = [LineMatcher(*lines) for lines in matched_lines]
+    reopen_counts = [0] * len(followers)
+    records = []
+
+    def all_expected_found():
+        return all(matcher.all_expected_found for matcher in matchers)
+
+    try:
+        logger.debug(f"Waiting until log file <{log_path}> exists...")
+        if not followers[0].wait_for_file(log_creation_timeout):
+            raise ly_test_tools.log.log_monitor.LogMonitorException(
+                f"Log file '{log_path}' was never created by another process.")
+        start_time = time.monotonic()
+        early_stop_time = None
+        if quiet_period is not None and all_expected_found():
+            early_stop_time = start_time + quiet_period
+        for follower_index, line in follow_files(followers, timeout, is_alive, stop_time=lambda: early_stop_time):
+            if followers[follower_index].reopen_count != reopen_counts[follower_index]:
+                # Whatever was matched came from a log that has since been replaced by the process being validated.
+                logger.debug(f"<{followers[follower_index].log_path}> was rotated, matching its lines from the start")
+                reopen_counts[follower_index] = followers[follower_index].reopen_count
+                matchers[follower_index] = LineMatcher(*matched_lines[follower_index])
+                if follower_index:
+                    records = []
+                if not all_expected_found():
+                    early_stop_time = None
+            if follower_index:
+                record = result_channel.parse_record(line)
+                if record is None:
+                    continue
+                records.append(record)
+                line = result_channel.record_to_line(record)
+            if matchers[follower_index].feed(line) and halt_on_unexpected:
+                break
+            if early_stop_time is None and quiet_period is not None and all_expected_found():
+                logger.debug(f"Found all expected lines in <{log_path}>, watching for unexpected lines for "
+                             f"{quiet_period}s")
+                early_stop_time = time.monotonic() + quiet_period
+        logger.debug(f"Stopped following <{log_path}> after {time.monotonic() - start_time:.2f}s")
+    finally:
+        for follower in followers:
+            follower.close()
+
+    missing_lines = set(line for matcher in matchers for line in matcher.missing_lines)
+    missing_lines = [line for line in dict.fromkeys(expected_lines) if line in missing_lines]
+    found_unexpected_lines = [line for matcher in matchers for line in matcher.found_unexpected_lines]
+    if missing_lines or found_unexpected_lines:
+        message = f"Log validation of '{log_path}' failed.\n"
+        if result_path is not None:
+            message += f"Success and Failure lines were validated against the results in '{result_path}'.\n"
+        if missing_lines:
+            message += "Expected lines not found:\n" + "".join(f"    {line}\n" for line in missing_lines)
+        if found_unexpected_lines:
+            message += "Unexpected lines found:\n" + "".join(f"    {line}\n" for line in found_unexpected_lines)
+        raise ly_test_tools.log.log_monitor.LogMonitorException(message)
+    logger.info(f"Found all {len(expected_lines)} expected lines in '{log_path}'")
+    return records
@@ -0,0 +1,159 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Structured channel for the results of Editor test scripts.
+While a ResultChannel is open, automated_test_utils.Report appends a JSON record for every result it prints to the
+per-test file announced in the ATOMTEST_RESULT_FILE environment variable:
+    {"step": ..., "result": "success" | "failure" | "info", "timestamp": ..., "duration": ..., "payload": ...}
+timestamp is the time.time() of the record and duration the seconds since the previous record of the script, so
+every record also times the step it reports. log_follower.monitor_log_for_lines validates the Success and Failure
+lines of a test against these records instead of searching the whole log for them.
+
+This module is imported on both sides, so it must only use the standard library.
+"""
+
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+RESULT_FILE_ENV_VAR = 'ATOMTEST_RESULT_FILE'
+RESULT_FILE_SUFFIX = '_results.jsonl'
+
+RESULT_SUCCESS = 'success'
+RESULT_FAILURE = 'failure'
+RESULT_INFO = 'info'
+# The prefixes Report prints results with.
+RESULT_PREFIXES = {
+    RESULT_SUCCESS: 'Success: ',
+    RESULT_FAILURE: 'Failure: ',
+    RESULT_INFO: 'Info: ',
+}
+
+_writer = None
+
+
+def get_result_path_for_log(log_path):
+    """
+    Returns the result file of the run writing log_path. It is kept next to the log, so a LogFollower of the log wakes
+    up for new records as well.
+    """
+    return os.path.splitext(log_path)[0] + RESULT_FILE_SUFFIX
+
+
+class ResultWriter:
+    """
+    Editor side: appends result records to a result file.
+    """
+
+    def __init__(self, result_path):
+        self.result_path = result_path
+        self._last_record_time = time.time()
+
+    def write(self, step, result, payload=None):
+        """
+        Appends a record and flushes it, so the record survives the Editor exiting or crashing right after.
+        :param step: The step message, such as the first or second message of a Report tuple.
+        :param result: RESULT_SUCCESS, RESULT_FAILURE or RESULT_INFO.
+        :param payload: Optional JSON serializable data about the step.
+        :return: None
+        """
+        timestamp = time.time()
+        record = {
+            'step': step,
+            'result': result,
+            'timestamp': timestamp,
+            'duration': timestamp - self._last_record_time,
+            'payload': payload,
+        }
+        self._last_record_time = timestamp
+        with open(self.result_path, 'a', encoding='utf-8') as result_file:
+            result_file.write(json.dumps(record, default=str) + '\n')
+
+
+def get_writer():
+    """
+    Returns the ResultWriter of the result file announced in the ATOMTEST_RESULT_FILE environment variable, or None
+    when results are only printed.
+    """
+    global _writer
+    result_path = os.environ.get(RESULT_FILE_ENV_VAR)
+    if not result_path:
+        return None
+    if _writer is None or _writer.result_path != result_path:
+        _writer = ResultWriter(result_path)
+    return _writer
+
+
+def record_result(step, result, payload=None):
+    """
+    Appends a record to the result file if a ResultChannel is open, see ResultWriter.write.
+    Failing to write a record never fails the script, the printed result is still in the log.
+    :return: None
+    """
+    writer = get_writer()
+    if writer is None:
+        return
+    try:
+        writer.write(step, result, payload)
+    except OSError as err:
+        logger.warning(f"Failed to write the result of '{step}' to '{writer.result_path}': {err}")
+
+
+def is_result_line(line):
+    """
+    Returns True if line is a Success or Failure line printed by Report, which a result record can satisfy.
+    """
+    return line.startswith((RESULT_PREFIXES[RESULT_SUCCESS], RESULT_PREFIXES[RESULT_FAILURE]))
+
+
+def record_to_line(record):
+    """
+    Returns the line Report printed for a record.
+    """
+    return RESULT_PREFIXES.get(record.get('result'), '') + str(record.get('step'))
+
+
+def parse_record(line):
+    """
+    Decodes a line of a result file.
+    :return: The record dict, or None if the line is not a valid record.
+    """
+    try:
+        record = json.loads(line)
+    except ValueError:
+        record = None
+    if not isinstance(record, dict) or 'step' not in record or 'result' not in record:
+        logger.warning(f"Ignoring invalid result record: {line!r}")
+        return None
+    return record
+
+
+class ResultChannel:
+    """
+    pytest side: announces a result file to the Editor through the ATOMTEST_RESULT_FILE environment variable.
+    Use as a context manager around launching the Editor. Records left over from a previous run are removed.
+    """
+
+    def __init__(self, result_path):
+        self.result_path = result_path
+        self._previous_result_path = None
+
+    def __enter__(self):
+        if os.path.isfile(self.result_path):
+            os.remove(self.result_path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.result_path)), exist_ok=True)
+        self._previous_result_path = os.environ.get(RESULT_FILE_ENV_VAR)
+        os.environ[RESULT_FILE_ENV_VAR] = self.result_path
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._previous_result_path is None:
+            os.environ.pop(RESULT_FILE_ENV_VAR, None)
+        else:
+            os.environ[RESULT_FILE_ENV_VAR] = self._previous_result_path
@@ -0,0 +1,465 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Vectorized quaternion SSIM (QSSIM) used to compare test screenshots against golden images.
+Each RGB pixel is treated as a pure quaternion, so color differences are scored jointly instead of per channel.
+The score contract matches ly_test_tools.image.screenshot_compare_qssim.qssim: a float where 1.0 means identical,
+and a ValueError (image_utils.ImageShapeError) is raised when the two images have different resolutions.
+"""
+
+import collections
+import logging
+import os
+
+import numpy as np
+
+from .image_utils import ImageShapeError, downsample_area, load_image
+
+logger = logging.getLogger(__name__)
+
+WINDOW_GAUSSIAN = 'gaussian'
+WINDOW_BOX = 'box'
+WINDOW_INTEGRAL = 'integral'
+DEFAULT_WINDOW = WINDOW_GAUSSIAN
+DEFAULT_WINDOW_SIZE = 11
+GAUSSIAN_SIGMA = 1.5
+# A box window of this size averages about as many samples as the default Gaussian window, 1 / sum(w^2) ~= 4*pi*sigma^2,
+# so WINDOW_INTEGRAL scores with it track the scores of the default window.
+INTEGRAL_MATCHED_WINDOW_SIZE = 6
+DEFAULT_TILE_SIZE = 128
+DEFAULT_WORST_TILE_COUNT = 5
+
+MODE_TILED = 'tiled'
+MODE_PYRAMID = 'pyramid'
+COMPARE_MODES = [MODE_TILED, MODE_PYRAMID]
+
+# Coarse-to-fine levels as (downsampling factor, fail margin). A level fails the comparison when its score is below
+# threshold - fail margin, otherwise the next level is scored. Coarse levels never pass a comparison: area downsampling
+# averages away pixel noise, so a capture far below threshold at full resolution can score close to 1.0 at 1/8.
+DEFAULT_PYRAMID_LEVELS = [
+    (8, 0.10),
+    (4, 0.05),
+]
+
+# Stabilizing constants from the SSIM paper, for images normalized to a dynamic range of 1.0
+K1 = 0.01
+K2 = 0.03
+C1 = K1 ** 2
+C2 = K2 ** 2
+
+
+def _window_kernel(window, window_size):
+    """
+    Builds the normalized 1D kernel for a separable window.
+    :param window: WINDOW_GAUSSIAN or WINDOW_BOX.
+    :param window_size: Width of the window in pixels.
+    :return: float32 numpy array of length window_size that sums to 1.
+    """
+    if window == WINDOW_BOX:
+        kernel = np.ones(window_size, dtype=np.float32)
+    elif window == WINDOW_GAUSSIAN:
+        x = np.arange(window_size, dtype=np.float32) - (window_size - 1) / 2.0
+        kernel = np.exp(-(x ** 2) / (2.0 * GAUSSIAN_SIGMA ** 2))
+    else:
+        raise ValueError(
+            f"Unknown SSIM window '{window}', expected '{WINDOW_GAUSSIAN}', '{WINDOW_BOX}' or '{WINDOW_INTEGRAL}'")
+    return (kernel / kernel.sum()).astype(np.float32)
+
+
+def _filter_valid(image, kernel):
+    """
+    Applies a separable filter to the first two axes of image, keeping only windows fully inside the image.
+    :param image: (height, width) or (height, width, channels) float32 array.
+    :param kernel: 1D kernel returned by _window_kernel.
+    :return: filtered array of shape (height - k + 1, width - k + 1[, channels]).
+    """
+    size = len(kernel)
+    rows = image.shape[0] - size + 1
+    cols = image.shape[1] - size + 1
+    vertical = kernel[0] * image[0:rows]
+    for i in range(1, size):
+        vertical += kernel[i] * image[i:i + rows]
+    result = kernel[0] * vertical[:, 0:cols]
+    for i in range(1, size):
+        result += kernel[i] * vertical[:, i:i + cols]
+    return result
+
+
+def _integral_image(image):
+    """
+    Builds a zero-padded summed-area table over the first two axes of image.
+    Accumulates in float64 so that large sums do not lose the precision needed by the variance terms.
+    :param image: (height, width) or (height, width, channels) array.
+    :return: float64 array of shape (height + 1, width + 1[, channels]).
+    """
+    table = np.zeros((image.shape[0] + 1, image.shape[1] + 1) + image.shape[2:], dtype=np.float64)
+    np.cumsum(image, axis=0, dtype=np.float64, out=table[1:, 1:])
+    np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+    return table
+
+
+def _box_filter_integral(image, window_size):
+    """
+    Box filter computed from a summed-area table, keeping only windows fully inside the image.
+    Each window mean costs four lookups regardless of window_size.
+    :param image: (height, width) or (height, width, channels) float32 array.
+    :param window_size: Width of the square window in pixels.
+    :return: float32 array of shape (height - window_size + 1, width - window_size + 1[, channels]).
+    """
+    table = _integral_image(image)
+    k = window_size
+    window_sums = table[k:, k:] - table[:-k, k:] - table[k:, :-k] + table[:-k, :-k]
+    return (window_sums * (1.0 / (k * k))).astype(np.float32)
+
+
+def window_mask(pixel_mask, window_size):
+    """
+    Reduces a pixel mask to the QSSIM windows that only cover compared pixels.
+    :param pixel_mask: bool (height, width) array, True for the pixels that are compared.
+    :param window_size: Width of the square window in pixels.
+    :return: bool array of shape (height - window_size + 1, width - window_size + 1).
+    """
+    table = _integral_image(pixel_mask)
+    k = window_size
+    window_counts = table[k:, k:] - table[:-k, k:] - table[k:, :-k] + table[:-k, :-k]
+    return window_counts > k * k - 0.5
+
+
+def _cross(a, b):
+    """
+    Per-pixel cross product of two (height, width, 3) arrays.
+    """
+    return np.stack([
+        a[..., 1] * b[..., 2] - a[..., 2] * b[..., 1],
+        a[..., 2] * b[..., 0] - a[..., 0] * b[..., 2],
+        a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0],
+    ], axis=-1)
+
+
+def qssim_from_moments(mu_a, mu_b, mean_sq_a, mean_sq_b, mean_dot, mean_cross):
+    """
+    Computes the per-window QSSIM map from local first and second order moments.
+    With pixels as pure quaternions, a * conj(b) = (a . b, -(a x b)), so every quaternion term reduces to
+    windowed means of the channels, their squared norms, their dot products and their cross products.
+    :param mu_a: (h, w, 3) local means of image a.
+    :param mu_b: (h, w, 3) local means of image b.
+    :param mean_sq_a: (h, w) local means of |a|^2.
+    :param mean_sq_b: (h, w) local means of |b|^2.
+    :param mean_dot: (h, w) local means of a . b.
+    :param mean_cross: (h, w, 3) local means of a x b.
+    :return: (h, w) float array of QSSIM values.
+    """
+    mu_a_sq = np.einsum('...c,...c->...', mu_a, mu_a)
+    mu_b_sq = np.einsum('...c,...c->...', mu_b, mu_b)
+    mu_dot = np.einsum('...c,...c->...', mu_a, mu_b)
+    mu_cross = _cross(mu_a, mu_b)
+
+    sigma_a_sq = mean_sq_a - mu_a_sq
+    sigma_b_sq = mean_sq_b - mu_b_sq
+    sigma_dot = mean_dot - mu_dot
+    sigma_cross = mean_cross - mu_cross
+
+    # |2 * q + C| where q = (dot, -cross) is a quaternion and C is a real constant.
+    luminance_num = np.sqrt((2.0 * mu_dot + C1) ** 2 + 4.0 * np.einsum('...c,...c->...', mu_cross, mu_cross))
+    structure_num = np.sqrt(
+        (2.0 * sigma_dot + C2) ** 2 + 4.0 * np.einsum('...c,...c->...', sigma_cross, sigma_cross))
+    denominator = (mu_a_sq + mu_b_sq + C1) * (sigma_a_sq + sigma_b_sq + C2)
+    return luminance_num * structure_num / denominator
+
+
+def _window_filter(window, window_size):
+    """
+    Returns a function that computes windowed means over the first two axes of an image.
+    :param window: WINDOW_GAUSSIAN, WINDOW_BOX or WINDOW_INTEGRAL (box window using summed-area tables).
+    :param window_size: Width of the window in pixels.
+    """
+    if window == WINDOW_INTEGRAL:
+        def window_filter(image):
+            return _box_filter_integral(image, window_size)
+    else:
+        kernel = _window_kernel(window, window_size)
+
+        def window_filter(image):
+            return _filter_valid(image, kernel)
+
+    return window_filter
+
+
+def image_moments(image, window=DEFAULT_WINDOW, window_size=DEFAULT_WINDOW_SIZE):
+    """
+    Computes the QSSIM statistics that only depend on one image, so they can be cached for golden images.
+    :param image: (height, width, 3) float32 array normalized to [0, 1].
+    :param window: WINDOW_GAUSSIAN, WINDOW_BOX or WINDOW_INTEGRAL.
+    :param window_size: Width of the local statistics window in pixels.
+    :return: tuple of (local means, local means of |image|^2)
+    """
+    window_filter = _window_filter(window, window_size)
+    return window_filter(image), window_filter(np.einsum('...c,...c->...', image, image))
+
+
+def qssim_map(image_a, image_b, window=DEFAULT_WINDOW, window_size=DEFAULT_WINDOW_SIZE, moments_a=None):
+    """
+    Computes the QSSIM map of two images.
+    :param image_a: (height, width, 3) float32 array normalized to [0, 1].
+    :param image_b: (height, width, 3) float32 array normalized to [0, 1].
+    :param window: WINDOW_GAUSSIAN, WINDOW_BOX or WINDOW_INTEGRAL (box window using summed-area tables).
+    :param window_size: Width of the local statistics window in pixels.
+    :param moments_a: Optional precomputed image_moments of image_a for the same window.
+    :return: (height - window_size + 1, width - window_size + 1) float array.
+    """
+    if image_a.shape != image_b.shape:
+        raise ImageShapeError(f"Image shapes differ: {image_a.shape[1::-1]} vs {image_b.shape[1::-1]}")
+    if min(image_a.shape[:2]) < window_size:
+        raise ValueError(f"Images of size {image_a.shape[1::-1]} are smaller than the {window_size}px window")
+
+    window_filter = _window_filter(window, window_size)
+    mu_a, mean_sq_a = moments_a if moments_a is not None else image_moments(image_a, window, window_size)
+    return qssim_from_moments(
+        mu_a,
+        window_filter(image_b),
+        mean_sq_a,
+        window_filter(np.einsum('...c,...c->...', image_b, image_b)),
+        window_filter(np.einsum('...c,...c->...', image_a, image_b)),
+        window_filter(_cross(image_a, image_b)),
+    )
+
+
+def qssim(golden_image, test_image, window=DEFAULT_WINDOW, window_size=DEFAULT_WINDOW_SIZE):
+    """
+    Scores the similarity of two images with quaternion SSIM.
+    :param golden_image: Path to the golden image, or an already decoded float32 array.
+    :param test_image: Path to the test image, or an already decoded float32 array.
+    :param window: WINDOW_GAUSSIAN, WINDOW_BOX or WINDOW_INTEGRAL.
+    :param window_size: Width of the local statistics window in pixels.
+    :return: The mean QSSIM value, 1.0 for identical images.
+    """
+    if isinstance(golden_image, (str, os.PathLike)):
+        golden_image = load_image(golden_image)
+    if isinstance(test_image, (str, os.PathLike)):
+        test_image = load_image(test_image)
+    return float(np.mean(qssim_map(golden_image, test_image, window, window_size)))
+
+
+ComparisonResult = collections.namedtuple(
+    'ComparisonResult',
+    ['score', 'passed', 'exact', 'tiles_scored', 'tile_count', 'worst_tiles', 'decision_factor', 'level_scores',
+     'reject_reason'],
+    defaults=[1, (), None])
+ComparisonResult.__doc__ = """
+Result of compare_tiled and compare_pyramid.
+score: The exact full resolution mean QSSIM if exact is True. Otherwise either the bound that decided a tiled result
+    (the upper bound for a failure, the lower bound for a pass) or the score of the pyramid level that failed it.
+worst_tiles: list of ((x, y, width, height), score) for the lowest scoring tiles, worst first, in full resolution
+    pixel coordinates.
+decision_factor: The downsampling factor of the level that made the decision, 1 for full resolution.
+level_scores: list of (factor, score) for every coarse pyramid level that was scored.
+reject_reason: Why screenshot_prefilter rejected the capture before scoring, in which case score is 0.0, otherwise None.
+"""
+
+
+def result_to_dict(result):
+    """
+    Converts a ComparisonResult to a JSON serializable dict.
+    """
+    return result._asdict()
+
+
+def result_from_dict(fields):
+    """
+    Rebuilds a ComparisonResult from result_to_dict output that went through JSON.
+    """
+    fields = dict(fields)
+    fields['worst_tiles'] = [(tuple(tile), score) for tile, score in fields['worst_tiles']]
+    fields['level_scores'] = tuple(tuple(level_score) for level_score in fields['level_scores'])
+    return ComparisonResult(**fields)
+
+
+def _tile_divergence_order(image_a, image_b, row_starts, col_starts, map_shape, window_size, pixel_mask=None):
+    """
+    Orders tiles by their mean absolute pixel difference, most divergent first.
+    This is a single cheap pass over the images used to find failing regions before paying for SSIM.
+    Masked out pixels do not count towards the difference.
+    """
+    rows = map_shape[0] + window_size - 1
+    cols = map_shape[1] + window_size - 1
+    difference = np.abs(image_a[:rows, :cols] - image_b[:rows, :cols]).sum(axis=-1)
+    if pixel_mask is not None:
+        difference *= pixel_mask[:rows, :cols]
+    tile_sums = np.add.reduceat(np.add.reduceat(difference, row_starts, axis=0), col_starts, axis=1)
+    return np.argsort(-tile_sums, axis=None, kind='stable')
+
+
+def compare_tiled(golden_image, test_image, threshold, tile_size=DEFAULT_TILE_SIZE, window=DEFAULT_WINDOW,
+                  window_size=DEFAULT_WINDOW_SIZE, worst_tile_count=DEFAULT_WORST_TILE_COUNT, golden_moments=None,
+                  pixel_mask=None):
+    """
+    Scores two images tile by tile and stops as soon as the pass/fail decision against threshold is known.
+    Tiles are scored in order of likely divergence. Since every window scores at most 1.0, the global score is bounded
+    by assuming the unscored windows are perfect (upper bound) or worthless (lower bound).
+    With a pixel_mask, only windows lying entirely on compared pixels are scored and fully masked tiles are skipped.
+    :param golden_image: Path to the golden image, or an already decoded float32 array.
+    :param test_image: Path to the test image, or an already decoded float32 array.
+    :param threshold: The minimum mean QSSIM for the images to be considered a match.
+    :param tile_size: Width and height of a tile, in QSSIM windows.
+    :param window: WINDOW_GAUSSIAN, WINDOW_BOX or WINDOW_INTEGRAL.
+    :param window_size: Width of the local statistics window in pixels.
+    :param worst_tile_count: Number of lowest scoring tiles to report.
+    :param golden_moments: Optional precomputed image_moments of the golden image, such as the cached statistics
+        returned by golden_cache.load_golden_statistics.
+    :param pixel_mask: Optional bool (height, width) array, True for the pixels that are compared.
+    :return: ComparisonResult
+    """
+    if isinstance(golden_image, (str, os.PathLike)):
+        golden_image = load_image(golden_image)
+    if isinstance(test_image, (str, os.PathLike)):
+        test_image = load_image(test_image)
+    if golden_image.shape != test_image.shape:
+        raise ImageShapeError(f"Image shapes differ: {golden_image.shape[1::-1]} vs {test_image.shape[1::-1]}")
+    if min(golden_image.shape[:2]) < window_size:
+        raise ValueError(f"Images of size {golden_image.shape[1::-1]} are smaller than the {window_size}px window")
+
+    map_shape = (golden_image.shape[0] - window_size + 1, golden_image.shape[1] - window_size + 1)
+    row_starts = np.arange(0, map_shape[0], tile_size)
+    col_starts = np.arange(0, map_shape[1], tile_size)
+    tile_order = _tile_divergence_order(
+        golden_image, test_image, row_starts, col_starts, map_shape, window_size, pixel_mask)
+
+    total_windows = map_shape[0] * map_shape[1]
+    compared_windows = None
+    if pixel_mask is not None:
+        compared_windows = window_mask(pixel_mask, window_size)
+        tile_window_counts = np.add.reduceat(
+            np.add.reduceat(compared_windows, row_starts, axis=0, dtype=np.int64), col_starts, axis=1)
+        tile_order = [tile_index for tile_index in tile_order if tile_window_counts.flat[tile_index]]
+        total_windows = int(tile_window_counts.sum())
+        if not total_windows:
+            raise ValueError(f"The mask leaves no complete {window_size}px window to compare")
+    scored_windows = 0
+    score_sum = 0.0
+    tile_scores = []
+    lower_bound = 0.0
+    upper_bound = 1.0
+    for tile_index in tile_order:
+        y = int(row_starts[tile_index // len(col_starts)])
+        x = int(col_starts[tile_index % len(col_starts)])
+        height = min(tile_size, map_shape[0] - y)
+        width = min(tile_size, map_shape[1] - x)
+        tile_map = qssim_map(
+            golden_image[y:y + height + window_size - 1, x:x + width + window_size - 1],
+            test_image[y:y + height + window_size - 1, x:x + width + window_size - 1],
+            window, window_size,
+            None if golden_moments is None else tuple(
+                np.asarray(moment[y:y + height, x:x + width]) for moment in golden_moments))
+        if compared_windows is None:
+            tile_sum = float(tile_map.sum(dtype=np.float64))
+            tile_windows = tile_map.size
+        else:
+            tile_mask = compared_windows[y:y + height, x:x + width]
+            tile_sum = float(tile_map.sum(where=tile_mask, dtype=np.float64))
+            tile_windows = int(np.count_nonzero(tile_mask))
+        tile_scores.append(((x, y, width, height), tile_sum / tile_windows))
+
+        score_sum += tile_sum
+        scored_windows += tile_windows
+        lower_bound = score_sum / total_windows
+        upper_bound = (score_sum + total_windows - scored_windows) / total_windows
+        if upper_bound < threshold or lower_bound >= threshold:
+            break
+
+    exact = scored_windows == total_windows
+    passed = lower_bound >= threshold
+    score = lower_bound if (exact or passed) else upper_bound
+    worst_tiles = sorted(tile_scores, key=lambda tile_score: tile_score[1])[:worst_tile_count]
+    return ComparisonResult(score, passed, exact, len(tile_scores), len(tile_order), worst_tiles)
+
+
+def _worst_tiles_from_map(score_map, tile_size, factor, worst_tile_count, compared_windows=None):
+    """
+    Groups a downsampled QSSIM map into tiles and returns the lowest scoring ones in full resolution coordinates.
+    Tiles without any compared window are never reported.
+    """
+    level_tile_size = max(1, tile_size // factor)
+    row_starts = np.arange(0, score_map.shape[0], level_tile_size)
+    col_starts = np.arange(0, score_map.shape[1], level_tile_size)
+    tile_heights = np.diff(np.append(row_starts, score_map.shape[0]))
+    tile_widths = np.diff(np.append(col_starts, score_map.shape[1]))
+    if compared_windows is None:
+        tile_window_counts = np.outer(tile_heights, tile_widths)
+    else:
+        score_map = np.where(compared_windows, score_map, 0.0)
+        tile_window_counts = np.add.reduceat(
+            np.add.reduceat(compared_windows, row_starts, axis=0, dtype=np.int64), col_starts, axis=1)
+    tile_sums = np.add.reduceat(np.add.reduceat(score_map, row_starts, axis=0), col_starts, axis=1)
+    tile_means = np.full(tile_sums.shape, np.inf)
+    np.divide(tile_sums, tile_window_counts, out=tile_means, where=tile_window_counts > 0)
+
+    worst_tiles = []
+    for tile_index in np.argsort(tile_means, axis=None, kind='stable')[:worst_tile_count]:
+        row, col = divmod(int(tile_index), len(col_starts))
+        if not tile_window_counts[row, col]:
+            break
+        worst_tiles.append((
+            (int(col_starts[col]) * factor, int(row_starts[row]) * factor,
+             int(tile_widths[col]) * factor, int(tile_heights[row]) * factor),
+            float(tile_means[row, col])))
+    return worst_tiles
+
+
+def compare_pyramid(golden_image, test_image, threshold, levels=DEFAULT_PYRAMID_LEVELS, tile_size=DEFAULT_TILE_SIZE,
+                    window=DEFAULT_WINDOW, window_size=DEFAULT_WINDOW_SIZE, worst_tile_count=DEFAULT_WORST_TILE_COUNT,
+                    golden_moments=None, golden_pyramid=None, pixel_mask=None):
+    """
+    Scores two images coarse to fine, failing early when a coarse level is far below threshold. Passes are always
+    confirmed at full resolution with compare_tiled, since downsampling hides high frequency differences.
+    With a pixel_mask, a downsampled pixel is compared only if its whole block is, so masked regions never leak into
+    the coarse scores.
+    :param golden_image: Path to the golden image, or an already decoded float32 array.
+    :param test_image: Path to the test image, or an already decoded float32 array.
+    :param threshold: The minimum mean QSSIM for the images to be considered a match.
+    :param levels: list of (factor, fail margin) ordered from coarsest to finest.
+    :param tile_size: Width and height of a full resolution tile, in QSSIM windows.
+    :param window: WINDOW_GAUSSIAN, WINDOW_BOX or WINDOW_INTEGRAL.
+    :param window_size: Width of the local statistics window in pixels, used at every level.
+    :param worst_tile_count: Number of lowest scoring tiles to report.
+    :param golden_moments: Optional precomputed image_moments of the full resolution golden image.
+    :param golden_pyramid: Optional dict of factor -> (downsampled golden image, its image_moments).
+    :param pixel_mask: Optional bool (height, width) array, True for the pixels that are compared.
+    :return: ComparisonResult
+    """
+    if isinstance(golden_image, (str, os.PathLike)):
+        golden_image = load_image(golden_image)
+    if isinstance(test_image, (str, os.PathLike)):
+        test_image = load_image(test_image)
+    if golden_image.shape != test_image.shape:
+        raise ImageShapeError(f"Image shapes differ: {golden_image.shape[1::-1]} vs {test_image.shape[1::-1]}")
+
+    level_scores = []
+    for factor, fail_margin in levels:
+        if golden_pyramid and factor in golden_pyramid:
+            golden_level, golden_level_moments = golden_pyramid[factor]
+        else:
+            golden_level, golden_level_moments = downsample_area(golden_image, factor), None
+        if min(golden_level.shape[:2]) < window_size:
+            continue
+        compared_windows = None
+        if pixel_mask is not None:
+            level_mask = downsample_area(pixel_mask[..., np.newaxis], factor)[..., 0] == 1.0
+            compared_windows = window_mask(level_mask, window_size)
+            if not compared_windows.any():
+                continue
+
+        score_map = qssim_map(
+            golden_level, downsample_area(test_image, factor), window, window_size, golden_level_moments)
+        score = float(np.mean(score_map if compared_windows is None else score_map[compared_windows]))
+        level_scores.append((factor, score))
+        logger.debug(f"Pyramid level 1/{factor} score: {score}")
+        if score < threshold - fail_margin:
+            worst_tiles = _worst_tiles_from_map(score_map, tile_size, factor, worst_tile_count, compared_windows)
+            return ComparisonResult(score, False, False, 0, 0, worst_tiles, factor, tuple(level_scores))
+
+    result = compare_tiled(golden_image, test_image, threshold, tile_size, window, window_size, worst_tile_count,
+                           golden_moments, pixel_mask)
+    return result._replace(level_scores=tuple(level_scores))
@@ -0,0 +1,105 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Quick-reject prefilter run before the QSSIM comparison.
+Per-channel histograms and a 64-bit DCT perceptual hash catch grossly broken captures, such as black frames, missing
+meshes or the wrong skybox, without scoring a single SSIM window. The reject limits are far looser than anything a
+capture scoring above the similarity threshold can reach, so the prefilter never rejects a matching capture.
+"""
+
+import collections
+
+import numpy as np
+
+HISTOGRAM_BINS = 32
+SAMPLE_STRIDE = 4
+PHASH_SIZE = 32
+PHASH_LOW_FREQUENCIES = 8
+# Largest per-channel earth mover's distance between histograms, in units of the full intensity range, that is still
+# scored. It grows with the mean intensity shift, so a uniform exposure change that SSIM tolerates is never rejected.
+HISTOGRAM_REJECT_DISTANCE = 0.15
+# Largest number of differing perceptual hash bits, out of 64, that is still scored. Unrelated images differ in 32.
+PHASH_REJECT_DISTANCE = 26
+# Minimum RMS of the low frequency DCT terms for the hash bits to be stable, flat images hash to noise otherwise.
+PHASH_MIN_ENERGY = 0.05
+
+ImageSignature = collections.namedtuple('ImageSignature', ['shape', 'histogram', 'phash'])
+ImageSignature.__doc__ = """
+Cheap summary of an image used by quick_reject.
+shape: (height, width) of the image.
+histogram: float32 (3, HISTOGRAM_BINS) array, the normalized histogram of each channel.
+phash: 64-bit perceptual hash of the luma as an int, or None when the image is too flat for the hash to be stable.
+"""
+
+
+def _dct_matrix(size):
+    """
+    Orthonormal DCT-II basis of the given size.
+    """
+    frequencies = np.arange(size)[:, np.newaxis]
+    positions = np.arange(size)[np.newaxis, :]
+    basis = np.cos(np.pi * (2 * positions + 1) * frequencies / (2 * size)) * np.sqrt(2.0 / size)
+    basis[0] /= np.sqrt(2.0)
+    return basis
+
+
+def perceptual_hash(luma):
+    """
+    Computes a 64-bit DCT perceptual hash: the low frequencies of the image reduced to PHASH_SIZE x PHASH_SIZE,
+    each set when above their median.
+    :param luma: float (height, width) array.
+    :return: int, or None if the low frequencies are below PHASH_MIN_ENERGY.
+    """
+    row_starts = np.linspace(0, luma.shape[0], PHASH_SIZE, endpoint=False).astype(int)
+    col_starts = np.linspace(0, luma.shape[1], PHASH_SIZE, endpoint=False).astype(int)
+    block_sums = np.add.reduceat(np.add.reduceat(luma, row_starts, axis=0, dtype=np.float64), col_starts, axis=1)
+    block_sizes = np.outer(
+        np.diff(np.append(row_starts, luma.shape[0])), np.diff(np.append(col_starts, luma.shape[1])))
+    reduced = block_sums / np.maximum(block_sizes, 1)
+
+    basis = _dct_matrix(PHASH_SIZE)[:PHASH_LOW_FREQUENCIES]
+    low_frequencies = (basis @ reduced @ basis.T).ravel()
+    if np.sqrt(np.mean(np.square(low_frequencies[1:]))) < PHASH_MIN_ENERGY:
+        return None
+    # The DC term only carries the mean brightness, which the histograms already cover.
+    bits = low_frequencies > np.median(low_frequencies[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def compute_signature(pixels, maxval):
+    """
+    Computes the ImageSignature of an image from a strided sample of its pixels.
+    :param pixels: (height, width, 3) integer array, or a float array normalized to [0, 1] with maxval 1.0.
+    :param maxval: The maximum sample value of pixels.
+    :return: ImageSignature
+    """
+    sample = np.asarray(pixels[::SAMPLE_STRIDE, ::SAMPLE_STRIDE], dtype=np.float32) * np.float32(1.0 / maxval)
+    bins = np.minimum((sample * HISTOGRAM_BINS).astype(np.intp), HISTOGRAM_BINS - 1).reshape(-1, 3)
+    histogram = np.stack([
+        np.bincount(bins[:, channel], minlength=HISTOGRAM_BINS) for channel in range(3)]).astype(np.float32)
+    histogram /= max(bins.shape[0], 1)
+    luma = sample @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    return ImageSignature(tuple(pixels.shape[:2]), histogram, perceptual_hash(luma))
+
+
+def quick_reject(golden_signature, test_signature):
+    """
+    Decides whether a capture is so different from its golden that scoring it is pointless.
+    Resolution mismatches are not handled here, they keep raising the ValueError of the comparison.
+    :param golden_signature: ImageSignature of the golden image.
+    :param test_signature: ImageSignature of the test screenshot.
+    :return: A description of why the capture was rejected, or None if it needs to be scored.
+    """
+    cumulative_difference = np.cumsum(golden_signature.histogram - test_signature.histogram, axis=1)
+    histogram_distance = float(np.abs(cumulative_difference).sum(axis=1).max()) / HISTOGRAM_BINS
+    if histogram_distance > HISTOGRAM_REJECT_DISTANCE:
+        return f"color histograms differ by {histogram_distance:.3f} (limit {HISTOGRAM_REJECT_DISTANCE})"
+    if golden_signature.phash is None or test_signature.phash is None:
+        return None
+    phash_distance = bin(golden_signature.phash ^ test_signature.phash).count('1')
+    if phash_distance > PHASH_REJECT_DISTANCE:
+        return f"perceptual hashes differ in {phash_distance} of 64 bits (limit {PHASH_REJECT_DISTANCE})"
+    return None
@@ -4,13 +4,97 @@ For complete copyright and license terms please see the LICENSE at the root of t
 
 SPDX-License-Identifier: Apache-2.0 OR MIT
 """
+import math
+import os
+import re
+import time
+
 import azlmbr.atom
 import azlmbr.legacy.general as general
+from . import step_timeline
 from .automated_test_utils import TestHelper as helper
 
 DEFAULT_FRAME_WIDTH = 1920
 DEFAULT_FRAME_HEIGHT = 1080
 FOLDER_PATH = '@user@/PythonTests/Automated/Screenshots'
+CAPTURE_SUBMIT_FRAMES = 1
+GAME_MODE_SETTLE_FRAMES = 120
+BURST_SETTLE_FRAMES = 5
+VIEWPORT_STABLE_FRAMES = 10
+VIEWPORT_RESIZE_TIMEOUT_FRAMES = 240
+STABILITY_PROBE_FILENAME = '_stability_probe.ppm'
+STABILITY_PROBE_INTERVAL_FRAMES = 10
+# Mean absolute difference of the sampled green channel, in [0, 1], below which two probes count as the same image.
+# Far below one 8-bit step over the whole frame, so a slow exposure or shadow transition is never mistaken as settled.
+STABILITY_EPSILON = 0.0005
+STABILITY_REQUIRED_PROBES = 2
+STABILITY_SAMPLE_GRID = 64
+PPM_HEADER_PATTERN = re.compile(rb'P6\s+(\d+)\s+(\d+)\s+(\d+)\s')
+PPM_HEADER_MAX_SIZE = 64
+
+
+@step_timeline.traced
+def wait_for_viewport_size(frame_width, frame_height, rel_tol=0.0, stable_frames=VIEWPORT_STABLE_FRAMES,
+                           timeout_frames=VIEWPORT_RESIZE_TIMEOUT_FRAMES):
+    """
+    Waits frame by frame until the viewport has the expected size and kept it for stable_frames frames, so the render
+    targets have been resized before anything is captured.
+    :param frame_width: Expected viewport width.
+    :param frame_height: Expected viewport height.
+    :param rel_tol: Relative tolerance of the size check.
+    :param stable_frames: Number of consecutive frames the viewport has to keep the expected size.
+    :param timeout_frames: Maximum number of frames to wait.
+    :return: True if the viewport size is stable at the expected size, False on timeout.
+    """
+    start_time = time.monotonic()
+    frames_waited = 0
+    frames_stable = 0
+    previous_size = None
+    while True:
+        viewport_size = general.get_viewport_size()
+        size = (int(viewport_size.x), int(viewport_size.y))
+        expected = math.isclose(size[0], frame_width, rel_tol=rel_tol) and \
+            math.isclose(size[1], frame_height, rel_tol=rel_tol)
+        frames_stable = frames_stable + 1 if expected and size == previous_size else 0
+        previous_size = size
+        if frames_stable >= stable_frames or frames_waited >= timeout_frames:
+            break
+        general.idle_wait_frames(1)
+        frames_waited = frames_waited + 1
+
+    stable = frames_stable >= stable_frames
+    general.log(f"Viewport size {size[0]}x{size[1]} {'stable' if stable else 'not stable'} after "
+                f"{frames_waited} frames ({time.monotonic() - start_time:.2f}s)")
+    return stable
+
+
+def read_probe_samples(probe_path):
+    """
+    Reads the green channel of a STABILITY_SAMPLE_GRID x STABILITY_SAMPLE_GRID grid of pixels of a binary PPM file.
+    Only the sampled rows are read, and only plain Python is used, the Editor Python does not ship numpy.
+    :return: bytes of samples, or None if the file is not an 8-bit binary PPM.
+    """
+    with open(probe_path, 'rb') as probe_file:
+        header = PPM_HEADER_PATTERN.match(probe_file.read(PPM_HEADER_MAX_SIZE))
+        if header is None or int(header.group(3)) > 255:
+            return None
+        width, height = int(header.group(1)), int(header.group(2))
+        row_size = width * 3
+        column_step = max(width // STABILITY_SAMPLE_GRID, 1) * 3
+        samples = bytearray()
+        for row in range(0, height, max(height // STABILITY_SAMPLE_GRID, 1)):
+            probe_file.seek(header.end() + row * row_size)
+            samples += probe_file.read(row_size)[1::column_step]
+    return bytes(samples)
+
+
+def probe_difference(previous_samples, samples):
+    """
+    Mean absolute difference between two sets of probe samples, in [0, 1].
+    """
+    if previous_samples is None or samples is None or len(previous_samples) != len(samples) or not samples:
+        return 1.0
+    return sum(abs(previous - current) for previous, current in zip(previous_samples, samples)) / (255.0 * len(samples))
 
 class ScreenshotHelper:
     """
@@ -22,15 +106,21 @@ class ScreenshotHelper:
         self.done = False
         self.capturedScreenshot = False
         self.max_frames_to_wait = 60
+        self.handler = None
+        self.pending_captures = []
+        self.capture_results = {}
+        self.written_files = {}
         self.prepare_viewport_for_screenshot(frame_width, frame_height)
         self.idle_wait_frames_callback = idle_wait_frames_callback
 
+    @step_timeline.traced
     def capture_screenshot_blocking_in_game_mode(self, filename):
         helper.enter_game_mode(["", ""])
-        general.idle_wait_frames(120)
+        self.wait_until_stable(timeout_frames=GAME_MODE_SETTLE_FRAMES)
         self.capture_screenshot_blocking(filename)
         helper.exit_game_mode(["", ""])
 
+    @step_timeline.traced
     def prepare_viewport_for_screenshot(self, frame_width, frame_height):
         cur_viewport_size = general.get_viewport_size()
         if int(cur_viewport_size.x) != frame_width or int(cur_viewport_size.y) != frame_height:
@@ -39,7 +129,7 @@ class ScreenshotHelper:
             general.set_viewport_size(frame_width, frame_height)
             general.set_cvar_integer('r_DisplayInfo', 0)
             general.update_viewport()
-            general.idle_wait_frames(120)
+            wait_for_viewport_size(frame_width, frame_height)
 
         new_viewport_size = general.get_viewport_size()
         if int(new_viewport_size.x) != frame_width or int(new_viewport_size.y) != frame_height:
@@ -47,42 +137,244 @@ class ScreenshotHelper:
             general.log(f"width: {int(new_viewport_size.x)}")
             general.log(f"height: {int(new_viewport_size.y)}")
 
+    @step_timeline.traced
     def capture_screenshot_blocking(self, filename, folder_path=FOLDER_PATH):
         """
         Capture a screenshot and block the execution until the screenshot has been written to the disk.
         """
-        self.handler = azlmbr.atom.FrameCaptureNotificationBusHandler()
-        self.handler.connect()
-        self.handler.add_callback('OnCaptureFinished', self.on_screenshot_captured)
-
-        self.done = False
-        self.capturedScreenshot = False
-        success = azlmbr.atom.FrameCaptureRequestBus(azlmbr.bus.Broadcast, "CaptureScreenshot", f"{folder_path}/{filename}")
-        if success:
-            self.wait_until_screenshot()
-            general.log("Screenshot taken.")
-        else:
-            general.log("screenshot failed")
+        capture_path = f"{folder_path}/{filename}"
+        if not self.queue_capture(filename, folder_path):
+            return False
+        self.capturedScreenshot = self.wait_for_captures().get(capture_path, False)
         return self.capturedScreenshot
 
-    def on_screenshot_captured(self, parameters):
-        # the parameters come in as a tuple
-        if parameters[0] == azlmbr.atom.FrameCaptureResult_Success:
-            general.log("screenshot saved: {}".format(parameters[1]))
-            self.capturedScreenshot = True
-        else:
-            general.log("screenshot failed: {}".format(parameters[1]))
-        self.done = True
-        self.handler.disconnect()
-
-    def wait_until_screenshot(self):
+    @step_timeline.traced
+    def queue_capture(self, filename, folder_path=FOLDER_PATH):
+        """
+        Request a screenshot of the current frame without waiting for it to be written to the disk, so the scene can
+        be changed for the next capture while the previous ones are written. Call wait_for_captures() before the test
+        ends or before relying on the files.
+        :return: True if the capture was requested.
+        """
+        capture_path = f"{folder_path}/{filename}"
+        self._connect_capture_handler()
         frames_waited = 0
-        while self.done == False:
+        while not azlmbr.atom.FrameCaptureRequestBus(azlmbr.bus.Broadcast, "CaptureScreenshot", capture_path):
+            # The frame capture system may only accept a new capture once the previous one has been written.
+            if not self.pending_captures or frames_waited > self.max_frames_to_wait:
+                general.log("screenshot failed")
+                self.capture_results[capture_path] = False
+                return False
             self.idle_wait_frames_callback(1)
+            frames_waited = frames_waited + 1
+        self.pending_captures.append(capture_path)
+        # Let the requested frame render before the caller changes the scene.
+        self.idle_wait_frames_callback(CAPTURE_SUBMIT_FRAMES)
+        return True
+
+    @step_timeline.traced
+    def queue_capture_in_game_mode(self, filename, folder_path=FOLDER_PATH):
+        """
+        Same as capture_screenshot_blocking_in_game_mode, but only waits for this capture to be written before leaving
+        game mode, since exiting tears down the game scene the frame is read back from. The result is collected by the
+        next wait_for_captures() with the other queued captures.
+        :return: True if the capture was requested.
+        """
+        helper.enter_game_mode(["", ""])
+        self.wait_until_stable(timeout_frames=GAME_MODE_SETTLE_FRAMES)
+        queued = self.queue_capture(filename, folder_path)
+        if queued:
+            self._wait_until_written(f"{folder_path}/{filename}")
+        helper.exit_game_mode(["", ""])
+        return queued
+
+    @step_timeline.traced
+    def capture_burst(self, captures, folder_path=FOLDER_PATH):
+        """
+        Applies a sequence of scene mutations, capturing a screenshot of the scene after each one, and waits for all of
+        the captures to be written.
+        When called in game mode the mutations have to change the running game entities, e.g. through TransformBus or
+        the runtime component request buses, since edits to editor components only reach the game on the next
+        enter_game_mode.
+        :param captures: list of (filename, mutation, ready) tuples.
+            mutation: callable applied before the capture, or None to capture the current state.
+            ready: optional callable returning True once the mutation is visible, polled every frame for up to
+                max_frames_to_wait frames. Without it BURST_SETTLE_FRAMES frames are rendered before the capture.
+                If ready() never returns True the capture is skipped and reported as not written.
+        :return: dict of capture path -> True if the screenshot was written.
+        """
+        for filename, mutation, ready in captures:
+            if mutation is not None:
+                mutation()
+                if not self.wait_until_ready(filename, ready):
+                    self.capture_results[f"{folder_path}/{filename}"] = False
+                    continue
+            self.queue_capture(filename, folder_path)
+        return self.wait_for_captures()
+
+    @step_timeline.traced
+    def wait_until_ready(self, filename, ready=None):
+        """
+        Waits until the scene is ready to capture filename: until ready() returns True, or for BURST_SETTLE_FRAMES
+        frames without it.
+        :return: True if the scene is ready, False if ready() did not return True within max_frames_to_wait frames.
+        """
+        if ready is None:
+            self.idle_wait_frames_callback(BURST_SETTLE_FRAMES)
+            return True
+        frames_waited = 0
+        while not ready():
             if frames_waited > self.max_frames_to_wait:
+                general.log(f"timeout while waiting for the scene to be ready for {filename}")
+                return False
+            self.idle_wait_frames_callback(1)
+            frames_waited = frames_waited + 1
+        return True
+
+    @step_timeline.traced
+    def capture_screenshot_when_stable(self, filename, folder_path=FOLDER_PATH, epsilon=STABILITY_EPSILON,
+                                       timeout_frames=GAME_MODE_SETTLE_FRAMES):
+        """
+        Waits until temporal effects such as eye adaptation have settled, see wait_until_stable(), then captures a
+        screenshot and blocks until it has been written to the disk.
+        """
+        self.wait_until_stable(epsilon, timeout_frames)
+        return self.capture_screenshot_blocking(filename, folder_path)
+
+    @step_timeline.traced
+    def wait_until_stable(self, epsilon=STABILITY_EPSILON, timeout_frames=GAME_MODE_SETTLE_FRAMES):
+        """
+        Captures a probe frame every STABILITY_PROBE_INTERVAL_FRAMES frames until STABILITY_REQUIRED_PROBES
+        consecutive probes differ from the previous one by less than epsilon, or until timeout_frames frames.
+        Probes are compared on a sparse grid of samples, so a probe costs its capture and little else. The cost of the
+        probes is measured against the frame time, and the wait never takes longer than rendering timeout_frames
+        frames would, the fixed wait it replaces.
+        :return: True if the frames converged, False if the timeout was reached first.
+        """
+        start_time = time.monotonic()
+        frames_waited = 0
+        stable_probes = 0
+        previous_samples = None
+        idle_time = 0.0
+        probe_time = 0.0
+        idle_frames = 0
+        while stable_probes < STABILITY_REQUIRED_PROBES and frames_waited < timeout_frames:
+            idle_start_time = time.monotonic()
+            self.idle_wait_frames_callback(STABILITY_PROBE_INTERVAL_FRAMES)
+            probe_start_time = time.monotonic()
+            samples, probe_frames = self._capture_probe()
+            idle_time = idle_time + probe_start_time - idle_start_time
+            probe_time = probe_time + time.monotonic() - probe_start_time
+            idle_frames = idle_frames + STABILITY_PROBE_INTERVAL_FRAMES
+            frames_waited = frames_waited + STABILITY_PROBE_INTERVAL_FRAMES + probe_frames
+            if probe_difference(previous_samples, samples) < epsilon:
+                stable_probes = stable_probes + 1
+            else:
+                stable_probes = 0
+            previous_samples = samples
+            fixed_wait_time = timeout_frames * idle_time / idle_frames
+            if fixed_wait_time > 0.0 and time.monotonic() - start_time >= fixed_wait_time:
+                break
+
+        stable = stable_probes >= STABILITY_REQUIRED_PROBES
+        frame_time = idle_time / idle_frames if idle_frames else 0.0
+        general.log(f"Frames {'stable' if stable else 'not stable'} after {frames_waited} frames "
+                    f"({time.monotonic() - start_time:.2f}s, probes {probe_time:.2f}s, "
+                    f"{timeout_frames} frame wait {timeout_frames * frame_time:.2f}s)")
+        return stable
+
+    def _capture_probe(self):
+        # Captures and waits for the probe alone, captures queued earlier keep being written in the background.
+        # Returns the probe samples and the number of frames the probe took.
+        probe_path = f"{FOLDER_PATH}/{STABILITY_PROBE_FILENAME}"
+        if not self.queue_capture(STABILITY_PROBE_FILENAME):
+            self.capture_results.pop(probe_path, None)
+            return None, 0
+        frames_waited = self._wait_until_written(probe_path)
+        if probe_path in self.pending_captures:
+            self.pending_captures.remove(probe_path)
+        self.capture_results.pop(probe_path, None)
+        written_file = self.written_files.pop(probe_path, None)
+        if written_file is None:
+            return None, frames_waited
+        samples = read_probe_samples(written_file)
+        os.remove(written_file)
+        return samples, frames_waited
+
+    def _wait_until_written(self, capture_path):
+        # Waits for a queued capture alone, for up to max_frames_to_wait frames since it was requested. It is left
+        # pending on timeout. Returns the number of frames the capture took.
+        frames_waited = CAPTURE_SUBMIT_FRAMES
+        while capture_path in self.pending_captures and frames_waited <= self.max_frames_to_wait:
+            self.idle_wait_frames_callback(1)
+            frames_waited = frames_waited + 1
+        return frames_waited
+
+    @step_timeline.traced
+    def wait_for_captures(self):
+        """
+        Block the execution until every queued capture has been written to the disk or has timed out.
+        The timeout restarts whenever a capture finishes, so it applies to each capture rather than to the whole queue.
+        :return: dict of capture path -> True if the screenshot was written, for every capture since the last wait.
+        """
+        frames_waited = 0
+        frames_since_capture = 0
+        pending_count = len(self.pending_captures)
+        while self.pending_captures:
+            if frames_since_capture > self.max_frames_to_wait:
                 general.log("timeout while waiting for the screenshot to be written")
-                self.handler.disconnect()
+                for capture_path in self.pending_captures:
+                    self.capture_results[capture_path] = False
+                self.pending_captures = []
                 break
-            else:
-                frames_waited = frames_waited + 1
+            self.idle_wait_frames_callback(1)
+            frames_waited = frames_waited + 1
+            frames_since_capture = frames_since_capture + 1
+            if len(self.pending_captures) < pending_count:
+                pending_count = len(self.pending_captures)
+                frames_since_capture = 0
         general.log("(waited {} frames)".format(frames_waited))
+        self._disconnect_capture_handler()
+        self.written_files = {}
+
+        capture_results = self.capture_results
+        self.capture_results = {}
+        return capture_results
+
+    def on_screenshot_captured(self, parameters):
+        # the parameters come in as a tuple
+        succeeded = parameters[0] == azlmbr.atom.FrameCaptureResult_Success
+        if succeeded:
+            general.log("screenshot saved: {}".format(parameters[1]))
+            general.log("Screenshot taken.")
+        else:
+            general.log("screenshot failed: {}".format(parameters[1]))
+        if not self.pending_captures:
+            return
+
+        # Captures finish in the order they were requested, so unmatched results belong to the oldest pending capture.
+        # File names are compared whole, so "spot_light.ppm" never completes a pending "light.ppm".
+        finished_name = os.path.normcase(os.path.basename(str(parameters[1])))
+        capture_path = next(
+            (pending_capture for pending_capture in self.pending_captures
+             if os.path.normcase(os.path.basename(pending_capture)) == finished_name),
+            self.pending_captures[0])
+        self.pending_captures.remove(capture_path)
+        self.capture_results[capture_path] = succeeded
+        if succeeded:
+            self.written_files[capture_path] = str(parameters[1])
+        self.capturedScreenshot = succeeded
+        self.done = not self.pending_captures
+
+    def _connect_capture_handler(self):
+        # A single handler serves every pending capture, completions are matched to captures by filename.
+        if self.handler is None:
+            self.handler = azlmbr.atom.FrameCaptureNotificationBusHandler()
+            self.handler.connect()
+            self.handler.add_callback('OnCaptureFinished', self.on_screenshot_captured)
+
+    def _disconnect_capture_handler(self):
+        if self.handler is not None:
+            self.handler.disconnect()
+            self.handler = None
+
@@ -0,0 +1,277 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Per-test timeline of the helper calls and waits of Editor test scripts, written as a Chrome trace that opens in
+chrome://tracing or https://ui.perfetto.dev.
+While a TimelineChannel is open, the helpers decorated with @traced and the general.idle_wait calls wrapped by
+trace_waits append a complete ("X") trace event each to the events file announced in the ATOMTEST_TIMELINE_FILE
+environment variable, one JSON event per line, so the events written before the Editor was torn down are kept.
+When the channel closes, pytest merges them with its own spans, such as launching the Editor, into the trace file.
+Without a channel the decorated helpers run unchanged.
+
+This module is imported on both sides, so it must only use the standard library.
+"""
+
+import functools
+import inspect
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+TIMELINE_FILE_ENV_VAR = 'ATOMTEST_TIMELINE_FILE'
+TIMELINE_FILE_SUFFIX = '_timeline.json'
+EVENTS_FILE_SUFFIX = '.events.jsonl'
+CATEGORY_HELPER = 'helper'
+CATEGORY_WAIT = 'wait'
+CATEGORY_HARNESS = 'harness'
+# idle_wait_frames is left unwrapped, it is mostly called once per frame by polling loops, which would add an event
+# per frame. The polling helpers are decorated with @traced instead, so their waits show up as one event each.
+WAIT_FUNCTION_NAMES = ('idle_wait',)
+MAX_ARG_LENGTH = 200
+
+_timeline = None
+
+
+def get_timeline_path(log_directory, test_name):
+    """
+    Returns the trace file of a test, in the log directory of its run.
+    """
+    return os.path.join(log_directory, re.sub(r'[^\w.-]', '_', test_name) + TIMELINE_FILE_SUFFIX)
+
+
+def _timestamp_us():
+    # Both processes use the wall clock, so their events line up in one trace.
+    return time.time() * 1e6
+
+
+class Timeline:
+    """
+    Collects complete trace events, appending each to events_path as it ends when one is given.
+    """
+
+    def __init__(self, events_path=None):
+        self.events_path = events_path
+        self.events = []
+        self._events_file = None
+        self._lock = threading.Lock()
+
+    def add_event(self, name, category, start_us, duration_us, args=None):
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': start_us,
+            'dur': duration_us,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+        }
+        if args:
+            event['args'] = args
+        with self._lock:
+            if self.events_path is None:
+                self.events.append(event)
+                return
+            if self._events_file is None:
+                # Line buffered, so every event reaches the file before the next helper call.
+                self._events_file = open(self.events_path, 'a', buffering=1, encoding='utf-8')
+            self._events_file.write(json.dumps(event, default=str) + '\n')
+
+    def span(self, name, category=CATEGORY_HELPER, args=None):
+        """
+        Returns a context manager adding an event for the time spent in its block.
+        """
+        return _Span(self, name, category, args)
+
+
+class _Span:
+
+    def __init__(self, timeline, name, category, args):
+        self.timeline = timeline
+        self.name = name
+        self.category = category
+        self.args = dict(args or {})
+
+    def __enter__(self):
+        self._start_us = _timestamp_us()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration_us = (time.perf_counter() - self._start) * 1e6
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        try:
+            self.timeline.add_event(self.name, self.category, self._start_us, duration_us, self.args)
+        except OSError as err:
+            logger.warning(f"Failed to write the timeline event of '{self.name}': {err}")
+
+
+def get_timeline():
+    """
+    Returns the Timeline writing to the events file announced in the ATOMTEST_TIMELINE_FILE environment variable, or
+    None when no timeline is recorded.
+    """
+    global _timeline
+    events_path = os.environ.get(TIMELINE_FILE_ENV_VAR)
+    if not events_path:
+        return None
+    if _timeline is None or _timeline.events_path != events_path:
+        _timeline = Timeline(events_path)
+    return _timeline
+
+
+def _simple_arg(value):
+    if isinstance(value, str):
+        return value[:MAX_ARG_LENGTH]
+    if isinstance(value, (int, float, bool)):
+        return value
+    if isinstance(value, tuple) and value and all(isinstance(item, (str, int, float, bool)) for item in value):
+        return list(value)
+    return None
+
+
+def _simple_args(signature, args, kwargs):
+    try:
+        bound_args = signature.bind(*args, **kwargs)
+    except TypeError:
+        return {}
+    simple_args = {}
+    for name, value in bound_args.arguments.items():
+        simple_value = _simple_arg(value)
+        if simple_value is not None and name not in ('self', 'cls'):
+            simple_args[name] = simple_value
+    return simple_args
+
+
+def traced(function=None, category=CATEGORY_HELPER):
+    """
+    Decorator adding an event for every call of the function to the timeline, named after its qualified name.
+    String and number arguments, such as level or screenshot names, are recorded as event args.
+    Apply it under @staticmethod.
+    """
+    if function is None:
+        return functools.partial(traced, category=category)
+    try:
+        signature = inspect.signature(function)
+    except (TypeError, ValueError):
+        signature = None
+
+    @functools.wraps(function)
+    def traced_function(*args, **kwargs):
+        timeline = get_timeline()
+        if timeline is None:
+            return function(*args, **kwargs)
+        call_args = _simple_args(signature, args, kwargs) if signature is not None else {}
+        with timeline.span(function.__qualname__, category, call_args):
+            return function(*args, **kwargs)
+
+    return traced_function
+
+
+def trace_waits(module, function_names=WAIT_FUNCTION_NAMES):
+    """
+    Wraps the wait functions of module, such as azlmbr.legacy.general, with @traced, so the timed waits test scripts
+    make directly show up in the timeline as well. Only done while a timeline is recorded, and only once per module.
+    :return: None
+    """
+    if get_timeline() is None:
+        return
+    for function_name in function_names:
+        function = getattr(module, function_name, None)
+        if function is None or getattr(function, '__wrapped__', None) is not None:
+            continue
+        module_name = module.__name__.rsplit('.', 1)[-1]
+        wrapped = traced(_named(function, f"{module_name}.{function_name}"), category=CATEGORY_WAIT)
+        setattr(module, function_name, wrapped)
+
+
+def _named(function, qualified_name):
+    # Functions of compiled modules have no writable __qualname__, so wrap them in one that has.
+    def named_function(*args, **kwargs):
+        return function(*args, **kwargs)
+    named_function.__qualname__ = qualified_name
+    named_function.__name__ = qualified_name
+    return named_function
+
+
+class TimelineChannel:
+    """
+    pytest side: announces the events file of a test's timeline to the Editor through the ATOMTEST_TIMELINE_FILE
+    environment variable, and writes the trace file from its events and the spans of this process when closed.
+    Use as a context manager around launching the Editor and validating its log.
+    """
+
+    def __init__(self, timeline_path, process_name='pytest'):
+        self.timeline_path = timeline_path
+        self.events_path = timeline_path + EVENTS_FILE_SUFFIX
+        self.process_name = process_name
+        self.timeline = Timeline()
+        self._previous_events_path = None
+
+    def __enter__(self):
+        for stale_path in (self.timeline_path, self.events_path):
+            if os.path.isfile(stale_path):
+                os.remove(stale_path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.timeline_path)), exist_ok=True)
+        self._previous_events_path = os.environ.get(TIMELINE_FILE_ENV_VAR)
+        os.environ[TIMELINE_FILE_ENV_VAR] = self.events_path
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._previous_events_path is None:
+            os.environ.pop(TIMELINE_FILE_ENV_VAR, None)
+        else:
+            os.environ[TIMELINE_FILE_ENV_VAR] = self._previous_events_path
+        try:
+            self.write_trace()
+        except OSError as err:
+            logger.warning(f"Failed to write the timeline '{self.timeline_path}': {err}")
+
+    def span(self, name, args=None):
+        """
+        Returns a context manager adding an event of this process to the trace, see Timeline.span.
+        """
+        return self.timeline.span(name, CATEGORY_HARNESS, args)
+
+    def read_events(self):
+        """
+        Reads the events written by the Editor. A last event cut off by the Editor being torn down is skipped.
+        :return: list of trace event dicts.
+        """
+        events = []
+        if not os.path.isfile(self.events_path):
+            return events
+        with open(self.events_path, 'r', encoding='utf-8', errors='replace') as events_file:
+            for line in events_file:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    logger.debug(f"Skipping incomplete timeline event in '{self.events_path}': {line!r}")
+        return events
+
+    def write_trace(self):
+        """
+        Writes the Chrome trace file and removes the events file.
+        :return: None
+        """
+        events = self.read_events() + self.timeline.events
+        process_names = {os.getpid(): self.process_name}
+        for event in events:
+            process_names.setdefault(event['pid'], 'Editor')
+        metadata = [
+            {'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': process_name}}
+            for pid, process_name in process_names.items()
+        ]
+        with open(self.timeline_path, 'w', encoding='utf-8') as timeline_file:
+            json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, timeline_file)
+        if os.path.isfile(self.events_path):
+            os.remove(self.events_path)
+        logger.info(f"Wrote the timeline of {len(events)} events to '{self.timeline_path}'")
@@ -8,12 +8,26 @@ pytest config file for AtomTest
 """
 import os
 
+import pytest
+
+SCREENSHOT_COMPARE_MODES = ["tiled", "pyramid"]
+
 
 def pytest_addoption(parser):
     parser.addoption(
         "--open-beyond-compare", action="store_true", default=False,
         help="Open Beyond Compare screenshot comparison tool"
     )
+    parser.addoption(
+        "--screenshot-compare-mode", action="store", default="tiled", choices=SCREENSHOT_COMPARE_MODES,
+        help="Screenshot comparison mode: 'tiled' scores full resolution tiles, "
+             "'pyramid' fails clearly broken screenshots at 1/8 or 1/4 resolution and scores passes at full resolution"
+    )
+
+
+@pytest.fixture
+def screenshot_compare_mode(request):
+    return request.config.getoption("screenshot_compare_mode")
 
 
 def pytest_generate_tests(metafunc):
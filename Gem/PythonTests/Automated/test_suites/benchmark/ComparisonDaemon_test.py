@@ -0,0 +1,151 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Tests the comparison daemon request handling, and the fallback to comparing in process when the daemon socket is
+missing or stale.
+"""
+
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from Automated.atom_utils import automated_test_base
+from Automated.atom_utils import comparison_daemon
+from Automated.atom_utils import golden_cache
+from Automated.atom_utils import image_utils
+
+IMAGE_SIZE = 64
+DAEMON_START_TIMEOUT = 10.0
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="The comparison daemon needs Unix sockets")
+
+
+def _wait_until_serving(socket_path):
+    deadline = time.monotonic() + DAEMON_START_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            return comparison_daemon._send_request({'command': 'ping'}, socket_path)
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError(f"The comparison daemon did not start listening on '{socket_path}'")
+
+
+def _comparisons(results):
+    """
+    Reduces comparison results to what the tests compare: the screenshot, score, pass/fail and error of each.
+    """
+    return [(test_screenshot, None if result is None else (round(result.score, 6), result.passed), error)
+            for test_screenshot, result, error, _ in results]
+
+
+class TestComparisonDaemon(object):
+
+    @pytest.fixture
+    def screenshots(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(golden_cache.CACHE_DIR_ENV_VAR, str(tmp_path / 'cache'))
+        rng = np.random.default_rng(seed=0)
+        pixels = rng.integers(0, 256, (IMAGE_SIZE, IMAGE_SIZE, 3), dtype=np.uint8)
+        golden_screenshot = str(tmp_path / 'golden.ppm')
+        matching_screenshot = str(tmp_path / 'matching.ppm')
+        different_screenshot = str(tmp_path / 'different.ppm')
+        image_utils.write_ppm(golden_screenshot, pixels)
+        image_utils.write_ppm(matching_screenshot, pixels)
+        image_utils.write_ppm(different_screenshot, 255 - pixels)
+        return golden_screenshot, [matching_screenshot, different_screenshot]
+
+    @pytest.fixture
+    def socket_path(self, monkeypatch):
+        # Unix socket paths are limited to about a hundred characters, far shorter than pytest's tmp_path.
+        socket_dir = tempfile.mkdtemp(prefix='atomtest')
+        socket_path = os.path.join(socket_dir, comparison_daemon.SOCKET_FILENAME)
+        monkeypatch.setenv(comparison_daemon.SOCKET_ENV_VAR, socket_path)
+        yield socket_path
+        shutil.rmtree(socket_dir, ignore_errors=True)
+
+    @pytest.fixture
+    def daemon(self, screenshots, socket_path):
+        server_thread = threading.Thread(
+            target=comparison_daemon.serve, args=(socket_path,), kwargs={'idle_timeout': 60.0}, daemon=True)
+        server_thread.start()
+        _wait_until_serving(socket_path)
+        yield socket_path
+        comparison_daemon._send_request({'command': 'stop'}, socket_path)
+        server_thread.join(timeout=DAEMON_START_TIMEOUT)
+        assert not server_thread.is_alive()
+        assert not os.path.exists(socket_path)
+
+    def test_ComparisonDaemon_Ping_RepliesAlgorithmVersion(self, daemon):
+        response = comparison_daemon._send_request({'command': 'ping'}, daemon)
+
+        assert response == {'version': comparison_daemon.ALGORITHM_VERSION}
+
+    def test_ComparisonDaemon_CompareRequest_SameResultsAsInProcess(self, daemon, screenshots):
+        golden_screenshot, test_screenshots = screenshots
+
+        daemon_results = comparison_daemon.request_comparison(golden_screenshot, test_screenshots, 'tiled')
+        in_process_results = automated_test_base._compare_against_golden(golden_screenshot, test_screenshots, 'tiled')
+
+        assert daemon_results is not None
+        assert _comparisons(daemon_results) == _comparisons(in_process_results)
+        assert [result.passed for _, result, _, _ in daemon_results] == [True, False]
+
+    @pytest.mark.parametrize('request_message, error', [
+        ({'command': 'compare', 'version': -1}, "Restart the comparison daemon"),
+        ({'command': 'unknown'}, "Unknown command 'unknown'"),
+        ({'command': 'compare', 'version': comparison_daemon.ALGORITHM_VERSION}, "KeyError"),
+    ])
+    def test_ComparisonDaemon_BadRequest_RepliesError(self, daemon, request_message, error):
+        response = comparison_daemon._send_request(request_message, daemon)
+
+        assert error in response['error']
+        # The daemon keeps serving after a bad request.
+        assert _wait_until_serving(daemon) == {'version': comparison_daemon.ALGORITHM_VERSION}
+
+    def test_ComparisonDaemon_ComparisonFails_ClientFallsBack(self, daemon, screenshots, tmp_path):
+        _, test_screenshots = screenshots
+
+        assert comparison_daemon.request_comparison(str(tmp_path / 'missing.ppm'), test_screenshots, 'tiled') is None
+
+    def test_ComparisonDaemon_AlreadyRunning_SecondDaemonRefused(self, daemon):
+        with pytest.raises(RuntimeError, match="already running"):
+            comparison_daemon.serve(daemon)
+
+    def test_CompareScreenshots_NoSocket_ComparedInProcess(self, screenshots, socket_path):
+        golden_screenshot, test_screenshots = screenshots
+        assert not os.path.exists(socket_path)
+
+        results = automated_test_base._compare_screenshots_to_golden(golden_screenshot, test_screenshots, 'tiled')
+
+        assert [result.passed for _, result, _, _ in results] == [True, False]
+
+    def test_CompareScreenshots_StaleSocket_ComparedInProcess(self, screenshots, socket_path):
+        golden_screenshot, test_screenshots = screenshots
+        # A socket file left behind by a daemon that was killed, nothing listens on it anymore.
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale_socket:
+            stale_socket.bind(socket_path)
+
+        assert comparison_daemon.request_comparison(golden_screenshot, test_screenshots, 'tiled') is None
+        results = automated_test_base._compare_screenshots_to_golden(golden_screenshot, test_screenshots, 'tiled')
+
+        assert [result.passed for _, result, _, _ in results] == [True, False]
+
+    def test_ComparisonDaemon_StaleSocket_Replaced(self, screenshots, socket_path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale_socket:
+            stale_socket.bind(socket_path)
+        server_thread = threading.Thread(
+            target=comparison_daemon.serve, args=(socket_path,), kwargs={'idle_timeout': 60.0}, daemon=True)
+        server_thread.start()
+
+        assert _wait_until_serving(socket_path) == {'version': comparison_daemon.ALGORITHM_VERSION}
+        comparison_daemon._send_request({'command': 'stop'}, socket_path)
+        server_thread.join(timeout=DAEMON_START_TIMEOUT)
+        assert not server_thread.is_alive()
@@ -0,0 +1,133 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Tests building comparison masks from regions and mask images, and cropping golden statistics to their bounds.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from Automated.atom_utils import comparison_mask
+from Automated.atom_utils import golden_cache
+from Automated.atom_utils import image_utils
+from Automated.atom_utils import screenshot_compare
+
+IMAGE_HEIGHT = 96
+IMAGE_WIDTH = 128
+PYRAMID_FACTORS = (8, 4)
+
+
+class TestComparisonMask(object):
+
+    def test_BuildComparisonMask_NoRegionsOrMask_ComparesEverything(self):
+        assert comparison_mask.build_comparison_mask((IMAGE_HEIGHT, IMAGE_WIDTH)) is None
+
+    def test_BuildComparisonMask_IncludeAndExcludeRegions_BoundsCropped(self):
+        mask = comparison_mask.build_comparison_mask(
+            (IMAGE_HEIGHT, IMAGE_WIDTH), include_regions=[[10, 20, 40, 30]], exclude_regions=[[10, 20, 5, 30]])
+
+        assert mask.bounds == (15, 20, 35, 30)
+        assert mask.image_shape == (IMAGE_HEIGHT, IMAGE_WIDTH)
+        assert mask.pixels.shape == (30, 35)
+        assert mask.pixels.all()
+
+    def test_BuildComparisonMask_ExcludedHole_HoleNotCompared(self):
+        mask = comparison_mask.build_comparison_mask(
+            (IMAGE_HEIGHT, IMAGE_WIDTH), exclude_regions=[[40, 30, 20, 10]])
+
+        assert mask.bounds == (0, 0, IMAGE_WIDTH, IMAGE_HEIGHT)
+        assert not mask.pixels[30:40, 40:60].any()
+        assert mask.pixels.sum() == IMAGE_HEIGHT * IMAGE_WIDTH - 20 * 10
+
+    def test_BuildComparisonMask_Alignment_BoundsGrownToMultiples(self):
+        mask = comparison_mask.build_comparison_mask(
+            (IMAGE_HEIGHT, IMAGE_WIDTH), include_regions=[[10, 20, 40, 30]], alignment=8)
+
+        assert mask.bounds == (8, 16, 48, 40)
+        # The pixels added by the alignment are decoded but not compared.
+        assert mask.pixels.sum() == 40 * 30
+        assert mask.pixels[4:34, 2:42].all()
+
+    def test_BuildComparisonMask_AlignmentPastImageEdge_BoundsClipped(self):
+        mask = comparison_mask.build_comparison_mask(
+            (IMAGE_HEIGHT, IMAGE_WIDTH - 4), include_regions=[[100, 70, 24, 26]], alignment=8)
+
+        assert mask.bounds == (96, 64, IMAGE_WIDTH - 4 - 96, IMAGE_HEIGHT - 64)
+
+    def test_BuildComparisonMask_MaskImage_BlackPixelsNotCompared(self):
+        mask_image = np.full((IMAGE_HEIGHT, IMAGE_WIDTH, 3), 255, dtype=np.uint8)
+        mask_image[:, :32] = 0
+
+        mask = comparison_mask.build_comparison_mask((IMAGE_HEIGHT, IMAGE_WIDTH), mask_image=mask_image)
+
+        assert mask.bounds == (32, 0, IMAGE_WIDTH - 32, IMAGE_HEIGHT)
+        assert mask.pixels.all()
+
+    @pytest.mark.parametrize('include_regions, exclude_regions, mask_image_shape, error', [
+        ([[0, 0, 8, 8]], None, None, "no complete 11px window"),
+        (None, [[0, 0, IMAGE_WIDTH, IMAGE_HEIGHT]], None, "no complete 11px window"),
+        ([[0, 0, 16]], None, None, "include regions"),
+        (None, [[0, -1, 16, 16]], None, "exclude regions"),
+        (None, None, (IMAGE_HEIGHT // 2, IMAGE_WIDTH // 2, 3), "does not match the screenshot size"),
+    ])
+    def test_BuildComparisonMask_InvalidMask_Raises(self, include_regions, exclude_regions, mask_image_shape, error):
+        mask_image = None if mask_image_shape is None else np.full(mask_image_shape, 255, dtype=np.uint8)
+
+        with pytest.raises(comparison_mask.MaskError, match=error):
+            comparison_mask.build_comparison_mask(
+                (IMAGE_HEIGHT, IMAGE_WIDTH), include_regions, exclude_regions, mask_image)
+
+    def test_LoadComparisonMask_SidecarRegions_CombinedWithTestRegions(self, tmp_path):
+        golden_screenshot = str(tmp_path / 'golden.ppm')
+        _, mask_regions_path = comparison_mask.get_mask_paths(golden_screenshot)
+        with open(mask_regions_path, 'w') as mask_regions_file:
+            json.dump({'include': [[0, 0, 64, 48]]}, mask_regions_file)
+
+        mask = comparison_mask.load_comparison_mask(
+            golden_screenshot, (IMAGE_HEIGHT, IMAGE_WIDTH), exclude_regions=[[0, 0, 16, 48]])
+
+        assert mask.bounds == (16, 0, 48, 48)
+
+    def test_CropGoldenStatistics_AlignedMask_SameAsStatisticsOfCroppedGolden(self, tmp_path):
+        rng = np.random.default_rng(seed=0)
+        golden_screenshot = str(tmp_path / 'golden.ppm')
+        image_utils.write_ppm(golden_screenshot, rng.integers(0, 256, (IMAGE_HEIGHT, IMAGE_WIDTH, 3), dtype=np.uint8))
+        golden = golden_cache.load_golden_statistics(
+            golden_screenshot, pyramid_factors=PYRAMID_FACTORS, cache_dir=str(tmp_path / 'cache'))
+        mask = comparison_mask.build_comparison_mask(
+            (IMAGE_HEIGHT, IMAGE_WIDTH), include_regions=[[20, 10, 90, 70]], alignment=max(PYRAMID_FACTORS))
+        x, y, width, height = mask.bounds
+
+        cropped = comparison_mask.crop_golden_statistics(golden, mask)
+
+        expected_image = np.asarray(golden.image)[y:y + height, x:x + width]
+        assert np.array_equal(cropped.image, expected_image)
+        for moment, expected_moment in zip(cropped.moments, screenshot_compare.image_moments(expected_image)):
+            np.testing.assert_allclose(moment, expected_moment, atol=1e-6)
+        assert cropped.content_hash == golden.content_hash
+        assert cropped.signature is None
+        for factor in PYRAMID_FACTORS:
+            level_image, level_moments = cropped.pyramid[factor]
+            np.testing.assert_allclose(level_image, image_utils.downsample_area(expected_image, factor), atol=1e-6)
+            assert level_moments is None or level_moments[0].shape[:2] == (
+                height // factor - screenshot_compare.DEFAULT_WINDOW_SIZE + 1,
+                width // factor - screenshot_compare.DEFAULT_WINDOW_SIZE + 1)
+
+    def test_CropGoldenStatistics_UnalignedMask_PyramidLevelsDropped(self, tmp_path):
+        rng = np.random.default_rng(seed=0)
+        golden_screenshot = str(tmp_path / 'golden.ppm')
+        image_utils.write_ppm(golden_screenshot, rng.integers(0, 256, (IMAGE_HEIGHT, IMAGE_WIDTH, 3), dtype=np.uint8))
+        golden = golden_cache.load_golden_statistics(
+            golden_screenshot, pyramid_factors=PYRAMID_FACTORS, cache_dir=str(tmp_path / 'cache'))
+        mask = comparison_mask.build_comparison_mask(
+            (IMAGE_HEIGHT, IMAGE_WIDTH), include_regions=[[4, 10, 90, 70]], alignment=2)
+
+        cropped = comparison_mask.crop_golden_statistics(golden, mask)
+
+        assert cropped.pyramid == {}
+        assert cropped.image.shape[:2] == (mask.bounds[3], mask.bounds[2])
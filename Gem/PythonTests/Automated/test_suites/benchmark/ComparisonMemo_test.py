@@ -0,0 +1,98 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Tests the comparison_memo keys, the least recently used eviction of the memo and its invalidation when
+ALGORITHM_VERSION changes.
+"""
+
+import itertools
+
+import pytest
+
+from Automated.atom_utils import comparison_memo
+from Automated.atom_utils import screenshot_compare
+
+CAPTURE_HASH = 'a' * 64
+GOLDEN_HASH = 'b' * 64
+
+
+def _result(score):
+    return screenshot_compare.ComparisonResult(
+        score=score, passed=score >= 0.99, exact=True, tiles_scored=4, tile_count=4,
+        worst_tiles=[((0, 0, 128, 128), score)], decision_factor=1, level_scores=((8, 0.999),))
+
+
+def _key(index):
+    return comparison_memo.comparison_key(CAPTURE_HASH, GOLDEN_HASH, mode='tiled', threshold=0.99, index=index)
+
+
+class TestComparisonMemo(object):
+
+    @pytest.fixture
+    def memo_path(self, tmp_path):
+        return str(tmp_path / comparison_memo.MEMO_FILENAME)
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        # Every read of the clock is later than the previous one, whatever the resolution of time.time().
+        ticks = itertools.count(1)
+        monkeypatch.setattr(comparison_memo.time, 'time', lambda: float(next(ticks)))
+
+    def test_ComparisonMemo_PutThenGet_SameResult(self, memo_path):
+        with comparison_memo.ComparisonMemo(memo_path) as memo:
+            assert memo.get(_key(0)) is None
+            memo.put(_key(0), _result(0.995))
+            assert memo.get(_key(0)) == _result(0.995)
+
+        with comparison_memo.ComparisonMemo(memo_path) as memo:
+            assert memo.get(_key(0)) == _result(0.995)
+
+    def test_ComparisonKey_ParameterOrder_SameKey(self):
+        assert comparison_memo.comparison_key(CAPTURE_HASH, GOLDEN_HASH, mode='tiled', threshold=0.99) == \
+            comparison_memo.comparison_key(CAPTURE_HASH, GOLDEN_HASH, threshold=0.99, mode='tiled')
+        assert comparison_memo.comparison_key(CAPTURE_HASH, GOLDEN_HASH, mode='tiled', threshold=0.99) != \
+            comparison_memo.comparison_key(CAPTURE_HASH, GOLDEN_HASH, mode='tiled', threshold=0.98)
+        assert comparison_memo.comparison_key(CAPTURE_HASH, GOLDEN_HASH) != \
+            comparison_memo.comparison_key(GOLDEN_HASH, CAPTURE_HASH)
+
+    def test_ComparisonMemo_AlgorithmVersionBumped_PreviousResultsMissed(self, memo_path, monkeypatch):
+        with comparison_memo.ComparisonMemo(memo_path) as memo:
+            memo.put(_key(0), _result(0.995))
+            monkeypatch.setattr(comparison_memo, 'ALGORITHM_VERSION', comparison_memo.ALGORITHM_VERSION + 1)
+
+            assert memo.get(_key(0)) is None
+            memo.put(_key(0), _result(0.5))
+            assert memo.get(_key(0)) == _result(0.5)
+
+    def test_ComparisonMemo_OverMaxSize_LeastRecentlyUsedEvicted(self, memo_path, clock):
+        with comparison_memo.ComparisonMemo(memo_path) as memo:
+            memo.put(_key(0), _result(0.995))
+            result_size = memo._connect().execute('SELECT size FROM results').fetchone()[0]
+        # Room for two and a half results, so that trimming to the eviction target evicts exactly one.
+        with comparison_memo.ComparisonMemo(memo_path, max_size=result_size * 5 // 2) as memo:
+            memo.put(_key(1), _result(0.995))
+            assert memo.get(_key(0)) is not None
+            memo.put(_key(2), _result(0.995))
+
+            assert memo.get(_key(1)) is None
+            assert memo.get(_key(0)) == _result(0.995)
+            assert memo.get(_key(2)) == _result(0.995)
+
+    def test_ComparisonMemo_UnderMaxSize_NothingEvicted(self, memo_path, clock):
+        with comparison_memo.ComparisonMemo(memo_path) as memo:
+            for index in range(100):
+                memo.put(_key(index), _result(0.995))
+
+            assert all(memo.get(_key(index)) is not None for index in range(100))
+
+    def test_ComparisonMemo_UnusableDatabase_TreatedAsMiss(self, tmp_path):
+        # A directory where the database should be cannot be opened as one.
+        memo_path = tmp_path / comparison_memo.MEMO_FILENAME
+        memo_path.mkdir()
+
+        with comparison_memo.ComparisonMemo(str(memo_path)) as memo:
+            memo.put(_key(0), _result(0.995))
+            assert memo.get(_key(0)) is None
@@ -0,0 +1,136 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Tests the artifacts failure_report writes for a failed comparison: the diff heatmap, the tile score grid and the
+side-by-side thumbnail, and reusing them for the same comparison.
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from Automated.atom_utils import comparison_mask
+from Automated.atom_utils import failure_report
+from Automated.atom_utils import image_utils
+from Automated.atom_utils import screenshot_compare
+
+IMAGE_HEIGHT = 96
+IMAGE_WIDTH = 128
+TILE_SIZE = 32
+FACTOR = 4
+# Map of 86 x 118 windows in 32 x 32 tiles.
+TILE_ROWS = 3
+TILE_COLUMNS = 4
+COMPARISON_KEY = 'c' * 64
+
+
+def _write_report(golden_screenshot, test_screenshot, **kwargs):
+    return failure_report.write_failure_report(
+        golden_screenshot, test_screenshot, tile_size=TILE_SIZE, factor=FACTOR, **kwargs)
+
+
+class TestFailureReport(object):
+
+    @pytest.fixture
+    def screenshots(self, tmp_path):
+        """
+        A random golden, and a test screenshot with a white block in its bottom right tile.
+        """
+        rng = np.random.default_rng(seed=0)
+        golden_pixels = rng.integers(0, 256, (IMAGE_HEIGHT, IMAGE_WIDTH, 3), dtype=np.uint8)
+        test_pixels = golden_pixels.copy()
+        test_pixels[72:, 104:] = 255
+        golden_screenshot = str(tmp_path / 'golden.ppm')
+        test_screenshot = str(tmp_path / 'screenshot.ppm')
+        image_utils.write_ppm(golden_screenshot, golden_pixels)
+        image_utils.write_ppm(test_screenshot, test_pixels)
+        return golden_screenshot, test_screenshot
+
+    def test_WriteFailureReport_DefaultPrefix_ArtifactsNextToScreenshot(self, screenshots, tmp_path):
+        golden_screenshot, test_screenshot = screenshots
+
+        report = _write_report(golden_screenshot, test_screenshot)
+
+        output_prefix = str(tmp_path / 'screenshot')
+        assert report.heatmap == output_prefix + failure_report.HEATMAP_SUFFIX
+        assert report.tile_scores == output_prefix + failure_report.TILE_SCORES_SUFFIX
+        assert report.side_by_side == output_prefix + failure_report.SIDE_BY_SIDE_SUFFIX
+        assert all(os.path.isfile(path) for path in report[:3])
+
+    def test_WriteFailureReport_Images_DownscaledByFactor(self, screenshots):
+        report = _write_report(*screenshots)
+
+        heatmap, heatmap_maxval = image_utils.read_png(report.heatmap)
+        side_by_side, _ = image_utils.read_png(report.side_by_side)
+
+        thumbnail_width = IMAGE_WIDTH // FACTOR
+        assert heatmap_maxval == 255
+        assert heatmap.shape == (IMAGE_HEIGHT // FACTOR, thumbnail_width, 3)
+        assert side_by_side.shape == (IMAGE_HEIGHT // FACTOR, 3 * thumbnail_width, 3)
+        assert np.array_equal(side_by_side[:, 2 * thumbnail_width:], heatmap)
+        golden_pixels, _ = image_utils.read_ppm(screenshots[0])
+        golden_thumbnail = np.round(image_utils.downsample_area(
+            image_utils.to_float_image(golden_pixels, 255), FACTOR) * 255.0).astype(np.uint8)
+        assert np.array_equal(side_by_side[:, :thumbnail_width], golden_thumbnail)
+
+    def test_WriteFailureReport_Heatmap_OnlyDifferenceLit(self, screenshots):
+        report = _write_report(*screenshots)
+
+        heatmap, _ = image_utils.read_png(report.heatmap)
+
+        # The ramp starts at red, so any difference lights the red channel.
+        assert heatmap[72 // FACTOR:, 104 // FACTOR:, 0].min() > 0
+        assert not heatmap[:72 // FACTOR].any()
+        assert not heatmap[:, :104 // FACTOR].any()
+
+    def test_WriteFailureReport_TileScores_GridAndExactScore(self, screenshots):
+        golden_screenshot, test_screenshot = screenshots
+
+        report = _write_report(golden_screenshot, test_screenshot, comparison_key=COMPARISON_KEY)
+
+        with open(report.tile_scores) as tile_scores_file:
+            tile_scores = json.load(tile_scores_file)
+        assert tile_scores['comparison_key'] == COMPARISON_KEY
+        assert (tile_scores['rows'], tile_scores['columns']) == (TILE_ROWS, TILE_COLUMNS)
+        assert len(tile_scores['scores']) == TILE_ROWS
+        assert all(len(row) == TILE_COLUMNS for row in tile_scores['scores'])
+        assert tile_scores['scores'][-1][-1] == min(min(row) for row in tile_scores['scores'])
+        assert tile_scores['scores'][0][0] == 1.0
+        assert tile_scores['score'] == report.score
+        assert report.score == pytest.approx(screenshot_compare.qssim(golden_screenshot, test_screenshot), abs=1e-6)
+
+    def test_WriteFailureReport_Mask_MaskedTilesNullAndPixelsBlack(self, screenshots):
+        mask = comparison_mask.build_comparison_mask((IMAGE_HEIGHT, IMAGE_WIDTH), exclude_regions=[[96, 0, 32, 96]])
+
+        report = _write_report(*screenshots, mask=mask)
+
+        with open(report.tile_scores) as tile_scores_file:
+            scores = json.load(tile_scores_file)['scores']
+        assert [row[-1] for row in scores] == [None] * TILE_ROWS
+        assert all(score == 1.0 for row in scores for score in row[:-1])
+        assert report.score == 1.0
+        heatmap, _ = image_utils.read_png(report.heatmap)
+        assert not heatmap.any()
+
+    def test_WriteFailureReport_TileSizeNotMultipleOfFactor_Raises(self, screenshots):
+        with pytest.raises(ValueError, match="not a multiple of the report factor"):
+            failure_report.write_failure_report(*screenshots, tile_size=30, factor=FACTOR)
+
+    def test_LoadFailureReport_SameComparison_ReportReused(self, screenshots, tmp_path):
+        output_prefix = str(tmp_path / 'screenshot')
+        assert failure_report.load_failure_report(output_prefix, COMPARISON_KEY) is None
+        report = _write_report(*screenshots, comparison_key=COMPARISON_KEY)
+
+        assert failure_report.load_failure_report(output_prefix, COMPARISON_KEY) == report
+        assert failure_report.load_failure_report(output_prefix, 'd' * 64) is None
+
+    def test_LoadFailureReport_ArtifactMissing_NotReused(self, screenshots, tmp_path):
+        report = _write_report(*screenshots, comparison_key=COMPARISON_KEY)
+        os.remove(report.side_by_side)
+
+        assert failure_report.load_failure_report(str(tmp_path / 'screenshot'), COMPARISON_KEY) is None
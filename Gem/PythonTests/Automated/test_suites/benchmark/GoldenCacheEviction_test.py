@@ -0,0 +1,97 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Tests the size-bounded least recently used eviction of the golden statistics cache.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from Automated.atom_utils import golden_cache
+from Automated.atom_utils import image_utils
+
+GOLDEN_SIZE = 64
+
+
+def _entry_hashes(cache_dir):
+    statistics_dir = os.path.join(cache_dir, golden_cache.GOLDEN_STATISTICS_SUBFOLDER)
+    return {name for name in os.listdir(statistics_dir) if name != golden_cache.CONTENT_HASHES_SUBFOLDER}
+
+
+def _remembered_hashes(cache_dir):
+    hashes_dir = os.path.join(
+        cache_dir, golden_cache.GOLDEN_STATISTICS_SUBFOLDER, golden_cache.CONTENT_HASHES_SUBFOLDER)
+    remembered_hashes = set()
+    for file_name in os.listdir(hashes_dir):
+        with open(os.path.join(hashes_dir, file_name), 'r', encoding='ascii') as hash_file:
+            remembered_hashes.add(hash_file.read())
+    return remembered_hashes
+
+
+def _cache_size(cache_dir):
+    statistics_dir = os.path.join(cache_dir, golden_cache.GOLDEN_STATISTICS_SUBFOLDER)
+    return sum(golden_cache._directory_size(os.path.join(statistics_dir, content_hash))
+               for content_hash in _entry_hashes(cache_dir))
+
+
+class TestGoldenCacheEviction(object):
+
+    @pytest.fixture
+    def goldens(self, tmp_path):
+        rng = np.random.default_rng(seed=0)
+        golden_paths = []
+        for index in range(3):
+            golden_path = str(tmp_path / f"golden_{index}.ppm")
+            image_utils.write_ppm(golden_path, rng.integers(0, 256, (GOLDEN_SIZE, GOLDEN_SIZE, 3), dtype=np.uint8))
+            golden_paths.append(golden_path)
+        return golden_paths, str(tmp_path / 'cache')
+
+    def test_GoldenCache_CacheUnderMaxSize_NothingEvicted(self, goldens):
+        golden_paths, cache_dir = goldens
+        statistics = [golden_cache.load_golden_statistics(golden_path, cache_dir=cache_dir)
+                      for golden_path in golden_paths]
+
+        assert _entry_hashes(cache_dir) == {golden.content_hash for golden in statistics}
+        assert golden_cache.evict_golden_statistics(cache_dir, max_size=_cache_size(cache_dir)) == []
+
+    def test_GoldenCache_CacheOverMaxSize_LeastRecentlyUsedEvicted(self, goldens):
+        golden_paths, cache_dir = goldens
+        first, second = [golden_cache.load_golden_statistics(golden_path, cache_dir=cache_dir)
+                         for golden_path in golden_paths[:2]]
+        entry_size = _cache_size(cache_dir) // 2
+        statistics_dir = os.path.join(cache_dir, golden_cache.GOLDEN_STATISTICS_SUBFOLDER)
+        # Make the order explicit rather than relying on the timestamp resolution of the file system.
+        os.utime(os.path.join(statistics_dir, first.content_hash), ns=(1, 1))
+        os.utime(os.path.join(statistics_dir, second.content_hash), ns=(2, 2))
+        golden_cache.load_golden_statistics(golden_paths[0], cache_dir=cache_dir)
+
+        # Room for two and a half entries, so that trimming to the eviction target evicts exactly one.
+        max_size = entry_size * 5 // 2
+        third = golden_cache.load_golden_statistics(golden_paths[2], cache_dir=cache_dir, max_size=max_size)
+
+        assert _entry_hashes(cache_dir) == {first.content_hash, third.content_hash}
+        assert _remembered_hashes(cache_dir) == {first.content_hash, third.content_hash}
+        assert _cache_size(cache_dir) <= max_size * golden_cache.EVICTION_TARGET_FRACTION
+
+    def test_GoldenCache_EvictedGolden_ReloadsSameStatistics(self, goldens):
+        golden_paths, cache_dir = goldens
+        golden = golden_cache.load_golden_statistics(golden_paths[0], cache_dir=cache_dir)
+        expected_moments = [np.array(moment) for moment in golden.moments]
+
+        assert golden_cache.evict_golden_statistics(cache_dir, max_size=0) == [golden.content_hash]
+        reloaded = golden_cache.load_golden_statistics(golden_paths[0], cache_dir=cache_dir)
+
+        assert reloaded.content_hash == golden.content_hash
+        for moment, expected_moment in zip(reloaded.moments, expected_moments):
+            assert np.array_equal(moment, expected_moment)
+
+    def test_GoldenCache_EntryBeingLoaded_IsNeverEvicted(self, goldens):
+        golden_paths, cache_dir = goldens
+        golden = golden_cache.load_golden_statistics(golden_paths[0], cache_dir=cache_dir, max_size=0)
+
+        assert _entry_hashes(cache_dir) == {golden.content_hash}
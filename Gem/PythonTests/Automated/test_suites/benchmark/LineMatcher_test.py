@@ -0,0 +1,140 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Tests the whole word matching of log_follower.LineMatcher and benchmarks it against searching the log for each line
+with its own regular expression, as ly_test_tools' LogMonitor does.
+"""
+
+import logging
+import random
+import time
+
+import pytest
+
+from Automated.atom_utils import log_follower
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_LOG_LINES = 10000
+BENCHMARK_EXPECTED_LINES = 40
+BENCHMARK_WORDS = [
+    'Render', 'pass', 'Atom', 'Loading', 'asset', 'shader', 'frame', 'Editor', 'Python', 'component', 'entity',
+    '(1234)', 'ms', 'took', 'Warning', 'System', 'Trace', 'Error', 'test:', 'SUCCESS',
+]
+UNEXPECTED_LINES = ["Trace::Assert", "Trace::Error", "Traceback (most recent call last):"]
+
+
+def _benchmark_log():
+    """
+    Builds a deterministic log of random noise lines with every expected line written once somewhere in it.
+    :return: tuple of (log lines, expected lines)
+    """
+    rng = random.Random(0)
+    lines = [' '.join(rng.choice(BENCHMARK_WORDS) for _ in range(rng.randint(5, 20)))
+             for _ in range(BENCHMARK_LOG_LINES)]
+    expected_lines = [f"entity_{index}_test: Property value is {index} SUCCESS"
+                      for index in range(BENCHMARK_EXPECTED_LINES)]
+    line_step = BENCHMARK_LOG_LINES // BENCHMARK_EXPECTED_LINES
+    for index, expected_line in enumerate(expected_lines):
+        lines[index * line_step] = f"({index * line_step}) - {expected_line}"
+    return lines, expected_lines
+
+
+def _match_each_line(log_lines, expected_lines, unexpected_lines):
+    """
+    Matches every expected and unexpected line against every log line with line_matches, like LogMonitor.
+    :return: tuple of (missing lines, found unexpected lines)
+    """
+    missing_lines = list(expected_lines)
+    found_unexpected_lines = []
+    for log_line in log_lines:
+        missing_lines = [line for line in missing_lines if not log_follower.line_matches(log_line, line)]
+        found_unexpected_lines.extend(line for line in unexpected_lines if log_follower.line_matches(log_line, line))
+    return missing_lines, found_unexpected_lines
+
+
+class TestLineMatcher(object):
+
+    @pytest.mark.parametrize('line, expected_line, matches', [
+        ("Trace::Error", "Trace::Error", True),
+        ("Trace::Error at the start", "Trace::Error", True),
+        ("at the end Trace::Error", "Trace::Error", True),
+        ("a\tTrace::Error\tsurrounded by tabs", "Trace::Error", True),
+        ("xTrace::Error attached before", "Trace::Error", False),
+        ("Trace::Errors attached after", "Trace::Error", False),
+        ("(Trace::Error) in brackets", "Trace::Error", False),
+        ("Trace::ErrorTrace::Error Trace::Error", "Trace::Error", True),
+        ("entity_test: Exit game mode: True", "Exit game mode: True", True),
+        ("entity_test: Exit game mode: TrueFalse", "Exit game mode: True", False),
+        ("test: Entered game mode: True", "Entered game mode", False),
+    ])
+    def test_LineMatcher_WholeWordRule_MatchesLineMatches(self, line, expected_line, matches):
+        matcher = log_follower.LineMatcher([expected_line])
+        matcher.feed(line)
+
+        assert log_follower.line_matches(line, expected_line) == matches
+        assert matcher.all_expected_found == matches
+
+    def test_LineMatcher_OverlappingLines_AllFound(self):
+        matcher = log_follower.LineMatcher(["A B", "B C", "A", "A B C D"], unexpected_lines=["C", "B C"])
+
+        found_unexpected = matcher.feed("A B C D")
+
+        assert found_unexpected
+        assert matcher.all_expected_found
+        assert matcher.found_unexpected_lines == ["C", "B C"]
+
+    def test_LineMatcher_LinePrefixOfAnother_BothFound(self):
+        matcher = log_follower.LineMatcher(["Test", "Test passed", "passed"])
+
+        matcher.feed("Test passed")
+
+        assert matcher.all_expected_found
+
+    def test_LineMatcher_PartialMatchBeforeWholeWordMatch_Found(self):
+        matcher = log_follower.LineMatcher(["error"], unexpected_lines=["error"])
+
+        assert matcher.feed("errors: 0, error")
+        assert matcher.all_expected_found
+
+    def test_LineMatcher_LinesInDifferentLogLines_MissingUntilFound(self):
+        matcher = log_follower.LineMatcher(["first line", "second line"], unexpected_lines=["Trace::Error"])
+
+        assert not matcher.feed("the first line")
+        assert matcher.missing_lines == ["second line"]
+        assert not matcher.feed("the second liner")
+        assert matcher.missing_lines == ["second line"]
+        assert not matcher.feed("the second line")
+        assert matcher.all_expected_found
+        assert matcher.found_unexpected_lines == []
+
+    def test_LineMatcher_RegexCharactersInLines_MatchedLiterally(self):
+        matcher = log_follower.LineMatcher(["Traceback (most recent call last):", "value is 1.5 [m]"])
+
+        matcher.feed("value is 105 [m]")
+        assert matcher.missing_lines == ["Traceback (most recent call last):", "value is 1.5 [m]"]
+        matcher.feed("Traceback (most recent call last):")
+        matcher.feed("value is 1.5 [m]")
+        assert matcher.all_expected_found
+
+    def test_LineMatcher_EditorLog_FasterThanRegexPerLine(self):
+        log_lines, expected_lines = _benchmark_log()
+
+        start = time.perf_counter()
+        matcher = log_follower.LineMatcher(expected_lines, UNEXPECTED_LINES)
+        for log_line in log_lines:
+            matcher.feed(log_line)
+        matcher_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        missing_lines, found_unexpected_lines = _match_each_line(log_lines, expected_lines, UNEXPECTED_LINES)
+        regex_per_line_time = time.perf_counter() - start
+
+        logger.info(f"{BENCHMARK_LOG_LINES} log lines, {len(expected_lines) + len(UNEXPECTED_LINES)} lines to match: "
+                    f"LineMatcher {matcher_time:.3f}s, regex per line {regex_per_line_time:.3f}s")
+        assert matcher.missing_lines == missing_lines == []
+        assert matcher.found_unexpected_lines == found_unexpected_lines == []
+        assert matcher_time < regex_per_line_time
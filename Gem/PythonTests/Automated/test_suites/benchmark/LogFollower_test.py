@@ -0,0 +1,186 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Tests log_follower: reading appended lines across log rotation and truncation, following several files at once, the
+polling fallback when inotify is unavailable, and the quiet period of early complete mode.
+"""
+
+import os
+import threading
+import time
+
+import ly_test_tools.log.log_monitor
+import pytest
+
+from Automated.atom_utils import log_follower
+
+WRITE_DELAY = 0.2
+# Far longer than any wait of these tests, so a test only reaches it by not stopping when it should.
+FOLLOW_TIMEOUT = 30.0
+QUIET_PERIOD = 0.2
+
+
+def _append(file_path, text):
+    with open(file_path, 'a', newline='') as appended_file:
+        appended_file.write(text)
+
+
+def _append_later(file_path, text, delay=WRITE_DELAY):
+    """
+    Appends text to a file from another thread after delay seconds, like a process writing its log.
+    """
+    writer = threading.Timer(delay, _append, (file_path, text))
+    writer.start()
+    return writer
+
+
+class TestLogFollower(object):
+
+    @pytest.fixture
+    def log_path(self, tmp_path):
+        return str(tmp_path / 'Editor.log')
+
+    def test_LogFollower_AppendedLines_ReadOnce(self, log_path):
+        _append(log_path, "first\r\nsecond\npart")
+        with log_follower.LogFollower(log_path) as follower:
+            assert follower.read_lines() == ["first", "second"]
+            assert follower.read_lines() == []
+            _append(log_path, "ial\nthird\n")
+            assert follower.read_lines() == ["partial", "third"]
+            _append(log_path, "last without line ending")
+            assert follower.read_remaining_lines() == ["last without line ending"]
+            assert follower.reopen_count == 0
+
+    def test_LogFollower_LogTruncated_ReadFromStart(self, log_path):
+        _append(log_path, "old run line 1\nold run line 2\n")
+        with log_follower.LogFollower(log_path) as follower:
+            assert follower.read_lines() == ["old run line 1", "old run line 2"]
+            with open(log_path, 'w') as log_file:
+                log_file.write("new\n")
+
+            assert follower.read_lines() == ["new"]
+            assert follower.reopen_count == 1
+
+    def test_LogFollower_LogRotated_ReadNewFile(self, log_path, tmp_path):
+        _append(log_path, "old run line\n")
+        with log_follower.LogFollower(log_path) as follower:
+            assert follower.read_lines() == ["old run line"]
+            _append(log_path, "partial old line")
+            new_log_path = str(tmp_path / 'Editor.new.log')
+            _append(new_log_path, "new run line 1\nnew run line 2\n")
+            os.replace(log_path, str(tmp_path / 'Editor.old.log'))
+            os.replace(new_log_path, log_path)
+
+            assert follower.read_lines() == ["new run line 1", "new run line 2"]
+            assert follower.reopen_count == 1
+
+    def test_LogFollower_PreviousLogState_PreviousRunSkipped(self, log_path):
+        _append(log_path, "previous run\n")
+        previous_log_state = log_follower.get_log_state(log_path)
+        _append(log_path, "this run\n")
+
+        with log_follower.LogFollower(log_path, previous_log_state=previous_log_state) as follower:
+            assert follower.read_lines() == ["this run"]
+
+    def test_LogFollower_NoLogYet_NoPreviousLogState(self, log_path):
+        assert log_follower.get_log_state(log_path) is None
+
+        with log_follower.LogFollower(log_path) as follower:
+            assert not follower.exists()
+            assert follower.read_lines() == []
+            _append_later(log_path, "created\n").join()
+            assert follower.wait_for_file(timeout=1.0)
+            assert follower.read_lines() == ["created"]
+
+    def test_FollowFiles_SeveralFiles_LinesOfEveryFile(self, log_path, tmp_path):
+        result_path = str(tmp_path / 'results.jsonl')
+        _append(log_path, "log line 1\n")
+        _append(result_path, "result line 1\n")
+        writer = _append_later(result_path, "result line 2\n")
+
+        with log_follower.LogFollower(log_path) as log_reader, log_follower.LogFollower(result_path) as result_reader:
+            _append(log_path, "log line 2")
+            lines = list(log_follower.follow_files([log_reader, result_reader], FOLLOW_TIMEOUT, writer.is_alive))
+
+        assert [line for index, line in lines if index == 0] == ["log line 1", "log line 2"]
+        assert [line for index, line in lines if index == 1] == ["result line 1", "result line 2"]
+
+    def test_LogFollower_InotifyUnavailable_PollsForLines(self, log_path, monkeypatch):
+        monkeypatch.setattr(log_follower, '_inotify_watch', lambda directory: None)
+        _append(log_path, "")
+        writer = _append_later(log_path, "written later\n")
+        deadline = time.monotonic() + FOLLOW_TIMEOUT
+
+        with log_follower.LogFollower(log_path, poll_interval=0.01) as follower:
+            lines = []
+            while not lines and time.monotonic() < deadline:
+                lines = follower.read_lines()
+                start = time.monotonic()
+                follower.wait(1.0)
+                # Polling never sleeps longer than the poll interval, whatever timeout the wait is given.
+                assert time.monotonic() - start < 0.5
+            assert follower._inotify_fd == -1
+        writer.join()
+
+        assert lines == ["written later"]
+
+    def test_LogFollower_Follow_StopsWhenProcessExits(self, log_path):
+        _append(log_path, "line 1\n")
+        writer = _append_later(log_path, "line 2\nlast line")
+
+        with log_follower.LogFollower(log_path) as follower:
+            lines = list(follower.follow(FOLLOW_TIMEOUT, is_alive=writer.is_alive))
+
+        assert lines == ["line 1", "line 2", "last line"]
+
+
+class TestMonitorLogForLines(object):
+
+    @pytest.fixture
+    def log_path(self, tmp_path):
+        return str(tmp_path / 'Editor.log')
+
+    def test_MonitorLogForLines_QuietPeriod_StopsBeforeProcessExits(self, log_path):
+        _append(log_path, "Component tests completed\n")
+        start = time.monotonic()
+
+        log_follower.monitor_log_for_lines(
+            log_path, ["Component tests completed"], ["Trace::Error"], timeout=FOLLOW_TIMEOUT,
+            is_alive=lambda: True, quiet_period=QUIET_PERIOD)
+
+        assert QUIET_PERIOD <= time.monotonic() - start < QUIET_PERIOD + log_follower.LIVENESS_CHECK_INTERVAL
+
+    def test_MonitorLogForLines_UnexpectedLineInQuietPeriod_Raises(self, log_path):
+        _append(log_path, "Component tests completed\n")
+        _append_later(log_path, "Trace::Error while tearing down\n", delay=0.1)
+
+        with pytest.raises(ly_test_tools.log.log_monitor.LogMonitorException, match="Trace::Error"):
+            log_follower.monitor_log_for_lines(
+                log_path, ["Component tests completed"], ["Trace::Error"], timeout=FOLLOW_TIMEOUT,
+                is_alive=lambda: True, quiet_period=2.0)
+
+    def test_MonitorLogForLines_NoQuietPeriod_FollowsUntilProcessExits(self, log_path):
+        _append(log_path, "Component tests completed\n")
+        writer = _append_later(log_path, "Trace::Error on exit\n")
+
+        with pytest.raises(ly_test_tools.log.log_monitor.LogMonitorException, match="Trace::Error"):
+            log_follower.monitor_log_for_lines(
+                log_path, ["Component tests completed"], ["Trace::Error"], timeout=FOLLOW_TIMEOUT,
+                is_alive=writer.is_alive)
+
+    def test_MonitorLogForLines_LogRotatedAfterMatch_MatchesReset(self, log_path, tmp_path):
+        _append(log_path, "Component tests completed\n")
+        new_log_path = str(tmp_path / 'Editor.new.log')
+        _append(new_log_path, "Starting the new run\n")
+
+        def rotate():
+            os.replace(new_log_path, log_path)
+        writer = threading.Timer(WRITE_DELAY, rotate)
+        writer.start()
+
+        with pytest.raises(ly_test_tools.log.log_monitor.LogMonitorException, match="Component tests completed"):
+            log_follower.monitor_log_for_lines(
+                log_path, ["Component tests completed"], timeout=FOLLOW_TIMEOUT, is_alive=writer.is_alive)
@@ -0,0 +1,170 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Tests the result_channel JSONL records: writing them on the Editor side, parsing them back, and validating Success and
+Failure lines against them instead of the log.
+"""
+
+import json
+import os
+
+import ly_test_tools.log.log_monitor
+import pytest
+
+from Automated.atom_utils import log_follower
+from Automated.atom_utils import result_channel
+
+FOLLOW_TIMEOUT = 30.0
+
+
+def _read_lines(result_path):
+    with open(result_path, encoding='utf-8') as result_file:
+        return result_file.read().splitlines()
+
+
+class TestResultChannel(object):
+
+    @pytest.fixture
+    def result_path(self, tmp_path, monkeypatch):
+        monkeypatch.delenv(result_channel.RESULT_FILE_ENV_VAR, raising=False)
+        return str(tmp_path / ('Editor' + result_channel.RESULT_FILE_SUFFIX))
+
+    def test_GetResultPathForLog_NextToLog(self, tmp_path):
+        log_path = str(tmp_path / 'Editor.log')
+
+        assert result_channel.get_result_path_for_log(log_path) == str(tmp_path / 'Editor_results.jsonl')
+
+    def test_ResultWriter_Write_OneRecordPerLine(self, result_path):
+        writer = result_channel.ResultWriter(result_path)
+
+        writer.write("Entity created", result_channel.RESULT_SUCCESS, payload={'entity_id': 12})
+        writer.write("Level loaded\nwith a line break", result_channel.RESULT_INFO)
+
+        lines = _read_lines(result_path)
+        assert len(lines) == 2
+        records = [result_channel.parse_record(line) for line in lines]
+        assert [(record['step'], record['result'], record['payload']) for record in records] == [
+            ("Entity created", result_channel.RESULT_SUCCESS, {'entity_id': 12}),
+            ("Level loaded\nwith a line break", result_channel.RESULT_INFO, None),
+        ]
+        assert records[0]['timestamp'] <= records[1]['timestamp']
+        assert records[1]['duration'] == pytest.approx(records[1]['timestamp'] - records[0]['timestamp'])
+        assert all(record['duration'] >= 0.0 for record in records)
+
+    def test_ResultWriter_UnserializablePayload_WrittenAsString(self, result_path):
+        result_channel.ResultWriter(result_path).write("Step", result_channel.RESULT_SUCCESS, payload={'path': object})
+
+        assert result_channel.parse_record(_read_lines(result_path)[0])['payload'] == {'path': str(object)}
+
+    @pytest.mark.parametrize('line', [
+        '',
+        'Success: not a record',
+        '{"step": "Entity created", "result": "succ',
+        '["Entity created", "success"]',
+        '{"result": "success"}',
+        '{"step": "Entity created"}',
+    ])
+    def test_ParseRecord_InvalidLine_Ignored(self, line):
+        assert result_channel.parse_record(line) is None
+
+    @pytest.mark.parametrize('record, line', [
+        ({'step': "Entity created", 'result': result_channel.RESULT_SUCCESS}, "Success: Entity created"),
+        ({'step': "Entity not created", 'result': result_channel.RESULT_FAILURE}, "Failure: Entity not created"),
+        ({'step': "Level loaded", 'result': result_channel.RESULT_INFO}, "Info: Level loaded"),
+        ({'step': 3, 'result': 'unknown'}, "3"),
+    ])
+    def test_RecordToLine_SameLineAsReport(self, record, line):
+        assert result_channel.record_to_line(record) == line
+
+    @pytest.mark.parametrize('line, is_result', [
+        ("Success: Entity created", True),
+        ("Failure: Entity not created", True),
+        ("Info: Level loaded", False),
+        ("Trace::Error", False),
+        ("test: Success: Entity created", False),
+    ])
+    def test_IsResultLine_OnlySuccessAndFailure(self, line, is_result):
+        assert result_channel.is_result_line(line) == is_result
+
+    def test_ResultChannel_Open_AnnouncedToRecordResult(self, result_path):
+        with open(result_path, 'w') as stale_result_file:
+            stale_result_file.write('{"step": "previous run", "result": "success"}\n')
+        result_channel.record_result("Not recorded", result_channel.RESULT_SUCCESS)
+        assert _read_lines(result_path) == ['{"step": "previous run", "result": "success"}']
+
+        with result_channel.ResultChannel(result_path):
+            assert not os.path.exists(result_path)
+            result_channel.record_result("Recorded", result_channel.RESULT_SUCCESS)
+        result_channel.record_result("Not recorded either", result_channel.RESULT_SUCCESS)
+
+        assert [result_channel.parse_record(line)['step'] for line in _read_lines(result_path)] == ["Recorded"]
+        assert result_channel.RESULT_FILE_ENV_VAR not in os.environ
+
+    def test_ResultChannel_Nested_PreviousFileRestored(self, result_path, tmp_path):
+        inner_result_path = str(tmp_path / 'inner' / 'Editor_results.jsonl')
+
+        with result_channel.ResultChannel(result_path):
+            with result_channel.ResultChannel(inner_result_path):
+                assert result_channel.get_writer().result_path == inner_result_path
+            assert os.environ[result_channel.RESULT_FILE_ENV_VAR] == result_path
+            assert result_channel.get_writer().result_path == result_path
+
+    def test_RecordResult_UnwritableFile_NotRaised(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(result_channel.RESULT_FILE_ENV_VAR, str(tmp_path / 'missing' / 'Editor_results.jsonl'))
+
+        result_channel.record_result("Entity created", result_channel.RESULT_SUCCESS)
+
+
+class TestMonitorLogForResults(object):
+
+    @pytest.fixture
+    def log_path(self, tmp_path):
+        log_path = str(tmp_path / 'Editor.log')
+        with open(log_path, 'w') as log_file:
+            log_file.write("Component tests completed\n")
+        return log_path
+
+    @pytest.fixture
+    def result_path(self, log_path):
+        return result_channel.get_result_path_for_log(log_path)
+
+    def _write_records(self, result_path, records):
+        with open(result_path, 'w', encoding='utf-8') as result_file:
+            result_file.write(''.join(record + '\n' for record in records))
+
+    def test_MonitorLogForLines_ResultLines_MatchedAgainstRecords(self, log_path, result_path):
+        self._write_records(result_path, [
+            json.dumps({'step': "Entity created", 'result': result_channel.RESULT_SUCCESS, 'payload': {'id': 1}}),
+            'not a record',
+            json.dumps({'step': "Level loaded", 'result': result_channel.RESULT_INFO}),
+        ])
+
+        records = log_follower.monitor_log_for_lines(
+            log_path, ["Component tests completed", "Success: Entity created"], ["Failure: Entity not created"],
+            timeout=FOLLOW_TIMEOUT, is_alive=lambda: False, result_path=result_path)
+
+        assert [(record['step'], record.get('payload')) for record in records] == [
+            ("Entity created", {'id': 1}), ("Level loaded", None)]
+
+    def test_MonitorLogForLines_ResultLineOnlyInLog_Missing(self, log_path, result_path):
+        with open(log_path, 'a') as log_file:
+            log_file.write("Success: Entity created\n")
+        self._write_records(result_path, [])
+
+        with pytest.raises(ly_test_tools.log.log_monitor.LogMonitorException, match="Success: Entity created"):
+            log_follower.monitor_log_for_lines(
+                log_path, ["Success: Entity created"], timeout=FOLLOW_TIMEOUT, is_alive=lambda: False,
+                result_path=result_path)
+
+    def test_MonitorLogForLines_FailureRecord_Unexpected(self, log_path, result_path):
+        self._write_records(result_path, [
+            json.dumps({'step': "Entity not created", 'result': result_channel.RESULT_FAILURE}),
+        ])
+
+        with pytest.raises(ly_test_tools.log.log_monitor.LogMonitorException, match="Failure: Entity not created"):
+            log_follower.monitor_log_for_lines(
+                log_path, ["Component tests completed"], ["Failure: Entity not created"], timeout=FOLLOW_TIMEOUT,
+                is_alive=lambda: False, result_path=result_path)
@@ -0,0 +1,168 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Benchmarks the summed-area-table QSSIM against ly_test_tools' qssim on the golden images.
+Checks that both produce the same pass/fail decision against SIMILARITY_THRESHOLD and logs the speedup, and that their
+scores match closely on mildly perturbed images that score near the threshold.
+"""
+
+import glob
+import logging
+import os
+import time
+
+import numpy as np
+import pytest
+
+from Automated.atom_utils import golden_store
+from Automated.atom_utils import image_utils
+from Automated.atom_utils import screenshot_compare
+from Automated.atom_utils.automated_test_base import SIMILARITY_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+INTEGRAL_WINDOW_SIZES = [screenshot_compare.INTEGRAL_MATCHED_WINDOW_SIZE, 8, 16, 32]
+PARITY_IMAGE_WIDTH = 640
+PARITY_IMAGE_HEIGHT = 360
+# Perturbed images must score within this margin of SIMILARITY_THRESHOLD, where a score error flips decisions.
+NEAR_THRESHOLD_MARGIN = 0.01
+# An order of magnitude below NEAR_THRESHOLD_MARGIN, the matched box window tracks the Gaussian window to a few 1e-4.
+PARITY_SCORE_TOLERANCE = 0.0005
+# The summed-area table only differs from direct box filtering by rounding.
+BOX_SCORE_TOLERANCE = 0.00001
+
+# Mild perturbations in 8-bit pixel units, each scoring close to SIMILARITY_THRESHOLD against the parity golden.
+NEAR_THRESHOLD_PERTURBATIONS = {
+    'noise': lambda pixels, rng: pixels + rng.normal(0.0, 1.1, pixels.shape),
+    'ramp': lambda pixels, rng: pixels + np.linspace(0.0, 25.5, pixels.shape[1])[np.newaxis, :, np.newaxis],
+    'blur': lambda pixels, rng: 0.88 * pixels + 0.06 * (np.roll(pixels, 1, axis=1) + np.roll(pixels, -1, axis=1)),
+    'noise_and_ramp': lambda pixels, rng: (
+        pixels + np.linspace(0.0, 12.75, pixels.shape[1])[np.newaxis, :, np.newaxis] +
+        rng.normal(0.0, 0.8, pixels.shape)),
+    'local_noise': lambda pixels, rng: np.where(
+        (np.arange(pixels.shape[1]) // 160 % 2 == 0)[np.newaxis, :, np.newaxis],
+        pixels + rng.normal(0.0, 1.5, pixels.shape), pixels),
+}
+
+
+def _write_perturbed_copy(golden_screenshot, perturbed_screenshot):
+    """
+    Writes a copy of the golden image with a deterministic brightness ramp and noise applied.
+    """
+    pixels, maxval = image_utils.read_ppm(golden_screenshot)
+    rng = np.random.default_rng(seed=0)
+    ramp = np.linspace(0.0, 0.1 * maxval, pixels.shape[1], dtype=np.float32)[np.newaxis, :, np.newaxis]
+    noise = rng.normal(0.0, 0.02 * maxval, pixels.shape).astype(np.float32)
+    perturbed = np.clip(pixels + ramp + noise, 0, maxval).astype(pixels.dtype)
+    image_utils.write_ppm(perturbed_screenshot, perturbed, maxval)
+
+
+def _parity_golden_pixels(width, height):
+    """
+    Builds deterministic 8-bit pixels of smooth gradients, shaded tiles and a little noise, like a rendered golden.
+    """
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    image = np.stack([
+        0.5 + 0.4 * np.sin(x / 37.0),
+        0.5 + 0.4 * np.cos(y / 23.0),
+        0.5 + 0.4 * np.sin((x + y) / 59.0),
+    ], axis=-1)
+    image[(x // 40 + y // 40) % 2 == 0] *= 0.7
+    rng = np.random.default_rng(seed=1)
+    return np.clip(np.round(image * 255.0 + rng.normal(0.0, 5.0, image.shape)), 0, 255).astype(np.uint8)
+
+
+def _write_parity_images(directory, perturbation):
+    """
+    Writes the parity golden and a copy of it with a near threshold perturbation applied.
+    :return: tuple of (golden path, perturbed path)
+    """
+    pixels = _parity_golden_pixels(PARITY_IMAGE_WIDTH, PARITY_IMAGE_HEIGHT)
+    perturbed = NEAR_THRESHOLD_PERTURBATIONS[perturbation](pixels.astype(np.float32), np.random.default_rng(seed=0))
+    golden_screenshot = str(directory / 'golden.ppm')
+    perturbed_screenshot = str(directory / f"{perturbation}.ppm")
+    image_utils.write_ppm(golden_screenshot, pixels)
+    image_utils.write_ppm(perturbed_screenshot, np.clip(np.round(perturbed), 0, 255).astype(np.uint8))
+    return golden_screenshot, perturbed_screenshot
+
+
+def _timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+class TestScreenshotCompareIntegralSSIM(object):
+
+    def test_IntegralSSIM_MatchesQssimDecisions(self, tmp_path, golden_images_directory):
+        import ly_test_tools.image.screenshot_compare_qssim as reference_compare
+
+        golden_screenshots = [
+            golden_screenshot for golden_screenshot in sorted(glob.glob(
+                os.path.join(golden_images_directory, 'Windows', '**', '*.ppm'), recursive=True))
+            if golden_store.read_lfs_pointer(golden_screenshot) is None
+        ]
+        if not golden_screenshots:
+            pytest.skip("No golden images are materialized, run 'git lfs pull' first.")
+
+        reference_total = 0.0
+        integral_totals = dict.fromkeys(INTEGRAL_WINDOW_SIZES, 0.0)
+        mismatched_decisions = []
+        for golden_screenshot in golden_screenshots:
+            perturbed_screenshot = str(tmp_path / os.path.basename(golden_screenshot))
+            _write_perturbed_copy(golden_screenshot, perturbed_screenshot)
+
+            for test_screenshot in (golden_screenshot, perturbed_screenshot):
+                reference_score, reference_time = _timed(
+                    reference_compare.qssim, golden_screenshot, test_screenshot)
+                reference_total += reference_time
+                for window_size in INTEGRAL_WINDOW_SIZES:
+                    integral_score, integral_time = _timed(
+                        screenshot_compare.qssim, golden_screenshot, test_screenshot,
+                        window=screenshot_compare.WINDOW_INTEGRAL, window_size=window_size)
+                    integral_totals[window_size] += integral_time
+                    logger.info(f"{os.path.basename(test_screenshot)} window={window_size}: "
+                                f"qssim={reference_score:.5f} ({reference_time:.3f}s) "
+                                f"integral={integral_score:.5f} ({integral_time:.3f}s)")
+                    if (reference_score >= SIMILARITY_THRESHOLD) != (integral_score >= SIMILARITY_THRESHOLD):
+                        mismatched_decisions.append((test_screenshot, window_size, reference_score, integral_score))
+
+        logger.info("----- Integral SSIM Benchmark -----")
+        logger.info(f"    Images compared: {len(golden_screenshots) * 2}")
+        logger.info(f"    qssim total: {reference_total:.3f}s")
+        for window_size, integral_total in integral_totals.items():
+            logger.info(f"    integral window={window_size} total: {integral_total:.3f}s "
+                        f"(speedup {reference_total / integral_total:.2f}x)")
+
+        assert not mismatched_decisions, \
+            f"Integral SSIM disagrees with qssim on pass/fail for: {mismatched_decisions}"
+
+    @pytest.mark.parametrize('perturbation', sorted(NEAR_THRESHOLD_PERTURBATIONS))
+    def test_IntegralSSIM_NearThreshold_ScoresMatchQssim(self, tmp_path, perturbation):
+        import ly_test_tools.image.screenshot_compare_qssim as reference_compare
+
+        golden_screenshot, perturbed_screenshot = _write_parity_images(tmp_path, perturbation)
+        reference_score = reference_compare.qssim(golden_screenshot, perturbed_screenshot)
+        integral_score = screenshot_compare.qssim(
+            golden_screenshot, perturbed_screenshot, window=screenshot_compare.WINDOW_INTEGRAL,
+            window_size=screenshot_compare.INTEGRAL_MATCHED_WINDOW_SIZE)
+        logger.info(f"{perturbation}: qssim={reference_score:.5f} integral={integral_score:.5f}")
+
+        assert abs(reference_score - SIMILARITY_THRESHOLD) <= NEAR_THRESHOLD_MARGIN, \
+            f"Perturbation '{perturbation}' scored {reference_score:.5f}, too far from the threshold to test parity"
+        assert abs(integral_score - reference_score) <= PARITY_SCORE_TOLERANCE, \
+            f"Integral SSIM scored {integral_score:.5f} where qssim scored {reference_score:.5f}"
+
+    @pytest.mark.parametrize('window_size', INTEGRAL_WINDOW_SIZES)
+    def test_IntegralSSIM_AnyWindowSize_MatchesBoxWindowScore(self, tmp_path, window_size):
+        golden_screenshot, perturbed_screenshot = _write_parity_images(tmp_path, 'noise')
+
+        integral_score = screenshot_compare.qssim(
+            golden_screenshot, perturbed_screenshot, window=screenshot_compare.WINDOW_INTEGRAL, window_size=window_size)
+        box_score = screenshot_compare.qssim(
+            golden_screenshot, perturbed_screenshot, window=screenshot_compare.WINDOW_BOX, window_size=window_size)
+
+        assert abs(integral_score - box_score) <= BOX_SCORE_TOLERANCE
@@ -0,0 +1,60 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Checks that the pyramid comparison never passes a capture that fails at full resolution.
+Area downsampling averages away pixel noise, so noisy captures score close to 1.0 at the coarse levels.
+"""
+
+import numpy as np
+import pytest
+
+from Automated.atom_utils import screenshot_compare
+from Automated.atom_utils.automated_test_base import SIMILARITY_THRESHOLD
+
+
+def _smooth_image(width, height):
+    """
+    Builds a deterministic image of smooth color gradients, the kind of content noise hides in the least.
+    """
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    return np.stack([
+        0.5 + 0.4 * np.sin(x / 97.0),
+        0.5 + 0.4 * np.cos(y / 61.0),
+        0.5 + 0.4 * np.sin((x + y) / 149.0),
+    ], axis=-1).astype(np.float32)
+
+
+def _with_uniform_noise(image, amplitude, maxval=255):
+    """
+    Adds uniform noise of +-amplitude 8-bit steps to every channel of every pixel.
+    """
+    rng = np.random.default_rng(seed=0)
+    noise = rng.integers(-amplitude, amplitude + 1, image.shape).astype(np.float32) / maxval
+    return np.clip(image + noise, 0.0, 1.0).astype(np.float32)
+
+
+class TestScreenshotComparePyramid(object):
+
+    @pytest.mark.parametrize("width, height, amplitude", [(1920, 1080, 4), (320, 240, 6)])
+    def test_ComparePyramid_NoisyCaptureFailingAtFullResolution_DoesNotPass(self, width, height, amplitude):
+        golden_image = _smooth_image(width, height)
+        test_image = _with_uniform_noise(golden_image, amplitude)
+
+        full_resolution_score = screenshot_compare.qssim(golden_image, test_image)
+        assert full_resolution_score < SIMILARITY_THRESHOLD, \
+            f"The noisy capture must fail at full resolution for this test, it scored {full_resolution_score}"
+
+        result = screenshot_compare.compare_pyramid(golden_image, test_image, SIMILARITY_THRESHOLD)
+        assert not result.passed, \
+            f"Pyramid passed a capture scoring {full_resolution_score} at full resolution: {result}"
+        assert result.decision_factor == 1
+
+    def test_ComparePyramid_IdenticalCapture_PassesAtFullResolution(self):
+        golden_image = _smooth_image(320, 240)
+
+        result = screenshot_compare.compare_pyramid(golden_image, golden_image.copy(), SIMILARITY_THRESHOLD)
+        assert result.passed
+        assert result.exact and result.decision_factor == 1
@@ -0,0 +1,105 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Tests the screenshot_prefilter quick-reject limits: captures that are merely shifted in exposure or noisy are scored,
+black frames, large color shifts and rearranged structure are rejected without scoring.
+"""
+
+import numpy as np
+import pytest
+
+from Automated.atom_utils import screenshot_prefilter
+
+IMAGE_SIZE = 128
+
+
+def _scene():
+    """
+    A float image with structure in every channel and its values in [0.2, 0.8], so exposure shifts do not clip.
+    """
+    y, x = np.mgrid[0:IMAGE_SIZE, 0:IMAGE_SIZE] / IMAGE_SIZE
+    return np.stack([
+        0.2 + 0.5 * x + 0.1 * np.sin(6.0 * np.pi * y),
+        0.2 + 0.5 * y,
+        0.4 + 0.2 * np.cos(4.0 * np.pi * x * y),
+    ], axis=-1).astype(np.float32)
+
+
+def _quick_reject(golden_pixels, test_pixels, maxval=1.0):
+    return screenshot_prefilter.quick_reject(
+        screenshot_prefilter.compute_signature(golden_pixels, maxval),
+        screenshot_prefilter.compute_signature(test_pixels, maxval))
+
+
+class TestScreenshotPrefilter(object):
+
+    def test_ComputeSignature_StructuredImage_StableHash(self):
+        signature = screenshot_prefilter.compute_signature(_scene(), 1.0)
+
+        assert signature.shape == (IMAGE_SIZE, IMAGE_SIZE)
+        assert signature.histogram.shape == (3, screenshot_prefilter.HISTOGRAM_BINS)
+        np.testing.assert_allclose(signature.histogram.sum(axis=1), 1.0, rtol=1e-6)
+        assert signature.phash is not None
+
+    def test_ComputeSignature_IntegerPixels_SameAsNormalized(self):
+        pixels = np.round(_scene() * 255.0).astype(np.uint8)
+
+        integer_signature = screenshot_prefilter.compute_signature(pixels, 255)
+        float_signature = screenshot_prefilter.compute_signature(pixels.astype(np.float32) / 255.0, 1.0)
+
+        np.testing.assert_allclose(integer_signature.histogram, float_signature.histogram)
+        assert integer_signature.phash == float_signature.phash
+
+    def test_ComputeSignature_FlatImage_NoHash(self):
+        flat = np.full((IMAGE_SIZE, IMAGE_SIZE, 3), 0.5, dtype=np.float32)
+
+        assert screenshot_prefilter.compute_signature(flat, 1.0).phash is None
+
+    @pytest.mark.parametrize('exposure_shift', [0.0, 0.1, 0.14])
+    def test_QuickReject_ExposureShiftUnderLimit_Scored(self, exposure_shift):
+        golden = _scene()
+
+        assert _quick_reject(golden, golden + np.float32(exposure_shift)) is None
+
+    def test_QuickReject_ExposureShiftOverLimit_Rejected(self):
+        golden = _scene()
+
+        reject_reason = _quick_reject(golden, golden + np.float32(0.2))
+
+        assert reject_reason.startswith("color histograms differ")
+        assert f"limit {screenshot_prefilter.HISTOGRAM_REJECT_DISTANCE}" in reject_reason
+
+    def test_QuickReject_BlackFrame_Rejected(self):
+        golden = _scene()
+
+        reject_reason = _quick_reject(golden, np.zeros_like(golden))
+
+        assert reject_reason.startswith("color histograms differ")
+
+    def test_QuickReject_NoisyCapture_Scored(self):
+        golden = _scene()
+        noise = np.random.default_rng(seed=0).normal(0.0, 0.01, golden.shape).astype(np.float32)
+
+        assert _quick_reject(golden, np.clip(golden + noise, 0.0, 1.0)) is None
+
+    @pytest.mark.parametrize('rearrange', [
+        lambda image: image[::-1],
+        lambda image: image[::-1, ::-1],
+    ])
+    def test_QuickReject_SameColorsRearranged_RejectedByHash(self, rearrange):
+        golden = _scene()
+
+        reject_reason = _quick_reject(golden, rearrange(golden))
+
+        assert reject_reason.startswith("perceptual hashes differ")
+        assert f"limit {screenshot_prefilter.PHASH_REJECT_DISTANCE}" in reject_reason
+
+    def test_QuickReject_FlatImages_ScoredOnHistogramsOnly(self):
+        flat = np.full((IMAGE_SIZE, IMAGE_SIZE, 3), 0.5, dtype=np.float32)
+        slightly_brighter = flat + np.float32(0.05)
+
+        assert _quick_reject(flat, slightly_brighter) is None
+        assert _quick_reject(flat, np.zeros_like(flat)).startswith("color histograms differ")
@@ -0,0 +1,156 @@
+"""
+Copyright (c) Contributors to the Open 3D Engine Project.
+For complete copyright and license terms please see the LICENSE at the root of this distribution.
+
+SPDX-License-Identifier: Apache-2.0 OR MIT
+
+Tests the step_timeline trace output: the events @traced helpers and wrapped waits write while a TimelineChannel is
+open, and the Chrome trace file the channel merges them into.
+"""
+
+import json
+import os
+import types
+
+import pytest
+
+from Automated.atom_utils import step_timeline
+
+EDITOR_PID = os.getpid() + 1
+
+
+class _Helper:
+
+    @staticmethod
+    @step_timeline.traced
+    def open_level(level, entity, frames=1, names=()):
+        return level
+
+    @staticmethod
+    @step_timeline.traced
+    def fail():
+        raise RuntimeError("failed")
+
+
+def _read_trace(timeline_path):
+    with open(timeline_path, encoding='utf-8') as timeline_file:
+        return json.load(timeline_file)
+
+
+class TestStepTimeline(object):
+
+    @pytest.fixture
+    def timeline_path(self, tmp_path, monkeypatch):
+        monkeypatch.delenv(step_timeline.TIMELINE_FILE_ENV_VAR, raising=False)
+        return step_timeline.get_timeline_path(str(tmp_path), 'test_Level[Open Close]')
+
+    def test_GetTimelinePath_TestName_SafeFilename(self, tmp_path):
+        timeline_path = step_timeline.get_timeline_path(str(tmp_path), 'test_Level[Open Close/1]')
+
+        assert timeline_path == str(tmp_path / ('test_Level_Open_Close_1_' + step_timeline.TIMELINE_FILE_SUFFIX))
+
+    def test_Timeline_Span_CompleteEvent(self):
+        timeline = step_timeline.Timeline()
+
+        with timeline.span('load', args={'level': 'Base'}):
+            pass
+        with timeline.span('idle', step_timeline.CATEGORY_WAIT):
+            pass
+
+        load_event, idle_event = timeline.events
+        assert load_event['name'] == 'load'
+        assert load_event['cat'] == step_timeline.CATEGORY_HELPER
+        assert load_event['ph'] == 'X'
+        assert load_event['pid'] == os.getpid()
+        assert load_event['dur'] >= 0.0
+        assert load_event['args'] == {'level': 'Base'}
+        assert idle_event['cat'] == step_timeline.CATEGORY_WAIT
+        assert idle_event['ts'] >= load_event['ts']
+        assert 'args' not in idle_event
+
+    def test_Timeline_SpanRaises_ErrorRecorded(self):
+        timeline = step_timeline.Timeline()
+
+        with pytest.raises(KeyError):
+            with timeline.span('lookup'):
+                raise KeyError('entity')
+
+        assert timeline.events[0]['args'] == {'error': 'KeyError'}
+
+    def test_Traced_NoChannel_RunsUnchanged(self, timeline_path):
+        assert step_timeline.get_timeline() is None
+
+        assert _Helper.open_level('Base', object()) == 'Base'
+        assert not os.path.exists(timeline_path + step_timeline.EVENTS_FILE_SUFFIX)
+
+    def test_Traced_ChannelOpen_EventPerCallWithSimpleArgs(self, timeline_path):
+        with step_timeline.TimelineChannel(timeline_path) as channel:
+            _Helper.open_level('Base', object(), frames=3, names=('a', 'b'))
+            _Helper.open_level('x' * (step_timeline.MAX_ARG_LENGTH + 1), None)
+            with pytest.raises(RuntimeError):
+                _Helper.fail()
+            events = channel.read_events()
+
+        assert [event['name'] for event in events] == ['_Helper.open_level'] * 2 + ['_Helper.fail']
+        assert events[0]['args'] == {'level': 'Base', 'frames': 3, 'names': ['a', 'b']}
+        assert events[1]['args']['level'] == 'x' * step_timeline.MAX_ARG_LENGTH
+        assert events[2]['args'] == {'error': 'RuntimeError'}
+        assert all(event['cat'] == step_timeline.CATEGORY_HELPER for event in events)
+
+    def test_TraceWaits_ChannelOpen_WrappedOnce(self, timeline_path):
+        general = types.ModuleType('azlmbr.legacy.general')
+        general.idle_wait = lambda seconds: None
+        general.idle_wait_frames = lambda frames: None
+        step_timeline.trace_waits(general)
+        assert not hasattr(general.idle_wait, '__wrapped__')
+
+        with step_timeline.TimelineChannel(timeline_path) as channel:
+            step_timeline.trace_waits(general)
+            wrapped_idle_wait = general.idle_wait
+            step_timeline.trace_waits(general)
+            general.idle_wait(0.5)
+            general.idle_wait_frames(1)
+            events = channel.read_events()
+
+        assert general.idle_wait is wrapped_idle_wait
+        # Wrapped waits take any arguments, since functions of compiled modules have no signature to bind them to.
+        assert [(event['name'], event['cat'], event['args']) for event in events] == [
+            ('general.idle_wait', step_timeline.CATEGORY_WAIT, {'args': [0.5]})]
+
+    def test_TimelineChannel_Closed_TraceOfBothProcesses(self, timeline_path):
+        with step_timeline.TimelineChannel(timeline_path) as channel:
+            with channel.span('launch_editor', args={'level': 'Base'}):
+                _Helper.open_level('Base', None)
+            # An event of the Editor process, and its last event cut off by the Editor being torn down.
+            with open(channel.events_path, 'a', encoding='utf-8') as events_file:
+                events_file.write(json.dumps({
+                    'name': 'TestHelper.open_level', 'cat': step_timeline.CATEGORY_HELPER, 'ph': 'X', 'ts': 1.0,
+                    'dur': 2.0, 'pid': EDITOR_PID, 'tid': 1}) + '\n')
+                events_file.write('{"name": "TestHelper.exit_game_mode", "cat": "hel')
+
+        trace = _read_trace(timeline_path)
+        assert trace['displayTimeUnit'] == 'ms'
+        metadata = [event for event in trace['traceEvents'] if event['ph'] == 'M']
+        events = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+        assert sorted((event['pid'], event['args']['name']) for event in metadata) == [
+            (os.getpid(), 'pytest'), (EDITOR_PID, 'Editor')]
+        assert [(event['name'], event['cat']) for event in events] == [
+            ('_Helper.open_level', step_timeline.CATEGORY_HELPER),
+            ('TestHelper.open_level', step_timeline.CATEGORY_HELPER),
+            ('launch_editor', step_timeline.CATEGORY_HARNESS),
+        ]
+        assert not os.path.exists(channel.events_path)
+        assert step_timeline.TIMELINE_FILE_ENV_VAR not in os.environ
+
+    def test_TimelineChannel_Enter_StaleFilesRemoved(self, timeline_path):
+        events_path = timeline_path + step_timeline.EVENTS_FILE_SUFFIX
+        for stale_path in (timeline_path, events_path):
+            with open(stale_path, 'w') as stale_file:
+                stale_file.write('{"name": "previous run"}\n')
+
+        with step_timeline.TimelineChannel(timeline_path) as channel:
+            assert channel.read_events() == []
+            assert not os.path.exists(timeline_path)
+
+        assert _read_trace(timeline_path)['traceEvents'] == [
+            {'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'tid': 0, 'args': {'name': 'pytest'}}]
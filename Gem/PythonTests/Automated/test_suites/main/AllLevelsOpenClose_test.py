@@ -72,4 +72,5 @@ class TestAllLevels(object):
             unexpected_lines=unexpected_lines,
             halt_on_unexpected=True,
             cfg_args=cfg_args,
+            levels=test_levels,
         )
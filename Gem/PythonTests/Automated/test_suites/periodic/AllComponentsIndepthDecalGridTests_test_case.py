@@ -59,9 +59,10 @@ def run():
     Test Case - Decal:
     1. Create child entity "decal_1" at position (3.0, 0.0, 1.0) under "default_level" entity.
     2. Find the Material property and set it to "airship_symbol_decal.material"
-    3. Enters game mode to take a screenshot for comparison, then exits game mode.
-    4. Change the Scale value in Transform component to 3.
-    5. Enters game mode to take a screenshot for comparison, then exits game mode.
+    3. Enters game mode to take a screenshot for comparison.
+    4. Change the Scale value in Transform component of the game entity to 3.
+    5. Takes a screenshot for comparison in the same game mode session, then exits game mode and applies the same
+       Scale to the editor entity.
     6. Set the Attenuation Angle in decal component to: 0.75.
     7. Enters game mode to take a screenshot for comparison, then exits game mode.
     8. Set Opacity to: 0.03.
@@ -187,12 +188,15 @@ def decal_component_test():
     )
     hydra.get_set_test(decal_1, 0, "Controller|Configuration|Material", asset_value)
     general.idle_wait(1.0)
-    hydra.take_screenshot_game_mode("Decal_1", decal_1_entity_name)
 
-    # Change the Uniform scale value in Transform component to: 3.0 and take screenshot
+    # Take that screenshot, then change the Uniform scale value in Transform component to: 3.0 and take another one.
+    # A transform change reaches the running game entity directly, so both are taken in a single game mode session.
+    def scale_game_decal_1():
+        game_decal_1_id = general.find_game_entity(decal_1_entity_name)
+        azlmbr.components.TransformBus(azlmbr.bus.Event, "SetLocalUniformScale", game_decal_1_id, 3.0)
+    hydra.take_screenshots_game_mode(
+        [("Decal_1", None, None), ("Decal_2", scale_game_decal_1, None)], decal_1_entity_name)
     azlmbr.components.TransformBus(azlmbr.bus.Event, "SetLocalUniformScale", decal_1.id, 3.0)
-    general.idle_wait(1.0)
-    hydra.take_screenshot_game_mode("Decal_2", decal_1_entity_name)
 
     # Set the Attenuation Angle to: 0.75 in Decal component and take screenshot
     hydra.get_set_test(decal_1, 0, "Controller|Configuration|Attenuation Angle", 0.75)
@@ -61,10 +61,10 @@ class TestAllComponentsIndepthTests(TestAutomationBase):
             unexpected_lines=unexpected_lines,
             halt_on_unexpected=True,
             cfg_args=[level],
+            levels=[level],
         )
 
-        for test_screenshot, golden_screenshot in zip(cache_images, golden_images):
-            self.compare_screenshots(test_screenshot, golden_screenshot)
+        self.compare_screenshot_batch(cache_images, golden_images)
 
     def test_LightComponentsInBasicLevel_ScreenshotsMatchGoldenImages(
             self, request, editor, workspace, project, launcher_platform, level, golden_images_directory):
@@ -140,10 +140,10 @@ class TestAllComponentsIndepthTests(TestAutomationBase):
             unexpected_lines=unexpected_lines,
             halt_on_unexpected=True,
             cfg_args=[level],
+            levels=[level],
         )
 
-        for test_screenshot, golden_screenshot in zip(cache_images, golden_images):
-            self.compare_screenshots(test_screenshot, golden_screenshot)
+        self.compare_screenshot_batch(cache_images, golden_images)
 
     def test_DecalGridComponentsInBasicLevel_ScreenshotsMatchGoldenImages(
             self, request, editor, workspace, project, launcher_platform, level, golden_images_directory):
@@ -225,7 +225,7 @@ class TestAllComponentsIndepthTests(TestAutomationBase):
             unexpected_lines=unexpected_lines,
             halt_on_unexpected=True,
             cfg_args=[level],
+            levels=[level],
         )
 
-        for test_screenshot, golden_screenshot in zip(cache_images, golden_images):
-            self.compare_screenshots(test_screenshot, golden_screenshot)
+        self.compare_screenshot_batch(cache_images, golden_images)
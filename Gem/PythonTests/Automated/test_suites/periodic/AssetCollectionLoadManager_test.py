@@ -59,4 +59,5 @@ class TestAutomation(TestAutomationBase):
             expected_lines=expected_lines,
             unexpected_lines=unexpected_lines,
             halt_on_unexpected=True,
+            levels=["EmptyLevel"],
         )
@@ -58,5 +58,6 @@ class TestAutomation(TestAutomationBase):
             expected_lines=expected_lines,
             unexpected_lines=unexpected_lines,
             halt_on_unexpected=True,
+            levels=["EmptyLevel"],
         )
         self.compare_screenshots(test_screenshot, golden_screenshot)
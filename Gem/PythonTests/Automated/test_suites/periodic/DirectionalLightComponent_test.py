@@ -80,7 +80,7 @@ class TestAutomation(TestAutomationBase):
             expected_lines=expected_lines,
             unexpected_lines=unexpected_lines,
             halt_on_unexpected=True,
+            levels=["EmptyLevel"],
         )
 
-        for index in range(len(golden_screenshots)):
-            self.compare_screenshots(test_screenshots[index], golden_screenshots[index])
+        self.compare_screenshot_batch(test_screenshots, golden_screenshots)
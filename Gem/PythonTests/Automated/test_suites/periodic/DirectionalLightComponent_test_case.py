@@ -116,6 +116,7 @@ def run():
     set_pcf_high_sample_count(light_component, screenshot_helper, screenshot_filename_base)
     set_esm(light_component, screenshot_helper, screenshot_filename_base)
     add_2nd_light(base_entity, screenshot_helper, screenshot_filename_base)
+    screenshot_helper.wait_for_captures()
 
     # Closes the Editor once finished:
     helper.close_editor()
@@ -187,7 +188,7 @@ def set_color_light_green(light_component, screenshot_helper, screenshot_filenam
     helper.set_component_property(light_component, color_path, color_value)
     helper.set_component_property(light_component, intensity_path, intensity_value)
     general.log('Set light color and intensity.')
-    screenshot_helper.capture_screenshot_blocking_in_game_mode(screenshot_filename_base + 'nofilter.ppm')
+    screenshot_helper.queue_capture_in_game_mode(screenshot_filename_base + 'nofilter.ppm')
 
     # Verify component's color and intensity
     color_result = helper.get_component_property(light_component, color_path)
@@ -213,7 +214,7 @@ def set_manual_cascade(light_component, screenshot_helper, screenshot_filename_b
     helper.set_component_property(light_component, farDepthCascade_path, farDepthCascade_value)
     helper.set_component_property(light_component, enableDebugColoring_path, enableDebugColoring_value)
     general.log('Set light cascade far depth manually and enabled debug coloring.')
-    screenshot_helper.capture_screenshot_blocking_in_game_mode(screenshot_filename_base + 'manualcascade.ppm')
+    screenshot_helper.queue_capture_in_game_mode(screenshot_filename_base + 'manualcascade.ppm')
 
     # Verify component's cascade count, automatic flag of cascade splitting, far depth cascade, & flag of debug coloring
     cascadeCount_result = helper.get_component_property(light_component, cascadeCount_path)
@@ -240,7 +241,7 @@ def set_automatic_cascade(light_component, screenshot_helper, screenshot_filenam
     helper.set_component_property(light_component, cascadeCount_path, 4)
     helper.set_component_property(light_component, splitAutomatic_path, True)
     general.log('Set split ratio.')
-    screenshot_helper.capture_screenshot_blocking_in_game_mode(screenshot_filename_base + 'autocascade.ppm')
+    screenshot_helper.queue_capture_in_game_mode(screenshot_filename_base + 'autocascade.ppm')
 
     # Verify component's split ratio.
     splitRatio_result = helper.get_component_property(light_component, splitRatio_path)
@@ -265,7 +266,7 @@ def set_pcf_low_sample_count(light_component, screenshot_helper, screenshot_file
     helper.set_component_property(light_component, predictionCount_path, predictionCount_value)
     helper.set_component_property(light_component, filteringCount_path, filteringCount_value)
     general.log('Set PCF filtering with low sample count.')
-    screenshot_helper.capture_screenshot_blocking_in_game_mode(screenshot_filename_base + 'pcflow.ppm')
+    screenshot_helper.queue_capture_in_game_mode(screenshot_filename_base + 'pcflow.ppm')
 
     # Verify component's PCF parameters.
     filterMethod_result = helper.get_component_property(light_component, filterMethod_path)
@@ -288,14 +289,14 @@ def set_pcf_high_sample_count(light_component, screenshot_helper, screenshot_fil
     # Set PCF filtering with high sample count.
     helper.set_component_property(light_component, predictionCount_path, 16)
     helper.set_component_property(light_component, filteringCount_path, 64)
-    screenshot_helper.capture_screenshot_blocking_in_game_mode(screenshot_filename_base + 'pcfhigh.ppm')
+    screenshot_helper.queue_capture_in_game_mode(screenshot_filename_base + 'pcfhigh.ppm')
 
 
 def set_esm(light_component, screenshot_helper, screenshot_filename_base):
     filterMethod_path = 'Controller|Configuration|Shadow|Shadow Filter Method'
     # Set ESM filtering.
     helper.set_component_property(light_component, filterMethod_path, 2) # ESM
-    screenshot_helper.capture_screenshot_blocking_in_game_mode(screenshot_filename_base + 'esm.ppm')
+    screenshot_helper.queue_capture_in_game_mode(screenshot_filename_base + 'esm.ppm')
 
 
 def add_2nd_light(base_entity, screenshot_helper, screenshot_filename_base):
@@ -306,7 +307,7 @@ def add_2nd_light(base_entity, screenshot_helper, screenshot_filename_base):
     editor.EditorEntityAPIBus(bus.Event, 'SetName', light2nd, 'DirectionalLight 2')
     helper.attach_component_to_entity(light2nd, 'Directional Light')
     components.TransformBus(bus.Event, 'SetLocalRotation', light2nd, rotation_rad(-90.0, 0.0, 0.0))
-    screenshot_helper.capture_screenshot_blocking_in_game_mode(screenshot_filename_base + '2ndlight.ppm')
+    screenshot_helper.queue_capture_in_game_mode(screenshot_filename_base + '2ndlight.ppm')
 
 
 if __name__ == "__main__":
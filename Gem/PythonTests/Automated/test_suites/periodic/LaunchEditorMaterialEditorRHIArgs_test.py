@@ -13,6 +13,7 @@ from Automated.atom_utils import hydra_test_utils as hydra
 
 TEST_DIRECTORY = os.path.dirname(__file__)
 EDITOR_TIMEOUT = 30
+QUIET_PERIOD = 5
 
 
 @pytest.mark.parametrize("project", ["AtomTest"])
@@ -36,6 +37,8 @@ class TestLaunchEditorMaterialEditorRHIArgs(object):
             expected_lines=expected_lines,
             unexpected_lines=unexpected_lines,
             halt_on_unexpected=True,
+            quiet_period=QUIET_PERIOD,
+            wait_for_ready=True,
             cfg_args=[cfg_args],
         )
 
@@ -62,6 +65,8 @@ class TestLaunchEditorMaterialEditorRHIArgs(object):
             expected_lines=expected_lines,
             unexpected_lines=unexpected_lines,
             halt_on_unexpected=True,
+            quiet_period=QUIET_PERIOD,
+            wait_for_ready=True,
             log_file_name="MaterialEditor.log",
             cfg_args=[cfg_args],
         )
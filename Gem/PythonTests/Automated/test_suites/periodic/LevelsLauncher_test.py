@@ -11,6 +11,7 @@ from Automated.atom_utils import hydra_test_utils as hydra
 from ly_remote_console.remote_console_commands import RemoteConsole as RemoteConsole
 
 log_monitor_timeout = 30
+quiet_period = 5
 
 
 @pytest.mark.parametrize("project", ["AtomTest"])
@@ -63,4 +64,5 @@ class TestLevelsLauncher(object):
             unexpected_lines=unexpected_lines,
             log_monitor_timeout=log_monitor_timeout,
             halt_on_unexpected=True,
+            quiet_period=quiet_period,
         )
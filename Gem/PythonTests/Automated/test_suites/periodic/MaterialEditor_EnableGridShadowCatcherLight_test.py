@@ -73,5 +73,4 @@ class TestMaterialEditorEnableGridShadowCatcherLight(TestAutomationBase):
             log_file_name="MaterialEditor.log",
         )
 
-        for test_screenshot, golden_screenshot in zip(test_screenshots, golden_screenshots):
-            self.compare_screenshots(test_screenshot, golden_screenshot)
+        self.compare_screenshot_batch(test_screenshots, golden_screenshots)
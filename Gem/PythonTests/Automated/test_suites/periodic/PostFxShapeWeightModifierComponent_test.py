@@ -66,6 +66,6 @@ class TestAutomation(TestAutomationBase):
             expected_lines=expected_lines,
             unexpected_lines=unexpected_lines,
             halt_on_unexpected=True,
+            levels=["EmptyLevel"],
         )
-        for test_screenshot, golden_screenshot in zip(test_screenshots, golden_screenshots):
-            self.compare_screenshots(test_screenshot, golden_screenshot)
+        self.compare_screenshot_batch(test_screenshots, golden_screenshots)
@@ -62,26 +62,27 @@ def run():
     set_manipulator_transform_mode(azlmbr.editor.TransformMode_Translation)
     set_camera_close(cameraEntityId)
     general.idle_wait_frames(5)
-    screenshotHelper.capture_screenshot_blocking('manipulator_translation_close.ppm')
+    screenshotHelper.queue_capture('manipulator_translation_close.ppm')
     set_camera_far(cameraEntityId)
     general.idle_wait_frames(1)
-    screenshotHelper.capture_screenshot_blocking('manipulator_translation_far.ppm')
+    screenshotHelper.queue_capture('manipulator_translation_far.ppm')
 
     set_manipulator_transform_mode(azlmbr.editor.TransformMode_Rotation)
     set_camera_close(cameraEntityId)
     general.idle_wait_frames(1)
-    screenshotHelper.capture_screenshot_blocking('manipulator_rotation_close.ppm')
+    screenshotHelper.queue_capture('manipulator_rotation_close.ppm')
     set_camera_far(cameraEntityId)
     general.idle_wait_frames(1)
-    screenshotHelper.capture_screenshot_blocking('manipulator_rotation_far.ppm')
+    screenshotHelper.queue_capture('manipulator_rotation_far.ppm')
 
     set_manipulator_transform_mode(azlmbr.editor.TransformMode_Scale)
     set_camera_close(cameraEntityId)
     general.idle_wait_frames(1)
-    screenshotHelper.capture_screenshot_blocking('manipulator_scale_close.ppm')
+    screenshotHelper.queue_capture('manipulator_scale_close.ppm')
     set_camera_far(cameraEntityId)
     general.idle_wait_frames(1)
-    screenshotHelper.capture_screenshot_blocking('manipulator_scale_far.ppm')
+    screenshotHelper.queue_capture('manipulator_scale_far.ppm')
+    screenshotHelper.wait_for_captures()
     general.log('All screenshots finished.')
 
     helper.close_editor()